@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Latenzen der App-Pfade (Laden, Statistik, Filter, Suche, Navigation, Speichern)
+
+Erzeugt je Größe einen synthetischen Bestand (Batch-CSVs mit realistisch
+leeren Feldern, JPEGs in wählbarer Auflösung, VLM-JSONs) und ruft die
+Datenfunktionen so auf, wie es die App tut. Ausgegeben werden p50/p95/max
+je Stufe; mit --json werden die Werte gespeichert, mit --compare einem
+früheren Lauf gegenübergestellt.
+
+Mit --apptest läuft zusätzlich das echte Skript über Streamlits AppTest
+(Rerun-Zeiten für Start, nächste Karte, Speichern, Übersicht und Suche).
+
+Aufruf (im Projektverzeichnis):
+    python benchmarks/bench_app.py --cards 1000 100000 1000000 --json bench.json
+    python benchmarks/bench_app.py --cards 100000 --compare bench.json
+"""
+
+import argparse
+import json
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from qc_core import journal
+from qc_core.batch_stats import BatchStats, batch_signature, write_sidecar
+from qc_core.card_index import BatchView
+from qc_core.completeness import compute_completeness
+from qc_core.confidence import ConfidenceTable
+from qc_core.fuzzy import FuzzyIndex
+from qc_core.master import MasterView
+from qc_core.previews import PREVIEW_WIDTH, get_preview
+from qc_core.search import SearchIndex
+from qc_core.timing import Timings
+from synthetic import FIELDS, write_dataset
+
+APP_SCRIPT = ROOT / "template_qualitiy_control_app_indexcards.py"
+SEARCH_FIELDS = ["Komponist", "Titel", "Signatur", "Textanfang"]
+QUERIES = ["Bach", "schub", "Müller", "Kantate", "Komponist:Brahms", "Mus.A 123"]
+FUZZY_QUERIES = ["Schuberl", "Kantatte", "Brahms Johanes"]
+FILTERS = {
+    "Problematische Karten": lambda df, completeness: completeness.sparse_mask(),
+    "Ohne Komponist": lambda df, completeness: ~completeness.filled["Komponist"],
+}
+SORTS = ["Datei", "Komponist"]
+
+
+def bench_direct(root, timings, args):
+    """Misst die Datenpfade der App durch direkte Aufrufe der qc_core-Funktionen."""
+    csv_dir = root / "csv"
+    paths = sorted(csv_dir.glob("*.csv"))
+
+    # Laden: einzelne Batches kalt, dann der Gesamtbestand ohne und mit Sidecars
+    views = {}
+    for path in paths[:args.repeat]:
+        with timings.measure("Laden: Batch"):
+            views[str(path)] = BatchView.from_frame(journal.load_with_journal(path), FIELDS)
+
+    def loader(path):
+        if path not in views:
+            views[path] = BatchView.from_frame(journal.load_with_journal(path), FIELDS)
+        return views[path]
+
+    views.clear()
+    master = MasterView(csv_dir, FIELDS, loader=loader)
+    with timings.measure("Laden: Gesamtbestand (ohne Sidecars)"):
+        master.refresh()
+    with timings.measure("Laden: Gesamtbestand (Sidecars)"):
+        MasterView(csv_dir, FIELDS, loader=loader).refresh()
+
+    # Statistik: Kopfzeile (Sidecar) und vollständige Neuberechnung eines Batches
+    batch_path = str(paths[0])
+    batch = loader(batch_path)
+    for _ in range(args.repeat):
+        with timings.measure("Statistik: Batch-Kopf"):
+            master.stats_of(paths[0].stem)
+        with timings.measure("Statistik: Gesamt"):
+            master.totals()
+        with timings.measure("Statistik: Füllgrad neu berechnen"):
+            BatchStats.from_completeness(paths[0].stem, compute_completeness(batch.df, FIELDS))
+
+    # Filter/Sortierung ohne Cache (neuer Schlüssel je Wiederholung)
+    for i in range(args.repeat):
+        for name, mask_func in FILTERS.items():
+            for sort_column in SORTS:
+                with timings.measure("Filter/Sortierung"):
+                    batch.ordering((name, i), mask_func, sort_column)
+
+    # Suche über den Gesamtbestand
+    df = master.frame()
+    with timings.measure("Suche: Index aufbauen"):
+        index = SearchIndex.build(df, SEARCH_FIELDS)
+    with timings.measure("Suche: fehlertoleranter Index aufbauen"):
+        fuzzy = FuzzyIndex.build(df, SEARCH_FIELDS)
+    for _ in range(args.repeat):
+        for query in QUERIES:
+            with timings.measure("Suche: Anfrage"):
+                df.iloc[index.search(query)]
+        for query in FUZZY_QUERIES:
+            with timings.measure("Suche: fehlertolerant"):
+                fuzzy.search(query)
+
+    # Navigation: Kartenwechsel über die Reihenfolge, Bild als Vorschau (neu bzw. aus dem Cache)
+    order = batch.ordering("Alle", None, "Datei")
+    rng = np.random.default_rng(0)
+    for position in rng.integers(0, len(order), 1000):
+        with timings.measure("Navigation: Karte"):
+            batch.df.loc[order[position]]
+    preview_dir = root / "previews"
+    images = sorted((root / "img").rglob("*.jpg"))
+    for stage in ("Navigation: Bild (Vorschau erzeugen)", "Navigation: Bild (Vorschau aus Cache)"):
+        for image in images:
+            with timings.measure(stage):
+                get_preview(image, PREVIEW_WIDTH, preview_dir).read_bytes()
+
+    # Konfidenz-Tabelle aus den JSON-Ausgaben
+    with timings.measure("Konfidenz: Tabelle aufbauen"):
+        ConfidenceTable(root / "json", root / "confidence.pkl").refresh()
+    with timings.measure("Konfidenz: Tabelle laden"):
+        ConfidenceTable(root / "json", root / "confidence.pkl")
+
+    # Speichern: wie save_bulk_corrections für eine Karte
+    for i in range(args.saves):
+        row = order[i % len(order)]
+        with timings.measure("Speichern"):
+            entries = journal.append_edits(batch_path, [(row, batch.df.at[row, 'Datei'], {"Komponist": f"Test {i}"})])
+            signature = batch_signature(batch_path)
+            journal.apply_edits(batch.df, entries)
+            batch.rows_changed([row])
+            stats = BatchStats.from_completeness(paths[0].stem, batch.completeness)
+            write_sidecar(batch_path, stats, FIELDS, signature)
+
+
+def _app_script(root):
+    """Skript mit auf den synthetischen Bestand umgestellten Pfaden."""
+    src = APP_SCRIPT.read_text(encoding="utf-8")
+    paths = {
+        "CSV_DIR": root / "csv",
+        "JSON_DIR": root / "json",
+        "IMAGE_BASE_DIR": root / "img",
+        "PREVIEW_CACHE_DIR": root / "app_previews",
+        "IMAGE_INDEX_PATH": root / "image_index.json",
+        "EXPORT_CACHE_DIR": root / "exports",
+        "SEARCH_INDEX_PATH": root / "search_index.pkl",
+        "FUZZY_INDEX_PATH": root / "fuzzy_index.pkl",
+        "CONFIDENCE_CACHE_PATH": root / "app_confidence.pkl",
+    }
+    for name, path in paths.items():
+        src = re.sub(rf'^{name} = ".*?"', f'{name} = "{path}"', src, count=1, flags=re.MULTILINE)
+    script = root / "app.py"
+    script.write_text(src, encoding="utf-8")
+    return script
+
+
+def bench_apptest(root, timings, args):
+    """Misst ganze Reruns des Skripts über Streamlits AppTest."""
+    from streamlit.testing.v1 import AppTest
+
+    script = _app_script(root)
+    at = AppTest.from_file(str(script), default_timeout=600)
+
+    def rerun(stage, action):
+        start = time.perf_counter()
+        action()
+        timings.record(stage, time.perf_counter() - start)
+        if len(at.exception) > 0:
+            raise RuntimeError(f"{stage}: {at.exception[0].value}")
+
+    rerun("App: Start", at.run)
+    for _ in range(args.repeat):
+        rerun("App: nächste Karte", lambda: at.button(key="btn_next").click().run())
+    for i in range(args.repeat):
+        field = next(t for t in at.text_input if t.key and t.key.startswith("Komponist_"))
+        field.set_value(f"App-Test {i}")
+        save = next(b for b in at.button if "speichern" in b.label)
+        rerun("App: Speichern", lambda: save.click().run())
+    rerun("App: Übersicht", lambda: at.sidebar.radio[0].set_value("📊 Gesamt-Übersicht").run())
+    rerun("App: Suche öffnen", lambda: at.sidebar.radio[0].set_value("🔍 Suche").run())
+    for query in QUERIES[:args.repeat]:
+        rerun("App: Suche", lambda: at.text_input[0].set_value(query).run())
+
+
+def run_size(cards, args):
+    """Erzeugt einen Bestand der Größe `cards` und misst alle Stufen."""
+    timings = Timings()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        start = time.perf_counter()
+        write_dataset(
+            root, cards, batch_size=args.batch_size, images=args.images,
+            image_size=tuple(args.resolution), json_cards=min(cards, args.json_cards),
+        )
+        print(f"\n{cards:,} Karten in {-(-cards // args.batch_size)} Batches "
+              f"(erzeugt in {time.perf_counter() - start:.1f}s)")
+        bench_direct(root, timings, args)
+        if args.apptest:
+            bench_apptest(root, timings, args)
+    return timings.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--batch-size", type=int, default=1_000, help="Karten je Batch-CSV")
+    parser.add_argument("--images", type=int, default=20, help="Anzahl erzeugter JPEGs")
+    parser.add_argument("--resolution", type=int, nargs=2, default=[1800, 1200], metavar=("BREITE", "HÖHE"))
+    parser.add_argument("--json-cards", type=int, default=10_000, help="Anzahl erzeugter VLM-JSONs")
+    parser.add_argument("--repeat", type=int, default=5, help="Wiederholungen je Stufe")
+    parser.add_argument("--saves", type=int, default=50, help="Anzahl gemessener Speichervorgänge")
+    parser.add_argument("--apptest", action="store_true", help="Zusätzlich Reruns des Skripts über AppTest messen")
+    parser.add_argument("--json", help="Ergebnisse als JSON speichern")
+    parser.add_argument("--compare", help="JSON eines früheren Laufs zum Vergleich (p50)")
+    args = parser.parse_args()
+
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else {}
+    results = {}
+    for cards in args.cards:
+        summary = run_size(cards, args)
+        previous = baseline.get(str(cards), {})
+        summary["Vergleich p50"] = [
+            f"{row['p50 [ms]'] / previous[row['Stufe']]['p50 [ms]']:.2f}x"
+            if previous.get(row['Stufe'], {}).get('p50 [ms]') else ""
+            for _, row in summary.iterrows()
+        ]
+        if not args.compare:
+            summary = summary.drop(columns="Vergleich p50")
+        print(summary.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+        results[str(cards)] = {
+            row["Stufe"]: {key: row[key] for key in ("Anzahl", "p50 [ms]", "p95 [ms]", "max [ms]")}
+            for _, row in summary.iterrows()
+        }
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, ensure_ascii=False, indent=1, default=float), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
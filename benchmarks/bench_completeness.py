@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Benchmark: zeilenweises apply() gegen vektorisierte Vollständigkeit
+
+Aufruf (im Projektverzeichnis):
+    python benchmarks/bench_completeness.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from qc_core.completeness import compute_completeness
+from synthetic import FIELDS, make_frame
+
+
+def apply_counts(df):
+    """Bisheriger Pfad aus calculate_statistics()."""
+    return df[FIELDS].fillna('').apply(
+        lambda row: sum(str(val).strip() != '' for val in row), axis=1
+    )
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'Zeilen':>10} {'apply [s]':>10} {'vektor [s]':>11} {'Faktor':>8}")
+    for rows in args.sizes:
+        df = make_frame(rows)
+        t_apply, old = timed(apply_counts, df)
+        t_vec, new = timed(compute_completeness, df, FIELDS)
+        assert (old.values == new.counts.values).all(), "Ergebnisse weichen ab"
+        print(f"{rows:>10,} {t_apply:>10.3f} {t_vec:>11.3f} {t_apply / t_vec:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
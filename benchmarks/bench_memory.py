@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Spitzen-Speicher und Dauer der Lademodi "memory" und "chunked"
+
+Gemessen werden Gesamtstatistik (ohne vorhandene Sidecars), Liste der
+problematischen Karten und eine Suche über alle Batches. Jeder Modus
+läuft in einem eigenen Prozess. Nur Linux/macOS.
+
+Aufruf (im Projektverzeichnis):
+    python benchmarks/bench_memory.py --rows 100000 1000000 --chunk-rows 100000
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+from bench_storage import _peak_mb
+from qc_core import streaming
+from qc_core.batch_stats import sidecar_path
+from qc_core.card_index import BatchView
+from qc_core.master import MasterView
+from qc_core.search import SearchIndex
+from synthetic import FIELDS, make_frame
+
+SEARCH_FIELDS = ["Komponist", "Titel", "Signatur", "Textanfang"]
+QUERY = "Bach Kantate"
+BATCH_ROWS = 10_000
+
+
+def run_memory(csv_dir, chunk_rows):
+    """Wie die App im Modus "memory": Batches im Speicher, Gesamtindex."""
+    views = {}
+
+    def loader(path):
+        if path not in views:
+            views[path] = BatchView.from_frame(pd.read_csv(path, encoding="utf-8-sig"), FIELDS)
+        return views[path]
+
+    master = MasterView(csv_dir, FIELDS, loader=loader)
+    master.refresh()
+    problems = pd.concat(master.frames(select=lambda view: view.completeness.sparse_mask()))
+    df = master.frame()
+    hits = SearchIndex.build(df, SEARCH_FIELDS).search(QUERY)
+    return len(problems), len(hits)
+
+
+def run_chunked(csv_dir, chunk_rows):
+    """Wie die App im Modus "chunked": alles blockweise."""
+    master = MasterView(
+        csv_dir, FIELDS,
+        stats_func=lambda path: streaming.batch_stats(path, FIELDS, chunksize=chunk_rows),
+    )
+    master.refresh()
+    paths = list(master.batch_paths().values())
+    n_problems = sum(len(chunk) for chunk in streaming.problem_cards(
+        paths, FIELDS, ["Datei", "Batch"], chunksize=chunk_rows
+    ))
+    _, n_hits = streaming.search(paths, QUERY, SEARCH_FIELDS, chunksize=chunk_rows)
+    return n_problems, n_hits
+
+
+MODES = {"memory": run_memory, "chunked": run_chunked}
+
+
+def worker(mode, csv_dir, chunk_rows):
+    """Führt einen Modus einmal aus und gibt Dauer und Speicherzuwachs als JSON aus."""
+    for path in Path(csv_dir).glob("*.csv"):
+        sidecar_path(path).unlink(missing_ok=True)
+    baseline = _peak_mb()
+    start = time.perf_counter()
+    n_problems, n_hits = MODES[mode](csv_dir, int(chunk_rows))
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        "seconds": seconds, "peak_mb": _peak_mb() - baseline,
+        "problems": n_problems, "hits": n_hits,
+    }))
+
+
+def measure(mode, csv_dir, chunk_rows):
+    """Startet einen Worker-Prozess für einen Modus."""
+    output = subprocess.run(
+        [sys.executable, __file__, "--worker", mode, str(csv_dir), str(chunk_rows)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Spitzen-Speicher der Lademodi memory/chunked")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--chunk-rows", type=int, default=streaming.CHUNK_ROWS)
+    parser.add_argument("--worker", nargs=3, metavar=("MODE", "CSV_DIR", "CHUNK_ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            df = make_frame(rows, batch_size=BATCH_ROWS)
+            for batch, group in df.groupby("Batch"):
+                group.to_csv(Path(tmp) / f"{batch}.csv", index=False, encoding="utf-8-sig")
+            size = sum(p.stat().st_size for p in Path(tmp).glob("*.csv")) / 1024 ** 2
+            del df
+
+            print(f"\n{rows:,} Zeilen in {rows // BATCH_ROWS} Batches ({size:.1f} MB CSV), Blöcke à {args.chunk_rows:,}")
+            print(f"{'Modus':<10} {'Dauer [s]':>10} {'+max. RSS [MB]':>14} {'Problemkarten':>14} {'Treffer':>8}")
+            for mode in MODES:
+                result = measure(mode, tmp, args.chunk_rows)
+                print(f"{mode:<10} {result['seconds']:>10.2f} {result['peak_mb']:>14.1f} "
+                      f"{result['problems']:>14,} {result['hits']:>8,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: str.contains-Scan gegen Suchindex und fehlertolerante Suche
+
+Aufruf (im Projektverzeichnis):
+    python benchmarks/bench_search.py --rows 300000
+"""
+
+import argparse
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from qc_core.fuzzy import FuzzyIndex
+from qc_core.search import SearchIndex
+from synthetic import make_frame
+
+SEARCH_FIELDS = ["Komponist", "Titel", "Signatur", "Textanfang"]
+QUERIES = ["Bach", "schub", "Müller", "Kantate", "Komponist:Brahms", "Mus.A 123", "a"]
+FUZZY_QUERIES = ["Schuberl", "Sch ubert", "Kantatte", "Brahms Johanes", "Mus.A 1234", "flüchtg"]
+
+
+def scan(df, term):
+    """Bisheriger Pfad der Suche (ohne Regex-Interpretation des Suchbegriffs)."""
+    mask = False
+    for field in SEARCH_FIELDS:
+        mask = mask | df[field].fillna('').str.contains(re.escape(term), case=False)
+    return df[mask]
+
+
+def best_of(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=300_000)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    start = time.perf_counter()
+    index = SearchIndex.build(df, SEARCH_FIELDS)
+    print(f"{args.rows:,} Zeilen - Index aufgebaut in {time.perf_counter() - start:.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "search_index.pkl"
+        index.save(path)
+        t_load, _ = best_of(lambda: SearchIndex.load(path), repeat=1)
+        print(f"Index gespeichert ({path.stat().st_size / 1024 ** 2:.1f} MB), Laden {t_load:.2f}s\n")
+
+    print(f"{'Anfrage':<20} {'Scan [ms]':>10} {'Treffer':>9} {'Index [ms]':>11} {'Treffer':>9}")
+    for query in QUERIES:
+        t_scan, scanned = best_of(lambda: scan(df, query))
+        t_index, hits = best_of(lambda: df.iloc[index.search(query)])
+        print(f"{query:<20} {t_scan * 1000:>10.1f} {len(scanned):>9,} {t_index * 1000:>11.1f} {len(hits):>9,}")
+
+    start = time.perf_counter()
+    fuzzy = FuzzyIndex.build(df, SEARCH_FIELDS)
+    print(f"\nFehlertoleranter Index ({len(fuzzy.terms):,} Begriffe) aufgebaut in {time.perf_counter() - start:.2f}s\n")
+    print(f"{'Anfrage':<20} {'Fuzzy [ms]':>11} {'Treffer':>9}")
+    for query in FUZZY_QUERIES:
+        t_fuzzy, (hits, _) = best_of(lambda: fuzzy.search(query, max_distance=2))
+        print(f"{query:<20} {t_fuzzy * 1000:>11.1f} {len(hits):>9,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Ladezeit und Spitzen-Speicher CSV gegen Parquet
+
+Jeder Fall läuft in einem eigenen Prozess, damit der Spitzen-Speicher
+(Zuwachs der max. RSS durch das Laden) unabhängig gemessen wird.
+Nur Linux/macOS.
+
+Aufruf (im Projektverzeichnis, benötigt pyarrow):
+    python benchmarks/bench_storage.py --rows 100000 1000000
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from qc_core.storage import import_csv, read_table
+from synthetic import FIELDS, make_frame
+
+STAT_COLUMNS = ["Datei", "Batch"] + FIELDS
+CASES = {
+    "csv": ("csv", None),
+    "csv (Statistik-Spalten)": ("csv", STAT_COLUMNS),
+    "parquet": ("parquet", None),
+    "parquet (Statistik-Spalten)": ("parquet", STAT_COLUMNS),
+    "parquet (Datei, Komponist)": ("parquet", ["Datei", "Komponist"]),
+}
+
+
+def _peak_mb():
+    """Max. RSS des Prozesses in MB."""
+    # Unter Linux erbt ru_maxrss nach exec den Wert des Elternprozesses - VmHWM nicht
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss: Linux in KB, macOS in Bytes
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1024 ** 2
+
+
+def worker(case, csv_path):
+    """Lädt die Tabelle einmal und gibt Dauer und Speicherzuwachs als JSON aus."""
+    import pyarrow.parquet  # noqa: F401  (Import nicht mitmessen)
+
+    backend, columns = CASES[case]
+    baseline = _peak_mb()
+    start = time.perf_counter()
+    df = read_table(csv_path, columns, backend=backend)
+    seconds = time.perf_counter() - start
+    print(json.dumps({"seconds": seconds, "rows": len(df), "peak_mb": _peak_mb() - baseline}))
+
+
+def measure(case, csv_path):
+    """Startet einen Worker-Prozess für einen Fall."""
+    output = subprocess.run(
+        [sys.executable, __file__, "--worker", case, str(csv_path)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ladezeit und Spitzen-Speicher CSV gegen Parquet")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--worker", nargs=2, metavar=("CASE", "CSV"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            csv_path = Path(tmp) / f"bench_{rows}.csv"
+            make_frame(rows).to_csv(csv_path, index=False, encoding="utf-8-sig")
+            import_csv(csv_path)
+            size_csv = csv_path.stat().st_size / 1024 ** 2
+            size_pq = csv_path.with_suffix(".parquet").stat().st_size / 1024 ** 2
+            print(f"\n{rows:,} Zeilen - CSV {size_csv:.1f} MB, Parquet {size_pq:.1f} MB")
+            print(f"{'Fall':<30} {'Laden [s]':>10} {'+max. RSS [MB]':>14}")
+            for case in CASES:
+                result = measure(case, csv_path)
+                print(f"{case:<30} {result['seconds']:>10.3f} {result['peak_mb']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Synthetische Karteikarten-Daten für Benchmarks
+"""
+
+import numpy as np
+import pandas as pd
+
+FIELDS = [
+    "Komponist", "Signatur", "Titel", "Textanfang",
+    "Verlag", "Material", "Textdichter", "Bearbeiter", "Bemerkungen"
+]
+
+COMPOSERS = [
+    "Bach, Johann Sebastian", "Bach, J. S.", "Händel, Georg Friedrich", "Mozart, Wolfgang Amadeus",
+    "Beethoven, Ludwig van", "Schubert, Franz", "Schumann, Robert", "Brahms, Johannes",
+    "Mendelssohn Bartholdy, Felix", "Dvořák, Antonín", "Reger, Max", "Telemann, Georg Philipp",
+    "Müller, Wenzel", "Löwe, Carl", "Weber, Carl Maria von", "Liszt, Franz",
+]
+WORDS = [
+    "Kantate", "Sonate", "Lied", "Messe", "Motette", "Choral", "Quartett", "Suite", "Walzer",
+    "Marsch", "Ouvertüre", "Präludium", "Fuge", "Arie", "Requiem", "Konzert", "Trio", "Serenade",
+]
+TEXT_WORDS = ["Wer", "nur", "den", "lieben", "Gott", "lässt", "walten", "Ach", "wie", "flüchtig",
+              "Herz", "und", "Mund", "Tat", "Leben", "Nun", "danket", "alle", "Schöne", "Nacht"]
+PUBLISHERS = ["Breitkopf & Härtel", "Schott", "Peters", "Bärenreiter", "Simrock", "Hofmeister"]
+MATERIALS = ["Partitur", "Stimmen", "Klavierauszug", "Abschrift", "Druck"]
+
+# Anteil gefüllter Werte je Feld (grob an realen Karteikarten orientiert)
+FILL_RATES = {
+    "Komponist": 0.9, "Signatur": 0.85, "Titel": 0.8, "Textanfang": 0.5, "Verlag": 0.6,
+    "Material": 0.7, "Textdichter": 0.3, "Bearbeiter": 0.15, "Bemerkungen": 0.2,
+}
+
+
+def _values(field, rows, rng):
+    """Zufällige, realistisch aussehende Werte für ein Feld."""
+    if field == "Komponist":
+        return np.array(COMPOSERS, dtype=object)[rng.integers(0, len(COMPOSERS), rows)]
+    if field == "Signatur":
+        return np.array([f"Mus.{chr(65 + a)} {b}" for a, b in zip(rng.integers(0, 6, rows), rng.integers(1, 99999, rows))], dtype=object)
+    if field in ("Titel", "Bemerkungen"):
+        words = np.array(WORDS, dtype=object)[rng.integers(0, len(WORDS), (rows, 2))]
+        return words[:, 0] + " " + rng.integers(1, 200, rows).astype(str) + " " + words[:, 1]
+    if field == "Textanfang":
+        words = np.array(TEXT_WORDS, dtype=object)[rng.integers(0, len(TEXT_WORDS), (rows, 4))]
+        return words[:, 0] + " " + words[:, 1] + " " + words[:, 2] + " " + words[:, 3]
+    if field == "Verlag":
+        return np.array(PUBLISHERS, dtype=object)[rng.integers(0, len(PUBLISHERS), rows)]
+    if field == "Material":
+        return np.array(MATERIALS, dtype=object)[rng.integers(0, len(MATERIALS), rows)]
+    return np.array(COMPOSERS, dtype=object)[rng.integers(0, len(COMPOSERS), rows)]
+
+
+def make_frame(rows, seed=0, batch_size=1000):
+    """Erzeugt ein synthetisches DataFrame mit zufällig leeren Feldern."""
+    rng = np.random.default_rng(seed)
+    data = {
+        "Datei": [f"card_{i:07d}.jpg" for i in range(rows)],
+        "Batch": [f"batch_{i // batch_size:04d}" for i in range(rows)],
+    }
+    for field in FIELDS:
+        values = _values(field, rows, rng)
+        roll = rng.random(rows)
+        fill = FILL_RATES.get(field, 0.5)
+        values[roll >= fill] = None
+        # Ein Teil der "leeren" Felder enthält nur Leerzeichen
+        values[(roll >= fill) & (roll < fill + 0.02)] = "  "
+        data[field] = values
+    return pd.DataFrame(data)
+
+
+def make_card_image(path, text, size=(1800, 1200), seed=0):
+    """Schreibt ein synthetisches Karteikarten-JPEG (Papierrauschen und Textzeilen)."""
+    from PIL import Image, ImageDraw
+
+    rng = np.random.default_rng(seed)
+    width, height = size
+    paper = rng.normal(235, 8, (height, width)).clip(0, 255).astype(np.uint8)
+    img = Image.fromarray(paper).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    for i, line in enumerate(text):
+        draw.text((width // 20, height // 10 + i * height // 12), str(line), fill=(40, 40, 60))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    img.save(path, "JPEG", quality=85)
+
+
+def _json_value(value):
+    return value if isinstance(value, str) else None
+
+
+def write_dataset(root, rows, batch_size=1000, images=100, image_size=(1800, 1200), json_cards=0, seed=0):
+    """Legt einen synthetischen Bestand an: `csv/<batch>.csv`, `img/<batch>/<datei>`, `json/<datei>.json`.
+
+    Bilder und JSON-Ausgaben werden nur für die ersten `images` bzw.
+    `json_cards` Karten erzeugt. Gibt das DataFrame des Bestands zurück.
+    """
+    import json
+    from pathlib import Path
+
+    root = Path(root)
+    df = make_frame(rows, seed=seed, batch_size=batch_size)
+    (root / "csv").mkdir(parents=True, exist_ok=True)
+    for batch, group in df.groupby("Batch", sort=False):
+        group.to_csv(root / "csv" / f"{batch}.csv", index=False, encoding="utf-8-sig")
+
+    for i, row in enumerate(df.head(images).itertuples(index=False)):
+        text = [row.Komponist, row.Titel, row.Signatur, row.Textanfang]
+        make_card_image(root / "img" / row.Batch / row.Datei, text, image_size, seed=seed + i)
+
+    rng = np.random.default_rng(seed)
+    (root / "json").mkdir(parents=True, exist_ok=True)
+    for row in df.head(json_cards).itertuples(index=False):
+        record = {
+            "Datei": row.Datei,
+            "fields": {
+                field: {"value": _json_value(getattr(row, field)), "confidence": round(float(rng.beta(8, 2)), 4)}
+                for field in FIELDS
+            },
+        }
+        with open(root / "json" / f"{row.Datei}.json", "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+    return df
@@ -0,0 +1,3 @@
+"""
+Kernfunktionen der OCR-Qualitätskontrolle (ohne Streamlit-Abhängigkeit)
+"""
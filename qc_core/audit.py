@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Änderungsprotokoll - wer hat wann welchen Wert geändert (SQLite)
+
+Jede gespeicherte Korrektur wird je Feld mit altem und neuem Wert, Karte,
+Batch, Zeitpunkt, Prüfer und Sitzung angehängt; Einträge werden nie
+geändert oder gelöscht, fehlende Werte stehen als NULL darin. Der alte
+Wert der ersten Änderung eines Felds ist sein Ausgangswert: der Stand vor
+der ersten protokollierten Änderung - auch nachdem das Journal längst in
+die CSV übernommen wurde. Das ist die OCR-Ausgabe nur, wenn das Feld vor
+Einrichtung des Protokolls nicht korrigiert wurde. Indizes decken die
+häufigen Abfragen ab:
+
+    Verlauf einer Karte              (batch, datei, field)
+    Ausgangswerte eines Batches      (batch, datei, field)
+    Durchsatz je Prüfer              (reviewer, ts)
+
+Die Datenbank läuft im WAL-Modus, damit mehrere Server bzw. die
+Kommandozeile gleichzeitig schreiben und lesen können.
+
+Abfragen ohne Browser:
+    python -m qc_core.audit AUDIT_DB history BATCH DATEI
+    python -m qc_core.audit AUDIT_DB reviewers
+    python -m qc_core.audit AUDIT_DB fields
+"""
+
+import argparse
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from qc_core.changes import as_text
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS edits (
+    id INTEGER PRIMARY KEY,
+    ts TEXT NOT NULL,
+    batch TEXT NOT NULL,
+    row INTEGER,
+    datei TEXT NOT NULL,
+    field TEXT NOT NULL,
+    old TEXT,
+    new TEXT,
+    reviewer TEXT,
+    session TEXT
+);
+CREATE INDEX IF NOT EXISTS edits_card ON edits (batch, datei, field);
+CREATE INDEX IF NOT EXISTS edits_reviewer ON edits (reviewer, ts);
+"""
+
+# Erste und letzte Änderung je Karte (Zeile + Datei) und Feld (für Ausgangswerte und Korrekturquoten)
+_ENDS = """
+SELECT e.batch, e.row, e.datei, e.field, f.old AS original, l.new AS current
+FROM (SELECT batch, row, datei, field, MIN(id) AS first, MAX(id) AS last
+      FROM edits {where} GROUP BY batch, row, datei, field) AS e
+JOIN edits AS f ON f.id = e.first
+JOIN edits AS l ON l.id = e.last
+"""
+
+
+def stored(value):
+    """Speicherform eines Zellwerts (fehlende Werte als None bzw. NULL)."""
+    return None if value is None or (not isinstance(value, str) and pd.isna(value)) else str(value)
+
+
+class AuditLog:
+    """Nur anhängendes Änderungsprotokoll in einer SQLite-Datei."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Eine Verbindung für alle Threads (Sitzungen), Zugriffe nacheinander
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        # Auswertungen über das ganze Protokoll je Stand (letzte id) zwischenspeichern
+        self._results = {}
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def last_id(self):
+        """Nummer des letzten Eintrags (0 = leer); ändert sich mit jeder Änderung, auch aus anderen Prozessen."""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM edits").fetchone()[0]
+
+    def _cached_query(self, sql, params=()):
+        key = (sql, tuple(params))
+        last = self.last_id()
+        cached = self._results.get(key)
+        if cached is None or cached[0] != last:
+            cached = self._results[key] = (last, self._query(sql, params))
+        return cached[1].copy()
+
+    def record(self, batch, changes, reviewer=None, session=None, ts=None):
+        """Hängt Änderungen eines Batches an und gibt deren Anzahl zurück.
+
+        `changes` ist eine Liste von (Zeile, Datei, Feld, alter Wert, neuer
+        Wert); unveränderte Werte werden übergangen.
+        """
+        ts = ts or datetime.now(timezone.utc).isoformat(timespec="seconds")
+        rows = [
+            (ts, batch, int(row), datei, name, stored(old), stored(new), reviewer or None, session)
+            for row, datei, name, old, new in changes
+            if as_text(old) != as_text(new)
+        ]
+        if rows:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT INTO edits (ts, batch, row, datei, field, old, new, reviewer, session) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        return len(rows)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM edits").fetchone()[0]
+
+    # --- Abfragen ---
+
+    def card_history(self, batch, datei):
+        """Alle Änderungen einer Karte, älteste zuerst."""
+        return self._query(
+            "SELECT ts AS Zeitpunkt, field AS Feld, old AS Alt, new AS Neu, reviewer AS Prüfer, session AS Sitzung "
+            "FROM edits WHERE batch = ? AND datei = ? ORDER BY id",
+            (batch, datei),
+        )
+
+    def original_values(self, batch, files=None):
+        """Ausgangswerte der geänderten Felder eines Batches (Spalten Zeile, Datei, Feld, Ausgangswert, Aktuell).
+
+        Karten mit gleichem Dateinamen werden über die protokollierte Zeile
+        unterschieden. `files` beschränkt auf einzelne Karten; fehlende Werte
+        sind NA.
+        """
+        where, params = "WHERE batch = ?", [batch]
+        if files is not None:
+            files = list(files)
+            where += f" AND datei IN ({', '.join('?' * len(files))})"
+            params += files
+        table = self._query(_ENDS.format(where=where), params)
+        table = table.rename(columns={
+            "row": "Zeile", "datei": "Datei", "field": "Feld", "original": "Ausgangswert", "current": "Aktuell"
+        })
+        return table[["Zeile", "Datei", "Feld", "Ausgangswert", "Aktuell"]]
+
+    def field_rates(self):
+        """Je Feld: bearbeitete Karten und Karten, deren Wert jetzt vom Ausgangswert abweicht."""
+        # Leer und NULL gelten als gleich (ältere Einträge speicherten fehlende Werte als "")
+        table = self._cached_query(
+            f"SELECT field AS Feld, COUNT(*) AS Bearbeitet, "
+            f"SUM(COALESCE(original, '') != COALESCE(current, '')) AS Korrigiert "
+            f"FROM ({_ENDS.format(where='')}) GROUP BY field ORDER BY Korrigiert DESC, field"
+        )
+        return table.astype({"Bearbeitet": "int64", "Korrigiert": "int64"})
+
+    def reviewer_throughput(self, reviewer=None, since=None):
+        """Änderungen und Karten je Prüfer und Tag, neueste Tage zuerst.
+
+        `since` (ISO-Datum) begrenzt den Zeitraum.
+        """
+        conditions, params = [], []
+        if reviewer is not None:
+            conditions.append("reviewer = ?")
+            params.append(reviewer)
+        if since:
+            conditions.append("ts >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._cached_query(
+            f"SELECT COALESCE(reviewer, '-') AS Prüfer, substr(ts, 1, 10) AS Tag, COUNT(*) AS Änderungen, "
+            f"COUNT(DISTINCT batch || '/' || datei) AS Karten, COUNT(DISTINCT batch) AS Batches "
+            f"FROM edits {where} GROUP BY reviewer, Tag ORDER BY Tag DESC, Änderungen DESC",
+            params,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Änderungsprotokoll abfragen")
+    parser.add_argument("db", help="Protokoll-Datenbank (AUDIT_DB_PATH)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    history = commands.add_parser("history", help="Verlauf einer Karte")
+    history.add_argument("batch")
+    history.add_argument("datei")
+    reviewers = commands.add_parser("reviewers", help="Durchsatz je Prüfer und Tag")
+    reviewers.add_argument("--since", help="Ab Datum (JJJJ-MM-TT)")
+    commands.add_parser("fields", help="Korrekturen je Feld")
+    args = parser.parse_args()
+
+    log = AuditLog(args.db)
+    if args.command == "history":
+        table = log.card_history(args.batch, args.datei)
+    elif args.command == "reviewers":
+        table = log.reviewer_throughput(since=args.since)
+    else:
+        table = log.field_rates()
+    print(table.to_string(index=False) if len(table) else "Keine Einträge")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Schreibweisen - Werte-Index je Feld mit Clustern abweichender Schreibweisen
+
+Für ausgewählte Felder (z.B. Komponist, Verlag) wird gezählt, welche Werte
+in welchem Batch wie oft vorkommen. Abweichende Schreibweisen desselben
+Werts werden über Normalisierungsschlüssel zusammengefasst ("key
+collision"): gleicher Schlüssel = gleicher Cluster.
+
+    fingerprint  Wörter ohne Groß-/Kleinschreibung, Akzente, Satzzeichen,
+                 Reihenfolge und Dopplungen ("Bach, J.S." = "J.S. Bach")
+    ngram        Buchstabenpaare ohne Leerzeichen, auch für getrennte oder
+                 zusammengezogene Wörter ("Sch ubert" = "Schubert")
+    initials     Nachname + Initialen für abgekürzte Personennamen
+                 ("Bach, J. S." = "Bach J.S." = "J. S. Bach"); ausgeschriebene
+                 Vornamen wie bei fingerprint, damit "Schumann, Robert" und
+                 "Schumann, Richard" getrennt bleiben
+    similar      Werte mit kleiner Editierdistanz (OCR-Fehler wie "Schuberl"
+                 für "Schubert"), über FuzzyIndex.near_duplicates(); nach
+                 Änderungen werden nur neue Werte verglichen (SimilarValues)
+
+Die Zählungen je Batch werden über die Signatur von CSV und Journal
+validiert und auf Platte gespeichert; nach Änderungen wird nur der
+betroffene Batch neu gezählt.
+
+Cluster eines Felds auflisten:
+    python -m qc_core.authority CSV_DIR INDEX_PATH --field Komponist --method initials --out cluster.csv
+"""
+
+import argparse
+import os
+import pickle
+import threading
+from collections import Counter
+from pathlib import Path
+
+import pandas as pd
+
+from qc_core.batch_stats import batch_signature
+from qc_core.fuzzy import MIN_FUZZY_LENGTH, FuzzyIndex, allowed_distance, levenshtein, normalized_value
+from qc_core.search import fold, tokenize
+
+INDEX_VERSION = 1
+# Ähnliche Schreibweisen: so viele neue Werte seit dem Aufbau (mindestens bzw. als Anteil)
+# werden einzeln verglichen, danach wird der Trigramm-Index neu gebaut
+SIMILAR_REBUILD_MIN = 1000
+SIMILAR_REBUILD_FRACTION = 0.2
+# Spalten der Cluster-Tabelle
+COLUMNS = ["Cluster", "Wert", "Karten", "Batches"]
+
+
+def fingerprint_key(value):
+    """Sortierte, eindeutige Wörter ohne Akzente und Satzzeichen."""
+    return " ".join(sorted(set(tokenize(fold(value)))))
+
+
+def ngram_key(value, n=2):
+    """Sortierte, eindeutige Buchstaben-n-Gramme ohne Leerzeichen und Satzzeichen."""
+    text = "".join(tokenize(fold(value)))
+    if len(text) <= n:
+        return text
+    return "".join(sorted({text[i:i + n] for i in range(len(text) - n + 1)}))
+
+
+def initials_key(value):
+    """Nachname + Initialen, aber nur wenn alle Vornamen abgekürzt sind.
+
+    Mit Komma gilt der Teil davor als Nachname ("Bach, J. S."), sonst das
+    einzige ausgeschriebene Wort ("Bach J.S.") bzw. das letzte Wort. Ist
+    ein Vorname ausgeschrieben, gilt fingerprint_key() - verschiedene
+    Personen mit gleichen Initialen landen so nicht in einem Cluster.
+    """
+    text = fold(value)
+    if "," in text:
+        last, _, first = text.partition(",")
+        surname, given = tokenize(last), tokenize(first)
+    else:
+        tokens = tokenize(text)
+        long_tokens = [t for t in tokens if len(t) > 1]
+        surname = long_tokens[-1:] if len(long_tokens) == 1 else tokens[-1:]
+        given = [t for t in tokens if t not in surname]
+    if not surname or any(len(t) > 1 for t in given):
+        return fingerprint_key(value)
+    return " ".join(surname + ["".join(t[0] for t in given)]).rstrip()
+
+
+class SimilarValues:
+    """Ähnliche Schreibweisen eines Felds, fortgeschrieben über wechselnde Wertemengen.
+
+    Der Trigramm-Index (FuzzyIndex) wird einmal über die normalisierten
+    Werte aufgebaut, die Paare liefert near_duplicates(). Später
+    hinzugekommene Werte werden gegen diesen Index und untereinander
+    verglichen, entfernte nur ausgeblendet. Neu gebaut wird erst, wenn die
+    Zusätze SIMILAR_REBUILD_MIN bzw. SIMILAR_REBUILD_FRACTION des Index
+    übersteigen - nach einer Korrektur kostet das nur die neuen Werte.
+    """
+
+    def __init__(self, max_distance=2):
+        self.max_distance = max_distance
+        self._index = None
+        self._base = set()
+        self._added = set()
+        # normalisierter Wert -> {ähnlicher Wert: Distanz}
+        self._neighbours = {}
+        self._lock = threading.Lock()
+
+    def _link(self, a, b, distance):
+        self._neighbours.setdefault(a, {})[b] = distance
+        self._neighbours.setdefault(b, {})[a] = distance
+
+    def _rebuild(self, terms):
+        self._index = FuzzyIndex.build(pd.DataFrame({"Wert": sorted(terms)}), ["Wert"])
+        self._base, self._added, self._neighbours = set(terms), set(), {}
+        for a, b, distance, *_ in self._index.near_duplicates("Wert", self.max_distance):
+            self._link(a, b, distance)
+
+    def _add(self, term):
+        if len(term) >= MIN_FUZZY_LENGTH:
+            limit = allowed_distance(term, self.max_distance)
+            values = self._index.values.get("Wert", {})
+            for term_id, distance in self._index.similar_terms(term, limit):
+                if distance > 0 and term_id in values:
+                    self._link(self._index.terms[term_id], term, distance)
+            for other in self._added:
+                distance = levenshtein(term, other, limit)
+                if 0 < distance <= limit:
+                    self._link(other, term, distance)
+        self._added.add(term)
+
+    def neighbours(self, terms):
+        """{Wert: {ähnlicher Wert: Distanz}} innerhalb der normalisierten Werte `terms`."""
+        terms = set(terms)
+        with self._lock:
+            new = terms - self._base - self._added
+            limit = max(SIMILAR_REBUILD_MIN, SIMILAR_REBUILD_FRACTION * len(self._base))
+            if self._index is None or len(self._added) + len(new) > limit:
+                self._rebuild(terms)
+            else:
+                for term in sorted(new):
+                    self._add(term)
+            return {
+                term: {other: d for other, d in self._neighbours[term].items() if other in terms}
+                for term in terms if term in self._neighbours
+            }
+
+
+def similar_groups(totals, similar=None):
+    """Gruppen von Werten ({Wert: Karten}), die sich nur um wenige Zeichen unterscheiden.
+
+    Jede Schreibweise kommt zur ähnlichsten häufigeren; Ketten ("Bach 1" ~
+    "Bach 2" ~ "Bach 3") werden nicht weiter verbunden. `similar`
+    (SimilarValues) behält die Paare für den nächsten Aufruf.
+    """
+    similar = similar or SimilarValues()
+    counts = Counter()
+    for value, count in totals.items():
+        counts[normalized_value(value)] += count
+    pairs = [
+        (distance, -counts[a] - counts[b], a, b)
+        for a, others in similar.neighbours(counts).items() for b, distance in others.items()
+        # häufigere Schreibweise zuerst (bei Gleichstand alphabetisch)
+        if (counts[a], b) > (counts[b], a)
+    ]
+    center = {}
+    for _, _, a, b in sorted(pairs):
+        if b not in center and center.get(a, a) == a:
+            center[a] = center[b] = a
+    groups = {}
+    for value in totals:
+        term = normalized_value(value)
+        groups.setdefault(center.get(term, term), []).append(value)
+    return list(groups.values())
+
+
+# Verfahren -> (Bezeichnung, Schlüsselfunktion); ohne Schlüssel paarweise über similar_groups()
+KEY_METHODS = {
+    "fingerprint": ("Wörter (Reihenfolge egal)", fingerprint_key),
+    "ngram": ("Buchstabenpaare (Leerzeichen egal)", ngram_key),
+    "initials": ("Nachname + Initialen (nur Abkürzungen)", initials_key),
+    "similar": ("Ähnliche Schreibweisen (Tippfehler)", None),
+}
+
+
+def filter_clusters(table, text):
+    """Cluster (ganz), in denen eine Schreibweise `text` enthält (akzent- und umlautunabhängig)."""
+    if not text:
+        return table
+    matching = table['Wert'].map(fold).str.contains(fold(text), regex=False)
+    return table[table['Cluster'].isin(table.loc[matching, 'Cluster'])]
+
+
+def cluster_summary(table):
+    """Ein Cluster je Zeile: häufigste Schreibweise als Vorschlag, Anzahl Schreibweisen und Karten."""
+    return table.groupby('Cluster', sort=False).agg(
+        Vorschlag=('Wert', 'first'), Schreibweisen=('Wert', 'size'), Karten=('Karten', 'sum')
+    ).reset_index()
+
+
+def to_merge(members, selected, canonical):
+    """Ausgewählte Schreibweisen eines Clusters, die auf den Normwert gesetzt werden."""
+    return members[members['Wert'].isin(selected) & (members['Wert'] != canonical)]
+
+
+def value_counts(df, fields):
+    """{Feld: {Wert: Anzahl}} der gefüllten Werte eines Batches."""
+    counts = {}
+    for name in fields:
+        if name not in df.columns:
+            counts[name] = {}
+            continue
+        values = df[name].dropna().astype(str)
+        counts[name] = values[values.str.strip() != ""].value_counts(sort=False).to_dict()
+    return counts
+
+
+class AuthorityIndex:
+    """Werte-Index über alle Batches mit inkrementeller Aktualisierung je Batch.
+
+    `counts_func(csv_path)` liefert {Feld: {Wert: Anzahl}} eines Batches
+    (inkl. offener Journal-Korrekturen), z.B. value_counts() über den
+    geladenen Batch oder blockweise gelesen.
+    """
+
+    def __init__(self, csv_dir, fields, counts_func, cache_path=None):
+        self.csv_dir = Path(csv_dir)
+        self.fields = list(fields)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self._counts_func = counts_func
+        # Batch-Name -> (Signatur, {Feld: {Wert: Anzahl}})
+        self._batches = {}
+        self._totals = {name: Counter() for name in self.fields}
+        # (Verfahren, Wert) -> Schlüssel
+        self._keys = {}
+        self._clusters = {}
+        # Feld -> SimilarValues (bleibt über Aktualisierungen erhalten)
+        self._similar = {}
+        self._lock = threading.Lock()
+        # Wird bei jeder inhaltlichen Änderung erhöht (z.B. für Cache-Schlüssel)
+        self.version = 0
+        self.load()
+
+    # --- Persistenz ---
+
+    def load(self):
+        """Lädt gespeicherte Zählungen, sofern sie zu Verzeichnis und Feldern passen."""
+        if self.cache_path is None or not self.cache_path.exists():
+            return False
+        try:
+            with open(self.cache_path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return False
+        if (data.get("version") != INDEX_VERSION or data.get("root") != str(self.csv_dir.resolve())
+                or data.get("fields") != self.fields):
+            return False
+        with self._lock:
+            self._batches = data["batches"]
+            for _, counts in self._batches.values():
+                self._merge(counts)
+        return True
+
+    def save(self):
+        """Speichert die Zählungen atomar."""
+        if self.cache_path is None:
+            return
+        with self._lock:
+            data = {"version": INDEX_VERSION, "root": str(self.csv_dir.resolve()),
+                    "fields": self.fields, "batches": self._batches}
+            payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_name(f"{self.cache_path.name}.tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, self.cache_path)
+
+    # --- Aufbau ---
+
+    def _merge(self, counts, sign=1):
+        for name in self.fields:
+            totals = self._totals[name]
+            for value, count in counts.get(name, {}).items():
+                totals[value] += sign * count
+                if totals[value] <= 0:
+                    del totals[value]
+
+    def refresh(self):
+        """Zählt geänderte und neue Batches neu, entfernte werden abgezogen; gibt deren Namen zurück."""
+        paths = {path.stem: path for path in sorted(self.csv_dir.glob("*.csv"))} if self.csv_dir.exists() else {}
+        with self._lock:
+            known = {name: sig for name, (sig, _) in self._batches.items()}
+        changed = [name for name in known if name not in paths]
+        updates = {}
+        for name, path in paths.items():
+            signature = batch_signature(path)
+            if known.get(name) != signature:
+                counts = self._counts_func(str(path))
+                if counts is not None:
+                    updates[name] = (signature, counts)
+
+        with self._lock:
+            for name in changed:
+                if name in self._batches:
+                    self._merge(self._batches.pop(name)[1], sign=-1)
+            for name, entry in updates.items():
+                if name in self._batches:
+                    self._merge(self._batches[name][1], sign=-1)
+                self._merge(entry[1])
+                self._batches[name] = entry
+            changed += list(updates)
+            if changed:
+                self._clusters = {}
+                self.version += 1
+        if changed:
+            self.save()
+        return changed
+
+    # --- Abfragen ---
+
+    def _key(self, method, value):
+        key = self._keys.get((method, value))
+        if key is None:
+            key = self._keys[(method, value)] = KEY_METHODS[method][1](value)
+        return key
+
+    def clusters(self, field_name, method="fingerprint"):
+        """Cluster mit mindestens zwei Schreibweisen als DataFrame (Spalten COLUMNS).
+
+        Große Cluster zuerst, innerhalb eines Clusters die häufigste
+        Schreibweise zuerst (Vorschlag für den Normwert).
+        """
+        with self._lock:
+            cached = self._clusters.get((field_name, method))
+            if cached is not None:
+                return cached
+            totals = dict(self._totals.get(field_name, {}))
+            batch_sets = {}
+            for name, (_, counts) in self._batches.items():
+                for value in counts.get(field_name, {}):
+                    batch_sets.setdefault(value, []).append(name)
+            groups = None
+            if KEY_METHODS[method][1] is not None:
+                by_key = {}
+                for value in totals:
+                    key = self._key(method, value)
+                    if key:
+                        by_key.setdefault(key, []).append(value)
+                groups = list(by_key.values())
+            else:
+                similar = self._similar.setdefault(field_name, SimilarValues())
+        if groups is None:
+            groups = similar_groups(totals, similar)
+
+        rows = []
+        for values in groups:
+            if len(values) < 2:
+                continue
+            for value in values:
+                rows.append((values[0], value, totals[value], len(batch_sets.get(value, ()))))
+        table = pd.DataFrame(rows, columns=["_key", "Wert", "Karten", "Batches"])
+        if len(table):
+            size = table.groupby("_key")["Karten"].transform("sum")
+            table = table.assign(_size=size).sort_values(
+                ["_size", "_key", "Karten", "Wert"], ascending=[False, True, False, True], kind="stable"
+            )
+            table.insert(0, "Cluster", pd.factorize(table["_key"])[0] + 1)
+        else:
+            table.insert(0, "Cluster", pd.Series(dtype="int64"))
+        table = table[COLUMNS].reset_index(drop=True)
+        with self._lock:
+            self._clusters[(field_name, method)] = table
+        return table
+
+    def batches_with(self, field_name, values):
+        """Namen der Batches, in denen einer der Werte vorkommt."""
+        values = set(values)
+        with self._lock:
+            return sorted(
+                name for name, (_, counts) in self._batches.items()
+                if values & counts.get(field_name, {}).keys()
+            )
+
+
+def main():
+    from qc_core import streaming
+
+    parser = argparse.ArgumentParser(description="Abweichende Schreibweisen eines Felds auflisten")
+    parser.add_argument("csv_dir", help="Verzeichnis mit Batch-CSVs (CSV_DIR)")
+    parser.add_argument("index_path", help="Gespeicherter Werte-Index (AUTHORITY_INDEX_PATH)")
+    parser.add_argument("--field", required=True, help="Feld, z.B. Komponist")
+    parser.add_argument("--method", default="fingerprint", choices=list(KEY_METHODS), help="Schlüsselverfahren")
+    parser.add_argument("--backend", default="csv", help="Speicher-Backend (csv oder parquet)")
+    parser.add_argument("--out", help="CSV mit allen Clustern")
+    args = parser.parse_args()
+
+    def counts_func(csv_path):
+        counts = {args.field: Counter()}
+        for chunk in streaming.iter_cards([csv_path], [args.field], args.backend):
+            counts[args.field].update(value_counts(chunk, [args.field])[args.field])
+        return {name: dict(values) for name, values in counts.items()}
+
+    index = AuthorityIndex(args.csv_dir, [args.field], counts_func, args.index_path)
+    index.refresh()
+    table = index.clusters(args.field, args.method)
+    print(f"{table['Cluster'].nunique()} Cluster mit {len(table)} Schreibweisen")
+    print(table.head(30).to_string(index=False))
+    if args.out:
+        table.to_csv(args.out, index=False, encoding="utf-8-sig")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Batch-Kennzahlen - vorberechnete Statistiken je Batch als JSON-Sidecar
+
+Neben jeder Batch-CSV liegt `<name>.stats.json` mit Gesamtzahl, Anzahl
+gefüllter Karten je Feld und Histogramm der gefüllten Felder. Die Datei
+wird beim Speichern einer Korrektur, beim Übernehmen des Journals und
+beim ersten Einlesen eines Batches geschrieben und über die Signatur von
+CSV und Journal validiert. Übersicht und Batch-Kopf lesen nur diese
+Dateien statt der Kartendaten.
+
+Sidecars für alle Batches vorab erzeugen:
+    python -m qc_core.batch_stats CSV_DIR --fields Komponist Signatur Titel ...
+"""
+
+import argparse
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from qc_core import journal
+from qc_core.cache import file_signature
+from qc_core.completeness import COMPLETE_MIN_FIELDS, SPARSE_MAX_FIELDS, compute_completeness
+
+SIDECAR_VERSION = 1
+
+
+def batch_signature(csv_path):
+    """Signatur eines Batches: CSV, Journal und ggf. laufende Übernahme."""
+    return (
+        file_signature(csv_path),
+        file_signature(journal.journal_path(csv_path)),
+        file_signature(journal.pending_path(csv_path)),
+    )
+
+
+@dataclass
+class BatchStats:
+    """Kennzahlen eines Batches (oder des Gesamtbestands)."""
+    batch: str
+    total: int = 0
+    # Feld -> Anzahl gefüllter Karten
+    field_counts: dict = field(default_factory=dict)
+    # Index = Anzahl gefüllter Felder, Wert = Anzahl Karten
+    histogram: list = field(default_factory=list)
+
+    @classmethod
+    def from_completeness(cls, batch, completeness):
+        """Kennzahlen aus dem Füllgrad eines geladenen Batches."""
+        n_fields = completeness.filled.shape[1]
+        return cls(
+            batch=batch,
+            total=len(completeness.counts),
+            field_counts={name: int(col.sum()) for name, col in completeness.filled.items()},
+            histogram=np.bincount(completeness.counts.to_numpy(), minlength=n_fields + 1).tolist(),
+        )
+
+    @property
+    def complete(self):
+        """Karten mit mindestens COMPLETE_MIN_FIELDS gefüllten Feldern."""
+        return sum(self.histogram[COMPLETE_MIN_FIELDS:])
+
+    @property
+    def sparse(self):
+        """Karten mit höchstens SPARSE_MAX_FIELDS gefüllten Feldern."""
+        return sum(self.histogram[:SPARSE_MAX_FIELDS + 1])
+
+    def merge(self, other, sign=1):
+        """Addiert (sign=1) bzw. subtrahiert (sign=-1) die Zahlen eines anderen Batches."""
+        self.total += sign * other.total
+        for name, count in other.field_counts.items():
+            self.field_counts[name] = self.field_counts.get(name, 0) + sign * count
+        if len(self.histogram) < len(other.histogram):
+            self.histogram.extend([0] * (len(other.histogram) - len(self.histogram)))
+        for i, count in enumerate(other.histogram):
+            self.histogram[i] += sign * count
+
+
+def sidecar_path(csv_path):
+    """Pfad des Statistik-Sidecars zu einer Batch-CSV."""
+    csv_path = Path(csv_path)
+    return csv_path.with_name(f"{csv_path.stem}.stats.json")
+
+
+def _as_json(signature):
+    return [list(part) if part is not None else None for part in signature]
+
+
+def write_sidecar(csv_path, stats, fields, signature=None):
+    """Schreibt das Sidecar atomar; `signature` ist der Stand, zu dem die Zahlen passen."""
+    if signature is None:
+        signature = batch_signature(csv_path)
+    data = {
+        "version": SIDECAR_VERSION,
+        "signature": _as_json(signature),
+        "fields": list(fields),
+        "batch": stats.batch,
+        "total": stats.total,
+        "field_counts": stats.field_counts,
+        "histogram": stats.histogram,
+    }
+    return _write_json(csv_path, data)
+
+
+def _write_json(csv_path, data):
+    path = sidecar_path(csv_path)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def _read_sidecar(csv_path):
+    try:
+        with open(sidecar_path(csv_path), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return data if data.get("version") == SIDECAR_VERSION else None
+
+
+def load_sidecar(csv_path, fields, signature=None):
+    """Liest das Sidecar; None, falls es fehlt, zu anderen Feldern gehört oder veraltet ist."""
+    data = _read_sidecar(csv_path)
+    if data is None or data.get("fields") != list(fields):
+        return None
+    if signature is None:
+        signature = batch_signature(csv_path)
+    if data.get("signature") != _as_json(signature):
+        return None
+    return BatchStats(
+        batch=data["batch"],
+        total=data["total"],
+        field_counts=data["field_counts"],
+        histogram=data["histogram"],
+    )
+
+
+def restamp_sidecar(csv_path, old_signature):
+    """Überträgt ein zu `old_signature` passendes Sidecar auf den aktuellen Stand.
+
+    Für Änderungen, die die Daten nicht verändern (z.B. Übernahme des
+    Journals in die CSV). Passt das Sidecar nicht, bleibt es veraltet und
+    wird beim nächsten Einlesen neu berechnet.
+    """
+    data = _read_sidecar(csv_path)
+    if data is None or data.get("signature") != _as_json(old_signature):
+        return False
+    data["signature"] = _as_json(batch_signature(csv_path))
+    _write_json(csv_path, data)
+    return True
+
+
+def compute_sidecar(csv_path, fields, backend="csv"):
+    """Liest einen Batch inkl. Journal, berechnet seine Kennzahlen und schreibt das Sidecar."""
+    signature = batch_signature(csv_path)
+    df = journal.load_with_journal(csv_path, backend)
+    stats = BatchStats.from_completeness(Path(csv_path).stem, compute_completeness(df, fields))
+    write_sidecar(csv_path, stats, fields, signature)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Statistik-Sidecars für alle Batch-CSVs erzeugen")
+    parser.add_argument("csv_dir", help="Verzeichnis mit Batch-CSVs (CSV_DIR)")
+    parser.add_argument("--fields", nargs="+", required=True, help="Editierbare Felder (EDITABLE_FIELDS)")
+    parser.add_argument("--backend", default="csv", help="Speicher-Backend (csv oder parquet)")
+    parser.add_argument("--force", action="store_true", help="Auch aktuelle Sidecars neu berechnen")
+    args = parser.parse_args()
+
+    for csv_path in sorted(Path(args.csv_dir).glob("*.csv")):
+        if not args.force and load_sidecar(csv_path, args.fields) is not None:
+            continue
+        stats = compute_sidecar(csv_path, args.fields, args.backend)
+        print(f"{csv_path.name}: {stats.total:,} Karten -> {sidecar_path(csv_path).name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Massenkorrektur - Tabellen-Diff und Suchen & Ersetzen über ganze Batches
+
+Beide Wege liefern Änderungen im Format {Zeilen-Label: {Feld: Wert}},
+die in einem einzigen Journal-Schreibvorgang gespeichert werden.
+"""
+
+import re
+
+import pandas as pd
+
+# Höchstzahl der in der Vorschau angezeigten Änderungen
+PREVIEW_ROWS = 200
+
+
+def _as_text(series):
+    """Vergleichsform einer Spalte (leere Werte als "")."""
+    return series.fillna('').astype(str)
+
+
+def diff_frames(original, edited, fields):
+    """Geänderte Zellen eines bearbeiteten Tabellenausschnitts als {Zeile: {Feld: Wert}}.
+
+    Verglichen wird die Textform; leere Zellen und fehlende Werte gelten
+    als gleich.
+    """
+    changes = {}
+    for field in fields:
+        if field not in edited.columns:
+            continue
+        before = _as_text(original[field]) if field in original.columns else pd.Series('', index=original.index)
+        after = _as_text(edited[field]).reindex(original.index, fill_value='')
+        for row, value in after[after != before].items():
+            changes.setdefault(row, {})[field] = value
+    return changes
+
+
+def compile_pattern(pattern, regex=True, case=True):
+    """Kompiliert das Suchmuster; ohne `regex` wird der Text wörtlich gesucht.
+
+    Löst `re.error` bei ungültigen regulären Ausdrücken aus.
+    """
+    return re.compile(pattern if regex else re.escape(pattern), 0 if case else re.IGNORECASE)
+
+
+def replace_preview(df, fields, pattern, replacement, regex=True):
+    """Alle Ersetzungen eines kompilierten Musters als DataFrame (Zeile, Datei, Feld, Alt, Neu).
+
+    Arbeitet je Feld vektorisiert über die ganze Spalte. Ohne `regex`
+    wird die Ersetzung wörtlich eingesetzt (keine Rückverweise).
+    """
+    if not regex:
+        replacement = replacement.replace('\\', '\\\\')
+    parts = []
+    for field in fields:
+        if field not in df.columns:
+            continue
+        old = _as_text(df[field])
+        new = old.str.replace(pattern, replacement, regex=True)
+        changed = new != old
+        if not changed.any():
+            continue
+        parts.append(pd.DataFrame({
+            'Zeile': df.index[changed],
+            'Datei': df['Datei'][changed].to_numpy() if 'Datei' in df.columns else '',
+            'Feld': field,
+            'Alt': old[changed].to_numpy(),
+            'Neu': new[changed].to_numpy(),
+        }))
+    if not parts:
+        return pd.DataFrame(columns=['Zeile', 'Datei', 'Feld', 'Alt', 'Neu'])
+    return pd.concat(parts, ignore_index=True)
+
+
+def changes_by_row(preview):
+    """Wandelt eine Vorschau in {Zeile: {Feld: Wert}} um."""
+    changes = {}
+    for row, field, value in zip(preview['Zeile'], preview['Feld'], preview['Neu']):
+        changes.setdefault(row, {})[field] = value
+    return changes
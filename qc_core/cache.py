@@ -0,0 +1,154 @@
+"""
+Daten-Cache - LRU-Cache für geladene Dateien mit Speicherbudget
+
+Einträge werden über Pfad + mtime + Dateigröße validiert. Ändert sich eine
+Datei, wird nur ihr Eintrag (inkl. abgeleiteter Werte) neu geladen; alle
+anderen bleiben erhalten.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields, is_dataclass
+
+import pandas as pd
+
+# Standard-Speicherbudget in MB - BEI BEDARF ANPASSEN
+DEFAULT_MAX_MB = 2048
+
+
+def file_signature(path):
+    """(mtime_ns, Größe) einer Datei oder None, falls sie nicht existiert."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def estimate_bytes(value):
+    """Schätzt den Speicherbedarf eines Cache-Werts."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if is_dataclass(value):
+        return sum(estimate_bytes(getattr(value, f.name)) for f in fields(value))
+    return sys.getsizeof(value)
+
+
+@dataclass
+class _Entry:
+    signature: tuple
+    value: object
+    nbytes: int
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    nbytes: int = 0
+    max_bytes: int = 0
+    paths: list = field(default_factory=list)
+
+
+class DataCache:
+    """Thread-sicherer LRU-Cache mit Speicherbudget, Schlüssel (Pfad, Art)."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_MB * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._stats = CacheStats(max_bytes=max_bytes)
+
+    def _key(self, path, kind):
+        return (os.path.abspath(str(path)), kind)
+
+    def _load_lock(self, key):
+        with self._lock:
+            return self._load_locks.setdefault(key, threading.Lock())
+
+    def get(self, path, loader, kind="data"):
+        """Gibt den gecachten Wert zurück oder lädt ihn mit `loader()` neu.
+
+        Ein Eintrag ist gültig, solange mtime und Größe der Datei
+        unverändert sind. Paralleles Laden derselben Datei wird
+        zusammengefasst.
+        """
+        key = self._key(path, kind)
+        signature = file_signature(key[0])
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return entry.value
+
+        with self._load_lock(key):
+            # Ein anderer Thread könnte inzwischen geladen haben
+            signature = file_signature(key[0])
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.signature == signature:
+                    self._entries.move_to_end(key)
+                    self._stats.hits += 1
+                    return entry.value
+                self._stats.misses += 1
+
+            value = loader()
+            if value is None:
+                return None
+            self.put(path, value, kind=kind, signature=signature)
+            return value
+
+    def put(self, path, value, kind="data", signature=None):
+        """Legt einen Wert ab und verdrängt bei Bedarf die ältesten Einträge."""
+        key = self._key(path, kind)
+        if signature is None:
+            signature = file_signature(key[0])
+        entry = _Entry(signature=signature, value=value, nbytes=estimate_bytes(value))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._stats.nbytes -= old.nbytes
+            self._entries[key] = entry
+            self._stats.nbytes += entry.nbytes
+            self._evict()
+
+    def _evict(self):
+        """Verdrängt LRU-Einträge bis zum Budget; der neueste bleibt immer erhalten."""
+        while self._stats.nbytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._stats.nbytes -= entry.nbytes
+            self._stats.evictions += 1
+
+    def invalidate(self, path, kind=None):
+        """Entfernt alle Einträge (oder nur eine Art) zu einer Datei."""
+        path = os.path.abspath(str(path))
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == path and (kind is None or k[1] == kind)]:
+                self._stats.nbytes -= self._entries.pop(key).nbytes
+
+    def clear(self):
+        """Leert den gesamten Cache."""
+        with self._lock:
+            self._entries.clear()
+            self._stats.nbytes = 0
+
+    def stats(self):
+        """Momentaufnahme der Cache-Kennzahlen."""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                entries=len(self._entries),
+                nbytes=self._stats.nbytes,
+                max_bytes=self.max_bytes,
+                paths=sorted({key[0] for key in self._entries}),
+            )
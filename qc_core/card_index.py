@@ -0,0 +1,81 @@
+"""
+Batch-Ansicht - geladener Batch mit Karten-Index und gecachten Reihenfolgen
+
+Die Navigation arbeitet nur noch auf Zeilen-Labels: Filter und Sortierung
+werden je (Version, Filter, Sortierung) einmal berechnet, danach kostet
+ein Kartenwechsel nur noch einen Array-Zugriff.
+"""
+
+import threading
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from qc_core.completeness import Completeness, compute_completeness
+
+_NO_ROWS = np.array([], dtype=np.int64)
+
+
+@dataclass
+class BatchView:
+    """Geteilter Batch: DataFrame, Füllgrad, Datei-Index und Reihenfolgen."""
+    df: pd.DataFrame
+    completeness: Completeness
+    version: int = 0
+    # Stand des Journals beim letzten Nachlesen (siehe journal.read_since)
+    journal_position: tuple = None
+    _orderings: dict = field(default_factory=dict, repr=False)
+    _by_datei: dict = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @classmethod
+    def from_frame(cls, df, fields):
+        """Erzeugt die Ansicht inkl. Füllgrad eines geladenen Batches."""
+        return cls(df=df, completeness=compute_completeness(df, fields))
+
+    def locate(self, datei):
+        """Zeilen-Labels aller Karten mit diesem Dateinamen (Duplikate inklusive)."""
+        with self._lock:
+            if self._by_datei is None:
+                labels = self.df.index.to_numpy()
+                self._by_datei = {
+                    key: labels[positions]
+                    for key, positions in self.df.groupby('Datei', sort=False).indices.items()
+                }
+            return self._by_datei.get(datei, _NO_ROWS)
+
+    def ordering(self, filter_key, mask_func, sort_column, sort_key=None):
+        """Zeilen-Labels nach Filter und Sortierung, gecacht je (Version, Filter, Sortierung).
+
+        `mask_func(df, completeness)` liefert eine boolesche Maske oder
+        None für "alle Karten". `sort_column` ist ein Spaltenname oder eine
+        Funktion (df, completeness) -> Sortierwerte (fehlende Werte zuletzt);
+        bei Funktionen dient `sort_key` als Cache-Schlüssel.
+        """
+        key = (self.version, filter_key, sort_column if sort_key is None else sort_key)
+        with self._lock:
+            cached = self._orderings.get(key)
+        if cached is not None:
+            return cached
+
+        mask = mask_func(self.df, self.completeness) if mask_func is not None else None
+        if callable(sort_column):
+            column = sort_column(self.df, self.completeness)
+        else:
+            column = self.df[sort_column] if sort_column in self.df.columns else self.df['Datei']
+        if mask is not None:
+            column = column[mask]
+        order = column.sort_values(kind="stable").index.to_numpy()
+
+        with self._lock:
+            if key[0] == self.version:
+                self._orderings[key] = order
+        return order
+
+    def rows_changed(self, rows):
+        """Nach einer Korrektur: Füllgrad der Zeilen neu berechnen und Reihenfolgen verwerfen."""
+        with self._lock:
+            self.completeness.update_rows(self.df, rows)
+            self.version += 1
+            self._orderings.clear()
@@ -0,0 +1,108 @@
+"""
+Änderungen - Änderungs-Feed und optimistische Sperre für mehrere Prüfer
+
+Alle Sitzungen eines Servers teilen sich die geladenen Batches. Jede
+gespeicherte Korrektur (auch aus anderen Prozessen, sobald sie im Journal
+nachgelesen wurde) wird im Feed veröffentlicht; Sitzungen fragen ihn mit
+ihrer zuletzt gesehenen Nummer ab und erfahren so, welche Karten sich
+geändert haben.
+
+Beim Speichern wird für jedes geänderte Feld der Wert mitgegeben, den der
+Prüfer beim Bearbeiten gesehen hat. Hat inzwischen jemand anderes genau
+dieses Feld geändert, wird nicht gespeichert, sondern ConflictError
+ausgelöst; Änderungen an anderen Feldern derselben Karte stören nicht.
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+# So viele Änderungen hält der Feed vor; ältere Stände müssen neu laden
+FEED_SIZE = 10_000
+# Spalten der Konflikt-Tabelle
+CONFLICT_COLUMNS = ['Zeile', 'Datei', 'Feld', 'Gesehen', 'Aktuell', 'Neu']
+
+
+def as_text(value):
+    """Vergleichsform eines Zellwerts (fehlende Werte als "")."""
+    return '' if value is None or (not isinstance(value, str) and pd.isna(value)) else str(value)
+
+
+class ConflictError(Exception):
+    """Felder wurden seit dem Öffnen von jemand anderem geändert (Tabelle in `conflicts`)."""
+
+    def __init__(self, conflicts):
+        self.conflicts = conflicts
+        super().__init__(f"{len(conflicts)} Feld(er) wurden inzwischen geändert")
+
+
+def find_conflicts(df, edits, expected):
+    """Konflikte zwischen gesehenen und aktuellen Werten als DataFrame (Spalten CONFLICT_COLUMNS).
+
+    `edits` ist {Zeile: {Feld: neuer Wert}}, `expected` {Zeile: {Feld:
+    gesehener Wert}}; Felder ohne gesehenen Wert werden nicht geprüft.
+    Setzt der andere bereits denselben Wert, ist das kein Konflikt.
+    """
+    rows = []
+    for row, changes in edits.items():
+        seen_values = expected.get(row, {})
+        for name, new in changes.items():
+            if name not in seen_values:
+                continue
+            current = as_text(df.at[row, name]) if name in df.columns else ''
+            seen = as_text(seen_values[name])
+            if current != seen and current != as_text(new):
+                datei = df.at[row, 'Datei'] if 'Datei' in df.columns else ''
+                rows.append((row, datei, name, seen, current, new))
+    return pd.DataFrame(rows, columns=CONFLICT_COLUMNS)
+
+
+@dataclass
+class Change:
+    """Eine gespeicherte Korrektur (eine oder mehrere Karten eines Batches)."""
+    seq: int
+    batch: str
+    rows: list
+    fields: list
+    # Sitzung, Prozess o.ä.; None = unbekannt (z.B. anderer Prozess)
+    source: str = None
+    ts: float = field(default_factory=time.time)
+
+
+class ChangeFeed:
+    """Prozessinterner Feed der gespeicherten Korrekturen mit fortlaufender Nummer."""
+
+    def __init__(self, size=FEED_SIZE):
+        self._changes = deque(maxlen=size)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    @property
+    def latest(self):
+        """Nummer der letzten Änderung (0 = noch keine)."""
+        with self._lock:
+            return self._seq
+
+    def publish(self, batch, rows, fields, source=None):
+        """Veröffentlicht eine Änderung und gibt ihre Nummer zurück."""
+        with self._lock:
+            self._seq += 1
+            self._changes.append(Change(self._seq, batch, list(rows), sorted(fields), source))
+            return self._seq
+
+    def since(self, seq):
+        """(Änderungen nach `seq`, aktuelle Nummer).
+
+        Liegt `seq` vor dem ältesten vorgehaltenen Eintrag, sind die
+        Änderungen None - der Aufrufer sollte dann alles neu anzeigen.
+        """
+        with self._lock:
+            if seq >= self._seq:
+                return [], self._seq
+            if not self._changes or self._changes[0].seq > seq + 1:
+                return None, self._seq
+            start = len(self._changes) - (self._seq - seq)
+            return list(self._changes)[start:], self._seq
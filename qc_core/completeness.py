@@ -0,0 +1,58 @@
+"""
+Vollständigkeit - vektorisierte Berechnung der gefüllten Felder je Karte
+"""
+
+from dataclasses import dataclass
+
+import pandas as pd
+
+# Schwellenwerte für die Vollständigkeit - BEI BEDARF ANPASSEN
+COMPLETE_MIN_FIELDS = 6
+SPARSE_MAX_FIELDS = 2
+
+
+@dataclass
+class Completeness:
+    """Füllgrad eines DataFrames: Boolesche Matrix und Anzahl gefüllter Felder je Karte."""
+    filled: pd.DataFrame
+    counts: pd.Series
+
+    def sparse_mask(self, max_fields=SPARSE_MAX_FIELDS):
+        """Karten mit höchstens `max_fields` gefüllten Feldern."""
+        return self.counts <= max_fields
+
+    def update_rows(self, df, rows):
+        """Berechnet den Füllgrad einzelner geänderter Zeilen neu."""
+        rows = list(rows)
+        if not rows:
+            return
+        filled = filled_matrix(df.loc[rows], self.filled.columns)
+        self.filled.loc[rows] = filled
+        self.counts.loc[rows] = filled.sum(axis=1).astype('int64')
+
+
+def filled_column(series):
+    """True, wenn der Wert nach Entfernen von Leerzeichen nicht leer ist."""
+    return series.fillna('').astype(str).str.strip() != ''
+
+
+def filled_matrix(df, fields):
+    """Boolesche Matrix (Karten x Felder) in einem Durchlauf je Spalte.
+
+    Fehlende Spalten gelten als leer, damit Batches mit abweichendem
+    Schema nicht zu einem Fehler führen.
+    """
+    columns = {}
+    for field in fields:
+        if field in df.columns:
+            columns[field] = filled_column(df[field])
+        else:
+            columns[field] = pd.Series(False, index=df.index)
+    return pd.DataFrame(columns, index=df.index)
+
+
+def compute_completeness(df, fields):
+    """Berechnet Füllgrad-Matrix und Feldanzahl je Karte."""
+    filled = filled_matrix(df, fields)
+    counts = filled.sum(axis=1).astype('int64')
+    return Completeness(filled=filled, counts=counts)
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Konfidenz-Tabelle - kompakte Kennzahlen je Karte aus den JSON-Rohausgaben des VLM
+
+Die JSON-Dateien in JSON_DIR werden parallel gelesen und zu einer Zeile je
+Karte verdichtet (niedrigste und mittlere Konfidenz, schwächstes Feld,
+Anzahl unsicherer Felder, Lesefehler). Die Tabelle wird auf Platte
+gespeichert; beim Aktualisieren werden nur Dateien mit geänderter mtime
+oder Größe neu gelesen.
+
+Erkannt werden Zahlen unter den Schlüsseln `confidence`, `conf`, `score`,
+`probability`, `prob` (Werte > 1 als Prozent) sowie `logprob` bzw.
+`avg_logprob` (als exp). Der Feldname ist der nächste umschließende
+Schlüssel; Werte direkt auf oberster Ebene gelten für die ganze Karte.
+
+Tabelle aufbauen bzw. aktualisieren:
+    python -m qc_core.confidence JSON_DIR CACHE_PATH --out low_confidence.csv
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from qc_core.previews import IMAGE_EXTENSIONS
+
+TABLE_VERSION = 1
+# Unterhalb dieser Konfidenz gilt ein Feld als unsicher
+LOW_CONFIDENCE = 0.5
+# Ab so vielen zu lesenden Dateien wird auf mehrere Prozesse verteilt
+PARALLEL_MIN_FILES = 1000
+
+CONFIDENCE_KEYS = {"confidence", "conf", "score", "probability", "prob"}
+LOGPROB_KEYS = {"logprob", "avg_logprob", "log_prob"}
+FILENAME_KEYS = ("Datei", "datei", "file", "filename", "image", "file_name")
+# Behälter-Schlüssel, die keinen Feldnamen darstellen
+CONTAINER_KEYS = {"fields", "metadata", "data", "result", "results", "output", "cards", "items"}
+
+COLUMNS = ["Datei", "Konfidenz", "Mittel", "Schwächstes Feld", "Unsichere Felder", "Fehler"]
+
+
+def card_key(datei):
+    """Verknüpfungsschlüssel einer Karte: Dateiname ohne Bild- und JSON-Endung."""
+    name = Path(str(datei)).name
+    if name.lower().endswith(".json"):
+        name = name[:-5]
+    stem, suffix = os.path.splitext(name)
+    return stem if suffix.lower() in IMAGE_EXTENSIONS else name
+
+
+def _normalize(key, value):
+    if key in LOGPROB_KEYS:
+        return math.exp(min(value, 0.0))
+    return value / 100.0 if value > 1 else value
+
+
+def _collect(node, field, out):
+    """Sammelt (Feld, Konfidenz)-Paare eines JSON-Knotens rekursiv."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            lower = str(key).lower()
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and (
+                lower in CONFIDENCE_KEYS or lower in LOGPROB_KEYS
+            ):
+                if math.isfinite(value):
+                    out.append((field, _normalize(lower, float(value))))
+            elif isinstance(value, (dict, list)):
+                _collect(value, field if lower in CONTAINER_KEYS else key, out)
+    elif isinstance(node, list):
+        for item in node:
+            _collect(item, field, out)
+
+
+def summarize_record(record, default_datei):
+    """Verdichtet den JSON-Eintrag einer Karte zu einer Tabellenzeile."""
+    datei = default_datei
+    if isinstance(record, dict):
+        datei = next((record[k] for k in FILENAME_KEYS if isinstance(record.get(k), str)), default_datei)
+    found = []
+    _collect(record, None, found)
+    if not found:
+        return (datei, np.nan, np.nan, "", 0, "keine Konfidenzwerte")
+
+    values = [value for _, value in found]
+    per_field = {}
+    for field, value in found:
+        if field is not None:
+            per_field[field] = min(value, per_field.get(field, value))
+    weakest = min(per_field, key=per_field.get) if per_field else ""
+    n_low = sum(value < LOW_CONFIDENCE for value in per_field.values())
+    return (datei, min(values), sum(values) / len(values), weakest, n_low, "")
+
+
+def parse_file(path):
+    """Liest eine JSON-Datei; gibt die Zeilen aller enthaltenen Karten zurück.
+
+    Eine Datei enthält eine Karte oder eine Liste von Karten. Nicht
+    lesbare Dateien ergeben eine Zeile mit Konfidenz 0 und Fehlertext,
+    damit sie in der Prüfreihenfolge ganz vorne stehen.
+    """
+    default_datei = Path(path).name[:-5] if path.lower().endswith(".json") else Path(path).name
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        return [(default_datei, 0.0, 0.0, "", 0, f"nicht lesbar: {e.__class__.__name__}")]
+
+    if isinstance(data, dict):
+        for key in ("cards", "items", "results"):
+            if isinstance(data.get(key), list) and data[key] and all(isinstance(r, dict) for r in data[key]):
+                data = data[key]
+                break
+    if isinstance(data, list):
+        return [summarize_record(record, default_datei) for record in data]
+    return [summarize_record(data, default_datei)]
+
+
+class ConfidenceTable:
+    """Konfidenz-Kennzahlen je Karte aus JSON_DIR mit inkrementeller Aktualisierung."""
+
+    def __init__(self, json_dir, cache_path=None, workers=None):
+        self.json_dir = Path(json_dir)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.workers = workers
+        # relativer Pfad -> ((mtime_ns, Größe), Zeilen)
+        self._files = {}
+        self._table = pd.DataFrame(columns=COLUMNS)
+        self._by_key = pd.DataFrame(columns=COLUMNS)
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self.last_refresh = 0.0
+        # Wird bei jeder inhaltlichen Änderung erhöht (z.B. für Cache-Schlüssel)
+        self.version = 0
+        self.load()
+
+    # --- Persistenz ---
+
+    def load(self):
+        """Lädt eine gespeicherte Tabelle, sofern sie zum JSON-Verzeichnis passt."""
+        if self.cache_path is None or not self.cache_path.exists():
+            return False
+        try:
+            with open(self.cache_path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return False
+        if data.get("version") != TABLE_VERSION or data.get("root") != str(self.json_dir.resolve()):
+            return False
+        with self._lock:
+            self._files = data["files"]
+            self._rebuild()
+        return True
+
+    def save(self):
+        """Speichert die Tabelle atomar."""
+        if self.cache_path is None:
+            return
+        with self._lock:
+            data = {"version": TABLE_VERSION, "root": str(self.json_dir.resolve()), "files": self._files}
+            payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_name(f"{self.cache_path.name}.tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, self.cache_path)
+
+    # --- Aufbau ---
+
+    def _scan(self):
+        """(mtime_ns, Größe) aller JSON-Dateien unterhalb von json_dir."""
+        found = {}
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            try:
+                it = os.scandir(self.json_dir / rel_dir)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            with it:
+                for item in it:
+                    rel = os.path.join(rel_dir, item.name) if rel_dir else item.name
+                    if item.is_dir(follow_symlinks=False):
+                        stack.append(rel)
+                    elif item.name.lower().endswith(".json"):
+                        st = item.stat()
+                        found[rel] = (st.st_mtime_ns, st.st_size)
+        return found
+
+    def _parse(self, rel_paths):
+        paths = [str(self.json_dir / rel) for rel in rel_paths]
+        if len(paths) < PARALLEL_MIN_FILES or self.workers == 1:
+            return [parse_file(path) for path in paths]
+        # spawn statt fork: läuft auch im Hintergrund-Thread des Servers, dessen Locks ein
+        # geforkter Prozess in beliebigem Zustand erben würde
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as executor:
+            return list(executor.map(parse_file, paths, chunksize=64))
+
+    def _rebuild(self):
+        rows = [row for _, file_rows in self._files.values() for row in file_rows]
+        table = pd.DataFrame(rows, columns=COLUMNS)
+        table["Unsichere Felder"] = table["Unsichere Felder"].astype("int64")
+        table.index = pd.Index([card_key(datei) for datei in table["Datei"]], name="Schlüssel")
+        self._table = table
+        # Bei mehrfach vorkommenden Karten zählt der schlechteste Eintrag
+        self._by_key = table.sort_values("Konfidenz", kind="stable")
+        self._by_key = self._by_key[~self._by_key.index.duplicated()]
+
+    def refresh(self):
+        """Aktualisiert die Tabelle; gibt die Anzahl neu gelesener Dateien zurück."""
+        current = self._scan()
+        with self._lock:
+            old_files = dict(self._files)
+        changed = [rel for rel, sig in current.items() if old_files.get(rel, (None,))[0] != sig]
+        parsed = self._parse(changed)
+
+        new_files = {rel: old_files[rel] for rel in current if rel in old_files}
+        for rel, rows in zip(changed, parsed):
+            new_files[rel] = (current[rel], rows)
+
+        with self._lock:
+            modified = bool(changed) or new_files.keys() != old_files.keys()
+            self._files = new_files
+            if modified:
+                self._rebuild()
+                self.version += 1
+            self.last_refresh = time.time()
+        if modified:
+            self.save()
+        return len(changed)
+
+    def refresh_in_background(self, max_age):
+        """Startet refresh() in einem Thread, wenn die Tabelle älter als `max_age` Sekunden ist."""
+        with self._lock:
+            if self._refreshing or time.time() - self.last_refresh < max_age:
+                return False
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="confidence-refresh", daemon=True).start()
+        return True
+
+    # --- Abfragen ---
+
+    def __len__(self):
+        return len(self._table)
+
+    @property
+    def ready(self):
+        """True, sobald JSON_DIR einmal gelesen wurde."""
+        return self.last_refresh > 0
+
+    @property
+    def table(self):
+        """Alle Karten als DataFrame (Index: Verknüpfungsschlüssel)."""
+        return self._table
+
+    def for_cards(self, datei):
+        """Kennzahlen zu einer Spalte von Dateinamen (gleicher Index, NaN ohne JSON)."""
+        by_key = self._by_key
+        keys = pd.Index([card_key(name) for name in datei])
+        result = by_key.reindex(keys)
+        result.index = datei.index
+        return result
+
+    def confidence(self, datei):
+        """Niedrigste Konfidenz je Karte einer Spalte von Dateinamen (NaN ohne JSON)."""
+        return self.for_cards(datei)["Konfidenz"].astype(float)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Konfidenz-Tabelle aus den JSON-Ausgaben aufbauen")
+    parser.add_argument("json_dir", help="Verzeichnis mit JSON-Ausgaben (JSON_DIR)")
+    parser.add_argument("cache_path", help="Tabellen-Datei (CONFIDENCE_CACHE_PATH)")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--out", help="CSV mit allen Karten, niedrigste Konfidenz zuerst")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = ConfidenceTable(args.json_dir, args.cache_path, args.workers)
+    parsed = table.refresh()
+    print(f"{len(table)} Karten, {parsed} Dateien gelesen ({time.perf_counter() - start:.1f}s)")
+
+    if args.out:
+        table.table.sort_values("Konfidenz", kind="stable").to_csv(args.out, index=False, encoding="utf-8-sig")
+
+
+if __name__ == "__main__":
+    main()
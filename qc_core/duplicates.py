@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+Duplikate - doppelte und fast doppelte Karten im Gesamtbestand
+
+Erkannt werden Karten mit
+- gleichem Dateinamen im selben Batch (mehrere CSV-Zeilen zu einer Datei;
+  Dateinamen sind nur je Batch eindeutig, Bilder liegen unter <batch>/<Datei>),
+- byte-gleicher Bilddatei (Datei-Hash, z.B. doppelt kopierte Scans),
+- fast gleichem Bild (Wahrnehmungs-Hash mit Hamming-Distanz bis
+  NEAR_DISTANCE, z.B. doppelt eingezogene Karten),
+- ähnlichem Bild bei gleichem Komponist + Titel bzw. gleicher Signatur
+  (Distanz bis BLOCK_DISTANCE, z.B. leicht verschobene Neuscans),
+- gleicher normalisierter Signatur bzw. gleichem Komponist + Titel + Textanfang.
+
+Paarweise über den ganzen Bestand verglichen wird nie: Gleiche Schlüssel
+werden gruppiert, fast gleiche Bilder über Teilstücke des Hashes
+vorsortiert (bei Distanz d stimmt nach dem Schubfachprinzip mindestens
+eines von d+1 Teilstücken überein), ähnliche Bilder nur innerhalb der
+Metadaten-Blöcke verglichen. Sehr große Gruppen (mehr als MAX_BLOCK Karten,
+z.B. leere Rückseiten) werden übersprungen. Die Hashes der Bilder liegen in
+einem Cache auf Platte und werden nur für neue oder geänderte Dateien
+berechnet.
+
+Hashes aufbauen bzw. aktualisieren und Duplikate auflisten:
+    python -m qc_core.duplicates CSV_DIR IMAGE_BASE_DIR HASH_CACHE --image-index IMAGE_INDEX_PATH --out duplicates.csv
+"""
+
+import argparse
+import hashlib
+import io
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from qc_core.search import fold, tokenize
+
+HASH_VERSION = 1
+# Max. Hamming-Distanz (von 64 Bit): fast gleiches Bild im ganzen Bestand
+NEAR_DISTANCE = 3
+# Max. Hamming-Distanz: ähnliches Bild innerhalb eines Metadaten-Blocks
+BLOCK_DISTANCE = 10
+# Gruppen mit mehr Karten werden nicht als Duplikate gemeldet
+MAX_BLOCK = 500
+# Ab so vielen zu hashenden Bildern wird auf mehrere Prozesse verteilt
+PARALLEL_MIN_FILES = 200
+
+# Gründe (Bit je Grund) in der Reihenfolge ihrer Aussagekraft
+REASONS = {
+    "Datei mehrfach": 1,
+    "Bilddatei identisch": 2,
+    "Bild fast gleich": 4,
+    "Bild ähnlich": 8,
+    "Signatur": 16,
+    "Komponist + Titel + Textanfang": 32,
+}
+SIGNATURE_FIELDS = ["Signatur"]
+WORK_FIELDS = ["Komponist", "Titel", "Textanfang"]
+# Blöcke, in denen ähnliche Bilder gesucht werden
+IMAGE_BLOCKS = [["Signatur"], ["Komponist", "Titel"]]
+# DCT-Koeffizienten: Kantenlänge des verkleinerten Bilds und behaltene Frequenzen
+HASH_SIZE = 32
+HASH_FREQUENCIES = 8
+COLUMNS = ["Gruppe", "Größe", "Gründe", "Batch", "Datei"]
+
+
+def _dct_matrix(n):
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * x + 1) * k / (2 * n))
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT = _dct_matrix(HASH_SIZE)
+
+
+def image_hashes(path):
+    """(Datei-Hash, Wahrnehmungs-Hash) einer Bilddatei; Worker-Funktion für den Prozess-Pool.
+
+    Der Wahrnehmungs-Hash (pHash, 64 Bit) vergleicht die niedrigsten
+    8x8 DCT-Frequenzen eines auf 32x32 verkleinerten Graustufenbilds mit
+    ihrem Median. Er bleibt bei Skalierung, Kompression, Helligkeit und
+    leichten Verschiebungen nahezu gleich. Nicht lesbare Bilder ergeben
+    (Datei-Hash, None).
+    """
+    from PIL import Image
+
+    with open(path, "rb") as f:
+        data = f.read()
+    file_hash = hashlib.blake2b(data, digest_size=16).digest()
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            # JPEG direkt stark verkleinert dekodieren
+            img.draft("L", (HASH_SIZE * 4, HASH_SIZE * 4))
+            small = img.convert("L").resize((HASH_SIZE, HASH_SIZE), Image.Resampling.BOX)
+            pixels = np.asarray(small, dtype=np.float64)
+    except Exception:
+        return file_hash, None
+    coefficients = (_DCT @ pixels @ _DCT.T)[:HASH_FREQUENCIES, :HASH_FREQUENCIES].ravel()
+    # Gleichanteil (Helligkeit) nicht in den Median einbeziehen
+    bits = coefficients > np.median(coefficients[1:])
+    return file_hash, int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _popcount(values):
+    """Anzahl gesetzter Bits je uint64."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def normalize_key(value):
+    """Vergleichsschlüssel eines Werts: Kleinschreibung, ohne Akzente, Leer- und Satzzeichen."""
+    return "".join(tokenize(fold(value)))
+
+
+class ImageHashes:
+    """Datei- und Wahrnehmungs-Hashes aller Bilder eines Ordners mit inkrementeller Aktualisierung."""
+
+    def __init__(self, root, cache_path=None, workers=None):
+        self.root = Path(root)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.workers = workers
+        # relativer Pfad -> ((mtime_ns, Größe), Datei-Hash, Wahrnehmungs-Hash)
+        self._files = {}
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self.last_refresh = 0.0
+        # Wird bei jeder inhaltlichen Änderung erhöht
+        self.version = 0
+        self.load()
+
+    # --- Persistenz ---
+
+    def load(self):
+        """Lädt gespeicherte Hashes, sofern sie zum Bildordner passen."""
+        if self.cache_path is None or not self.cache_path.exists():
+            return False
+        try:
+            with open(self.cache_path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return False
+        if data.get("version") != HASH_VERSION or data.get("root") != str(self.root.resolve()):
+            return False
+        with self._lock:
+            self._files = data["files"]
+        return True
+
+    def save(self):
+        """Speichert die Hashes atomar."""
+        if self.cache_path is None:
+            return
+        with self._lock:
+            data = {"version": HASH_VERSION, "root": str(self.root.resolve()), "files": self._files}
+            payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_name(f"{self.cache_path.name}.tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, self.cache_path)
+
+    # --- Aufbau ---
+
+    def _hash(self, rel_paths):
+        paths = [str(self.root / rel) for rel in rel_paths]
+        if len(paths) < PARALLEL_MIN_FILES or self.workers == 1:
+            return [_hash_or_none(path) for path in paths]
+        # spawn statt fork: läuft im Hintergrund-Thread des Servers (siehe ConfidenceTable._parse)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as executor:
+            return list(executor.map(_hash_or_none, paths, chunksize=32))
+
+    def refresh(self, rel_paths):
+        """Hasht neue und geänderte Bilder (Pfade relativ zum Bildordner); gibt deren Anzahl zurück."""
+        current = {}
+        for rel in rel_paths:
+            try:
+                st = os.stat(self.root / rel)
+            except OSError:
+                continue
+            current[rel] = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            old_files = dict(self._files)
+        changed = [rel for rel, sig in current.items() if old_files.get(rel, (None,))[0] != sig]
+        hashed = self._hash(changed)
+
+        new_files = {rel: old_files[rel] for rel in current if rel in old_files}
+        for rel, result in zip(changed, hashed):
+            if result is not None:
+                new_files[rel] = (current[rel],) + result
+
+        with self._lock:
+            modified = bool(changed) or new_files.keys() != old_files.keys()
+            self._files = new_files
+            if modified:
+                self.version += 1
+            self.last_refresh = time.time()
+        if modified:
+            self.save()
+        return len(changed)
+
+    def refresh_in_background(self, rel_paths_func, max_age):
+        """Startet refresh() in einem Thread, wenn die Hashes älter als `max_age` Sekunden sind."""
+        with self._lock:
+            if self._refreshing or time.time() - self.last_refresh < max_age:
+                return False
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh(rel_paths_func())
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="image-hash-refresh", daemon=True).start()
+        return True
+
+    # --- Abfragen ---
+
+    def __len__(self):
+        return len(self._files)
+
+    @property
+    def refreshing(self):
+        """True, solange eine Aktualisierung im Hintergrund läuft."""
+        return self._refreshing
+
+    def lookup(self, rel_paths):
+        """(Datei-Hashes, Wahrnehmungs-Hashes, vorhanden) zu einer Folge relativer Pfade."""
+        files = self._files
+        found = [files.get(rel) if rel is not None else None for rel in rel_paths]
+        present = np.array([entry is not None and entry[2] is not None for entry in found], dtype=bool)
+        file_hashes = [entry[1] if entry is not None else None for entry in found]
+        phashes = np.array([entry[2] if entry is not None and entry[2] is not None else 0 for entry in found],
+                           dtype=np.uint64)
+        return file_hashes, phashes, present
+
+
+def _hash_or_none(path):
+    try:
+        return image_hashes(path)
+    except OSError:
+        return None
+
+
+@dataclass
+class DuplicateReport:
+    """Ergebnis einer Duplikatprüfung."""
+    # Eine Zeile je betroffener Karte (Spalten COLUMNS + Metadaten)
+    cards: pd.DataFrame
+    # Wegen Größe übersprungene Gruppen: Grund -> Anzahl
+    skipped: dict = field(default_factory=dict)
+    created: float = field(default_factory=time.time)
+    version: int = 0
+    # Anzahl der zum Prüfzeitpunkt gehashten Bilder
+    hashed_images: int = 0
+
+    @property
+    def groups(self):
+        """Anzahl der Duplikatgruppen."""
+        return self.cards['Gruppe'].nunique()
+
+    def flagged_files(self, batch):
+        """Dateinamen der betroffenen Karten eines Batches."""
+        return set(self.cards.loc[self.cards['Batch'] == batch, 'Datei'])
+
+    def mask(self, df, batch):
+        """Boolesche Maske der betroffenen Karten eines Batches."""
+        return df['Datei'].isin(self.flagged_files(batch))
+
+    def group_of(self, batch, datei):
+        """Alle Karten der Gruppe(n) einer Karte (Batch + Dateiname)."""
+        groups = self.cards.loc[(self.cards['Batch'] == batch) & (self.cards['Datei'] == datei), 'Gruppe']
+        return self.cards[self.cards['Gruppe'].isin(groups)]
+
+    def others_of(self, batch, datei):
+        """Die übrigen Karten der Gruppe(n) einer Karte."""
+        group = self.group_of(batch, datei)
+        return group[(group['Batch'] != batch) | (group['Datei'] != datei)]
+
+    def reason_counts(self):
+        """Anzahl der Gruppen je Grund, häufigste zuerst."""
+        return self.cards.drop_duplicates('Gruppe')['Gründe'].str.split(", ").explode().value_counts()
+
+    def with_reasons(self, reasons):
+        """Betroffene Karten, deren Gruppe einen der Gründe hat (keine Gründe = alle)."""
+        if not reasons:
+            return self.cards
+        reasons = set(reasons)
+        return self.cards[self.cards['Gründe'].str.split(", ").map(lambda r: bool(reasons & set(r)))]
+
+    @property
+    def export_version(self):
+        """Stand für den Export-Cache (neue Prüfung = neue Datei)."""
+        return (self.version, self.created)
+
+
+def _group_keys(keys, valid, max_block):
+    """Gruppen gleicher Schlüssel mit 2 bis max_block Einträgen.
+
+    Gibt (Positionen nach Gruppe sortiert, Gruppennummer je Position,
+    Anzahl übersprungener zu großer Gruppen) zurück.
+    """
+    positions = np.flatnonzero(valid)
+    codes, _ = pd.factorize(pd.Series(keys).iloc[positions])
+    counts = np.bincount(codes) if len(codes) else np.zeros(0, np.int64)
+    sizes = counts[codes]
+    keep = (sizes > 1) & (sizes <= max_block)
+    positions, codes = positions[keep], codes[keep]
+    order = np.argsort(codes, kind="stable")
+    return positions[order], codes[order], int((counts > max_block).sum())
+
+
+def _chain_pairs(positions, codes):
+    """Je Gruppe eine Kette benachbarter Einträge (genügt für die Zusammenhangskomponenten)."""
+    same = codes[:-1] == codes[1:]
+    return positions[:-1][same], positions[1:][same]
+
+
+def _block_pairs(positions, codes):
+    """Alle Paare innerhalb der Gruppen; gleich große Gruppen werden gemeinsam verarbeitet."""
+    left, right = [np.empty(0, np.int64)], [np.empty(0, np.int64)]
+    if len(codes) == 0:
+        return left[0], right[0]
+    _, starts, counts = np.unique(codes, return_index=True, return_counts=True)
+    sizes = np.repeat(counts, counts)
+    for size in np.unique(counts):
+        stacked = positions[sizes == size].reshape(-1, size)
+        a, b = np.triu_indices(size, 1)
+        left.append(stacked[:, a].ravel())
+        right.append(stacked[:, b].ravel())
+    return np.concatenate(left), np.concatenate(right)
+
+
+def _close_pairs(left, right, phashes, present, max_distance):
+    """Die Paare, deren Bilder höchstens `max_distance` Bit voneinander abweichen."""
+    both = present[left] & present[right]
+    left, right = left[both], right[both]
+    close = _popcount(phashes[left] ^ phashes[right]) <= max_distance
+    return left[close], right[close]
+
+
+def _near_pairs(phashes, present, max_distance, max_block):
+    """Paare fast gleicher Bilder im ganzen Bestand über Teilstücke des Hashes."""
+    positions = np.flatnonzero(present)
+    bands = max_distance + 1
+    width = 64 // bands
+    left, right, skipped = [np.empty(0, np.int64)], [np.empty(0, np.int64)], 0
+    for band in range(bands):
+        start = band * width
+        bits = width if band < bands - 1 else 64 - start
+        part = (phashes[positions] >> np.uint64(64 - start - bits)) & np.uint64((1 << bits) - 1)
+        members, codes, n_skipped = _group_keys(part, np.ones(len(part), dtype=bool), max_block)
+        skipped += n_skipped
+        # Je Teilstück sofort prüfen, damit nur bestätigte Paare im Speicher bleiben
+        a, b = _close_pairs(*_block_pairs(positions[members], codes), phashes, present, max_distance)
+        left.append(a)
+        right.append(b)
+    return np.concatenate(left), np.concatenate(right), skipped
+
+
+def _components(n, left, right):
+    """Zusammenhangskomponenten (kleinster Index je Komponente) über Kanten left-right."""
+    labels = np.arange(n)
+    if len(left) == 0:
+        return labels
+    while True:
+        low = np.minimum(labels[left], labels[right])
+        new = labels.copy()
+        np.minimum.at(new, left, low)
+        np.minimum.at(new, right, low)
+        # Zeigersprünge bis zum Repräsentanten
+        while True:
+            jumped = new[new]
+            if np.array_equal(jumped, new):
+                break
+            new = jumped
+        if np.array_equal(new, labels):
+            return labels
+        labels = new
+
+
+def normalize_column(values):
+    """normalize_key() für eine ganze Spalte; jeder Wert wird nur einmal, ASCII-Werte vektorisiert normalisiert."""
+    codes, uniques = pd.factorize(values.fillna('').astype(str))
+    uniques = pd.Series(uniques)
+    normalized = uniques.str.lower().str.replace(r"\W+", "", regex=True).to_numpy(dtype=object)
+    special = np.flatnonzero(uniques.str.contains(r"[^\x00-\x7f]", regex=True).to_numpy(dtype=bool))
+    for i in special:
+        normalized[i] = normalize_key(uniques.iat[i])
+    return normalized[codes] if len(codes) else np.empty(0, dtype=object)
+
+
+def _metadata_keys(cards, fields, normalized):
+    """(Schlüssel, gültig) je Karte aus den normalisierten Feldern; gültig nur, wenn alle Felder gefüllt sind."""
+    for name in fields:
+        if name not in normalized:
+            normalized[name] = normalize_column(cards[name])
+    parts = [normalized[name] for name in fields]
+    valid = np.logical_and.reduce([part != '' for part in parts])
+    if len(parts) == 1:
+        return parts[0], valid
+    return pd.Series(parts[0]).str.cat([pd.Series(part) for part in parts[1:]], sep='|').to_numpy(), valid
+
+
+def find_duplicates(cards, image_paths=None, hashes=None, max_distance=NEAR_DISTANCE,
+                    block_distance=BLOCK_DISTANCE, max_block=MAX_BLOCK):
+    """Findet doppelte Karten.
+
+    `cards` enthält mindestens Datei und Batch, dazu die Metadatenfelder.
+    `image_paths` (gleiche Länge, relativer Bildpfad oder None) und
+    `hashes` (ImageHashes) aktivieren die bildbasierten Prüfungen.
+    """
+    cards = cards.reset_index(drop=True)
+    n = len(cards)
+    flags = np.zeros(n, dtype=np.int64)
+    edges, skipped, normalized = [], {}, {}
+
+    def add_pairs(reason, left, right):
+        flags[left] |= REASONS[reason]
+        flags[right] |= REASONS[reason]
+        edges.append((left, right))
+
+    def add_groups(reason, positions, codes, n_skipped):
+        if n_skipped:
+            skipped[reason] = skipped.get(reason, 0) + n_skipped
+        add_pairs(reason, *_chain_pairs(positions, codes))
+
+    # Dateinamen sind nur je Batch eindeutig; batchübergreifende Neuscans finden die Bild-Hashes
+    card_keys = cards['Batch'].astype(str).str.cat(cards['Datei'].astype(str), sep='/')
+    add_groups("Datei mehrfach", *_group_keys(card_keys.to_numpy(), np.ones(n, bool), max_block))
+
+    if image_paths is not None and hashes is not None:
+        file_hashes, phashes, present = hashes.lookup(image_paths)
+        # Mehrere Zeilen derselben Karte sind schon "Datei mehrfach"
+        first = (~card_keys.duplicated()).to_numpy() & pd.Series(image_paths, dtype=object).notna().to_numpy()
+        hashed = np.array([h is not None for h in file_hashes], dtype=bool)
+        add_groups("Bilddatei identisch", *_group_keys(np.array(file_hashes, dtype=object), first & hashed, max_block))
+        present = present & first
+        left, right, n_skipped = _near_pairs(phashes, present, max_distance, max_block)
+        if n_skipped:
+            skipped["Bild fast gleich"] = n_skipped
+        add_pairs("Bild fast gleich", left, right)
+        for fields in IMAGE_BLOCKS:
+            if all(name in cards.columns for name in fields):
+                keys, valid = _metadata_keys(cards, fields, normalized)
+                positions, codes, _ = _group_keys(keys, valid & present, max_block)
+                add_pairs("Bild ähnlich", *_close_pairs(*_block_pairs(positions, codes), phashes, present, block_distance))
+
+    for reason, fields in (("Signatur", SIGNATURE_FIELDS), ("Komponist + Titel + Textanfang", WORK_FIELDS)):
+        if all(name in cards.columns for name in fields):
+            add_groups(reason, *_group_keys(*_metadata_keys(cards, fields, normalized), max_block))
+
+    flagged = np.flatnonzero(flags)
+    left = np.concatenate([edge[0] for edge in edges]) if edges else np.empty(0, np.int64)
+    right = np.concatenate([edge[1] for edge in edges]) if edges else np.empty(0, np.int64)
+    labels = _components(n, left, right)[flagged]
+
+    result = cards.iloc[flagged].copy()
+    group_ids, _ = pd.factorize(labels)
+    sizes = np.bincount(group_ids)[group_ids] if len(group_ids) else group_ids
+    result.insert(0, 'Gruppe', group_ids)
+    result.insert(1, 'Größe', sizes)
+    reason_flags = pd.Series(flags[flagged])
+    result.insert(2, 'Gründe', reason_flags.map({
+        value: ", ".join(name for name, bit in REASONS.items() if value & bit) for value in reason_flags.unique()
+    }).to_numpy())
+    # Größte Gruppen zuerst, danach neu nummeriert
+    result = result.sort_values(['Größe', 'Gruppe', 'Batch', 'Datei'], ascending=[False, True, True, True], kind="stable")
+    result['Gruppe'] = pd.factorize(result['Gruppe'])[0] + 1
+    other = [c for c in result.columns if c not in COLUMNS]
+    return DuplicateReport(result[COLUMNS + other].reset_index(drop=True), skipped)
+
+
+def card_image_paths(cards, index):
+    """Relativer Bildpfad je Karte über den Bild-Index (None ohne Bild)."""
+    root = index.root
+    paths = []
+    for batch, datei in zip(cards['Batch'], cards['Datei']):
+        path = index.resolve(batch, datei)
+        paths.append(str(path.relative_to(root)) if path is not None else None)
+    return paths
+
+
+def indexed_image_paths(index):
+    """Relative Pfade aller Bilder des Bild-Index."""
+    return [os.path.join(rel_dir, name) if rel_dir else name for rel_dir, name in index.all_paths()]
+
+
+def main():
+    from qc_core import streaming
+    from qc_core.image_index import ImageIndex
+
+    parser = argparse.ArgumentParser(description="Bild-Hashes aktualisieren und doppelte Karten auflisten")
+    parser.add_argument("csv_dir", help="Verzeichnis mit Batch-CSVs (CSV_DIR)")
+    parser.add_argument("image_dir", help="Bildverzeichnis (IMAGE_BASE_DIR)")
+    parser.add_argument("hash_cache", help="Hash-Datei (DUPLICATE_HASH_PATH)")
+    parser.add_argument("--image-index", help="Bild-Index (IMAGE_INDEX_PATH)")
+    parser.add_argument("--backend", default="csv", help="Speicher-Backend (csv oder parquet)")
+    parser.add_argument("--max-distance", type=int, default=NEAR_DISTANCE, help="Max. Hamming-Distanz fast gleicher Bilder")
+    parser.add_argument("--block-distance", type=int, default=BLOCK_DISTANCE,
+                        help="Max. Hamming-Distanz ähnlicher Bilder innerhalb eines Metadaten-Blocks")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--out", help="CSV mit allen betroffenen Karten")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = ImageIndex(args.image_dir, args.image_index)
+    index.refresh()
+    hashes = ImageHashes(args.image_dir, args.hash_cache, args.workers)
+    hashed = hashes.refresh(indexed_image_paths(index))
+    print(f"{len(hashes):,} Bilder, {hashed:,} neu gehasht ({time.perf_counter() - start:.1f}s)")
+
+    columns = list(dict.fromkeys(['Datei', 'Batch'] + SIGNATURE_FIELDS + WORK_FIELDS))
+    paths = sorted(Path(args.csv_dir).glob("*.csv"))
+    cards = pd.concat(streaming.iter_cards(paths, columns, args.backend), ignore_index=True)
+    report = find_duplicates(cards, card_image_paths(cards, index), hashes, args.max_distance, args.block_distance)
+    print(f"{len(cards):,} Karten, {len(report.cards):,} in {report.groups:,} Duplikatgruppen "
+          f"({time.perf_counter() - start:.1f}s)")
+    for reason, count in report.skipped.items():
+        print(f"  übersprungen ({reason}): {count} Gruppen mit mehr als {MAX_BLOCK} Karten")
+    if args.out:
+        report.cards.to_csv(args.out, index=False, encoding="utf-8-sig")
+
+
+if __name__ == "__main__":
+    main()
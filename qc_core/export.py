@@ -0,0 +1,170 @@
+"""
+Exporte - auf Anfrage erzeugte, je Datenstand gecachte Exportdateien
+
+Exporte werden erst beim Klick erzeugt, blockweise auf Platte geschrieben
+(ohne das Gesamtergebnis als String im Speicher) und unter einem aus dem
+Datenstand abgeleiteten Namen abgelegt. Solange sich die Daten nicht
+ändern, wird dieselbe Datei erneut ausgeliefert.
+"""
+
+import gzip
+import hashlib
+import importlib.util
+import os
+import re
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from qc_core.storage import parquet_available
+
+# Format -> (Bezeichnung, Dateiendung, MIME-Typ)
+EXPORT_FORMATS = {
+    "csv": ("CSV", ".csv", "text/csv"),
+    "csv.gz": ("CSV (gzip)", ".csv.gz", "application/gzip"),
+    "parquet": ("Parquet", ".parquet", "application/vnd.apache.parquet"),
+    "xlsx": ("Excel", ".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+# Zeilen je geschriebenem Block
+CHUNK_ROWS = 50_000
+# Zeilenlimit eines Excel-Tabellenblatts (ohne Kopfzeile)
+XLSX_MAX_ROWS = 1_048_575
+
+
+def _xlsx_engine():
+    for engine in ("xlsxwriter", "openpyxl"):
+        if importlib.util.find_spec(engine) is not None:
+            return engine
+    return None
+
+
+def available_formats():
+    """Exportformate, deren optionale Abhängigkeiten installiert sind."""
+    formats = ["csv", "csv.gz"]
+    if parquet_available():
+        formats.append("parquet")
+    if _xlsx_engine() is not None:
+        formats.append("xlsx")
+    return formats
+
+
+def union_columns(frames):
+    """Spalten aller DataFrames in der Reihenfolge ihres ersten Auftretens."""
+    return list(dict.fromkeys(column for df in frames for column in df.columns))
+
+
+def iter_chunks(frames, columns, chunk_rows=CHUNK_ROWS):
+    """Zerlegt die DataFrames in Blöcke mit einheitlichen Spalten."""
+    for df in frames:
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows].reindex(columns=columns)
+
+
+def _write_csv(chunks, f):
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(f, header=(i == 0), index=False)
+
+
+def _write_parquet(chunks, path, columns):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Alle Spalten als Text, damit Blöcke mit unterschiedlich erkannten Typen zusammenpassen
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            text = chunk.astype("string")
+            writer.write_table(pa.Table.from_pandas(text, schema=schema, preserve_index=False))
+
+
+def _write_xlsx(chunks, path):
+    # Excel-Writer halten die Mappe bis zum Schließen im Speicher; pandas schreibt
+    # spaltenweise, daher kein "constant_memory" von xlsxwriter
+    with pd.ExcelWriter(path, engine=_xlsx_engine()) as writer:
+        row = 0
+        for chunk in chunks:
+            chunk.to_excel(writer, index=False, header=(row == 0), startrow=row + (row > 0))
+            row += len(chunk)
+
+
+def _counted(chunks, counter, max_rows=None):
+    """Zählt die Zeilen der durchgereichten Blöcke und bricht bei Überschreitung ab."""
+    for chunk in chunks:
+        counter[0] += len(chunk)
+        if max_rows is not None and counter[0] > max_rows:
+            raise ValueError(f"Excel unterstützt höchstens {max_rows:,} Zeilen")
+        yield chunk
+
+
+def write_export(frames, path, fmt, columns=None):
+    """Schreibt die DataFrames blockweise in eine Exportdatei und gibt die Zeilenzahl zurück.
+
+    `frames` darf ein Generator sein (z.B. blockweise gelesene Batches),
+    sofern `columns` angegeben ist.
+    """
+    if columns is None:
+        frames = list(frames)
+        columns = union_columns(frames)
+    counter = [0]
+    chunks = _counted(iter_chunks(frames, columns), counter, XLSX_MAX_ROWS if fmt == "xlsx" else None)
+    if fmt == "csv":
+        with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            _write_csv(chunks, f)
+    elif fmt == "csv.gz":
+        with gzip.open(path, "wt", encoding="utf-8-sig", newline="") as f:
+            _write_csv(chunks, f)
+    elif fmt == "parquet":
+        _write_parquet(chunks, path, columns)
+    elif fmt == "xlsx":
+        _write_xlsx(chunks, path)
+    else:
+        raise ValueError(f"Unbekanntes Exportformat: {fmt!r}")
+    return counter[0]
+
+
+class ExportCache:
+    """Exportdateien je (Name, Datenstand, Format) in einem Verzeichnis."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def path_for(self, name, version, fmt):
+        """Dateipfad eines Exports; `version` ist ein beliebiger hashbarer Datenstand."""
+        digest = hashlib.sha1(repr(version).encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"{name}-{digest}{EXPORT_FORMATS[fmt][1]}"
+
+    def _lock(self, path):
+        with self._guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def get(self, name, version, fmt, frames_func, columns=None):
+        """Pfad des Exports; wird nur erzeugt, wenn er für diesen Datenstand noch fehlt.
+
+        `frames_func()` liefert die zu exportierenden DataFrames (z.B. je
+        Batch eines) und wird nur beim Erzeugen aufgerufen; ebenso
+        `columns`, falls als Funktion übergeben.
+        """
+        path = self.path_for(name, version, fmt)
+        with self._lock(path):
+            if path.exists():
+                return path
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Temporärer Name mit gleicher Endung (Excel-/Parquet-Writer erkennen das Format daran)
+            tmp = path.with_name(f".{path.name}")
+            try:
+                write_export(frames_func(), tmp, fmt, columns() if callable(columns) else columns)
+                os.replace(tmp, path)
+            finally:
+                tmp.unlink(missing_ok=True)
+            self._remove_outdated(name, fmt, keep=path)
+        return path
+
+    def _remove_outdated(self, name, fmt, keep):
+        """Entfernt Exporte älterer Datenstände desselben Namens und Formats."""
+        pattern = re.compile(re.escape(name) + r"-[0-9a-f]{16}" + re.escape(EXPORT_FORMATS[fmt][1]))
+        for old in self.cache_dir.glob(f"{name}-*"):
+            if old != keep and pattern.fullmatch(old.name):
+                old.unlink(missing_ok=True)
@@ -0,0 +1,265 @@
+"""
+Fehlertolerante Suche - Trigramm-Index über OCR-Werte
+
+Findet Schreibvarianten mit begrenzter Editierdistanz ("Schuberl" und
+"Sch ubert" für "Schubert"). Indiziert werden je Feld die Wörter und
+die Verbindung zweier benachbarter Wörter (gegen von der OCR eingefügte
+Leerzeichen) für die Suche sowie kurze Gesamtwerte, über die derselbe
+Index ähnliche Schreibweisen eines Feldwerts findet (Near-Duplicates).
+"""
+
+import pickle
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from qc_core.search import build_postings, fold, parse_query, tokenize
+
+INDEX_VERSION = 1
+NGRAM = 3
+# Wörter kürzer als MIN_FUZZY_LENGTH werden nur exakt gesucht
+MIN_FUZZY_LENGTH = 4
+# Gesamtwerte bis zu dieser Länge werden für ähnliche Werte indiziert
+MAX_VALUE_LENGTH = 60
+# Höchstzahl geprüfter Kandidaten je Suchwort (nach Trigramm-Übereinstimmung)
+MAX_CANDIDATES = 3000
+
+try:
+    from rapidfuzz.distance import Levenshtein as _rf_levenshtein
+except ImportError:
+    _rf_levenshtein = None
+
+
+def levenshtein(a, b, max_distance=None):
+    """Editierdistanz; bricht ab, sobald `max_distance` sicher überschritten ist."""
+    if _rf_levenshtein is not None:
+        return _rf_levenshtein.distance(a, b, score_cutoff=max_distance)
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def allowed_distance(token, max_distance):
+    """Zulässige Distanz je Wortlänge (kurze Wörter tolerieren weniger Fehler)."""
+    if len(token) < MIN_FUZZY_LENGTH:
+        return 0
+    if len(token) < 7:
+        return min(1, max_distance)
+    return max_distance
+
+
+def normalized_value(text):
+    """Vergleichsform eines ganzen Feldwerts ("Schubert,  Franz" -> "schubert franz")."""
+    return " ".join(tokenize(fold(text)))
+
+
+def fuzzy_terms(text):
+    """Suchbegriffe eines Werts: Wörter und verbundene Nachbarwörter."""
+    tokens = tokenize(fold(text))
+    terms = set(tokens)
+    for left, right in zip(tokens, tokens[1:]):
+        if left.isalpha() and right.isalpha():
+            terms.add(left + right)
+    return terms
+
+
+def value_terms(text):
+    """Gesamtwert als einziger Begriff (nur kurze Werte)."""
+    value = normalized_value(text)
+    return {value} if 0 < len(value) <= MAX_VALUE_LENGTH else set()
+
+
+def ngrams(term):
+    """Trigramme mit Randmarkierung."""
+    padded = f"^{term}$"
+    return {padded[i:i + NGRAM] for i in range(len(padded) - NGRAM + 1)}
+
+
+def merge_split_words(terms):
+    """Fügt durch OCR getrennte Wortteile der Anfrage zusammen ("Sch ubert" -> "schubert").
+
+    Zusammengefügt werden benachbarte Buchstabenfolgen ab zwei Zeichen,
+    von denen mindestens eine für die Fehlertoleranz zu kurz ist.
+    """
+    merged = []
+    for target, variants in terms:
+        token = variants[0]
+        if merged:
+            prev_target, prev = merged[-1]
+            if (
+                prev_target == target and prev.isalpha() and token.isalpha()
+                and min(len(prev), len(token)) >= 2
+                and min(len(prev), len(token)) < MIN_FUZZY_LENGTH
+            ):
+                merged[-1] = (target, prev + token)
+                continue
+        merged.append((target, token))
+    return merged
+
+
+@dataclass
+class FuzzyIndex:
+    """Trigramm-Index über das gemeinsame Begriffsvokabular aller Felder."""
+    n_rows: int
+    terms: list = field(default_factory=list)
+    term_lengths: np.ndarray = None
+    grams: dict = field(default_factory=dict)
+    # Feld -> {Begriffs-ID: Zeilen} für Suchbegriffe bzw. Gesamtwerte
+    postings: dict = field(default_factory=dict)
+    values: dict = field(default_factory=dict)
+    signature: tuple = None
+
+    @classmethod
+    def build(cls, df, fields, signature=None):
+        """Baut den Index über die gegebenen Spalten eines DataFrames."""
+        index = cls(n_rows=len(df), signature=signature)
+        field_terms, field_values = {}, {}
+        for name in fields:
+            if name in df.columns:
+                field_terms[name] = build_postings(df[name], fuzzy_terms)
+                field_values[name] = build_postings(df[name], value_terms)
+
+        all_terms = sorted({
+            term for built in (field_terms, field_values)
+            for vocab, _ in built.values() for term in vocab
+        })
+        term_ids = {term: i for i, term in enumerate(all_terms)}
+        index.terms = all_terms
+        index.term_lengths = np.fromiter((len(t) for t in all_terms), dtype=np.int32, count=len(all_terms))
+        for target, built in ((index.postings, field_terms), (index.values, field_values)):
+            for name, (vocab, postings) in built.items():
+                target[name] = {term_ids[term]: rows for term, rows in zip(vocab, postings)}
+
+        # Trigramm -> Begriffs-IDs
+        gram_list, id_list = [], []
+        for term_id, term in enumerate(all_terms):
+            for gram in ngrams(term):
+                gram_list.append(gram)
+                id_list.append(term_id)
+        if gram_list:
+            gram_codes, gram_vocab = pd.factorize(pd.Series(gram_list))
+            ids = np.asarray(id_list, dtype=np.int32)
+            order = np.argsort(gram_codes, kind="stable")
+            boundaries = np.flatnonzero(np.diff(gram_codes[order])) + 1
+            index.grams = dict(zip(gram_vocab, np.split(ids[order], boundaries)))
+        return index
+
+    def similar_terms(self, token, max_distance):
+        """(Begriffs-ID, Distanz) aller Begriffe innerhalb der Distanz, aufsteigend sortiert."""
+        query_grams = [self.grams[g] for g in ngrams(token) if g in self.grams]
+        if not query_grams:
+            return []
+        counts = np.bincount(np.concatenate(query_grams), minlength=len(self.terms))
+        # q-Gramm-Lemma: jede Editieroperation zerstört höchstens NGRAM Trigramme
+        needed = max(1, len(ngrams(token)) - NGRAM * max_distance)
+        length_ok = np.abs(self.term_lengths - len(token)) <= max_distance
+        candidates = np.flatnonzero((counts >= needed) & length_ok)
+        if len(candidates) > MAX_CANDIDATES:
+            candidates = candidates[np.argsort(-counts[candidates], kind="stable")[:MAX_CANDIDATES]]
+
+        matches = []
+        for term_id in candidates:
+            distance = levenshtein(token, self.terms[term_id], max_distance)
+            if distance <= max_distance:
+                matches.append((int(term_id), distance))
+        matches.sort(key=lambda m: m[1])
+        return matches
+
+    def search(self, query, max_distance=2, limit=None):
+        """(Zeilenpositionen, Punkte) der Treffer absteigend nach Ähnlichkeit.
+
+        Jedes Suchwort muss (fehlertolerant) vorkommen; ein Treffer mit
+        Distanz d bringt 1 / (1 + d) Punkte.
+        """
+        terms = parse_query(query, list(self.postings))
+        if not terms:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+
+        total = np.zeros(self.n_rows, dtype=np.float32)
+        matched = np.ones(self.n_rows, dtype=bool)
+        for target, token in merge_split_words(terms):
+            term_scores = np.zeros(self.n_rows, dtype=np.float32)
+            similar = self.similar_terms(token, allowed_distance(token, max_distance))
+            for name, postings in self.postings.items():
+                if target is not None and name != target:
+                    continue
+                for term_id, distance in similar:
+                    rows = postings.get(term_id)
+                    if rows is not None:
+                        np.maximum.at(term_scores, rows, 1.0 / (1 + distance))
+            matched &= term_scores > 0
+            total += term_scores
+
+        hits = np.flatnonzero(matched)
+        order = np.argsort(-total[hits], kind="stable")
+        hits = hits[order]
+        if limit:
+            hits = hits[:limit]
+        return hits, total[hits]
+
+    def similar_values(self, value, field_name=None, max_distance=2):
+        """Ähnliche Gesamtwerte eines Werts je Feld.
+
+        Gibt eine Liste (Feld, Begriffs-ID, Distanz, Zeilen) zurück; die
+        Originalschreibweise lässt sich über die erste Zeile ermitteln.
+        """
+        target = normalized_value(value)
+        if not target:
+            return []
+        results = []
+        for term_id, distance in self.similar_terms(target, allowed_distance(target, max_distance)):
+            for name, values in self.values.items():
+                if field_name is not None and name != field_name:
+                    continue
+                rows = values.get(term_id)
+                if rows is not None:
+                    results.append((name, term_id, distance, rows))
+        return results
+
+    def near_duplicates(self, field_name, max_distance=2, min_length=MIN_FUZZY_LENGTH):
+        """Paare ähnlicher, aber nicht identischer Gesamtwerte eines Felds.
+
+        Gibt eine Liste (Wert A, Wert B, Distanz, Karten A, Karten B)
+        zurück, häufigere Schreibweise zuerst.
+        """
+        postings = self.values.get(field_name, {})
+        pairs = []
+        for term_id, rows in postings.items():
+            term = self.terms[term_id]
+            if len(term) < min_length:
+                continue
+            for other_id, distance in self.similar_terms(term, allowed_distance(term, max_distance)):
+                if other_id <= term_id or other_id not in postings or distance == 0:
+                    continue
+                a, b = (term_id, other_id) if len(rows) >= len(postings[other_id]) else (other_id, term_id)
+                pairs.append((self.terms[a], self.terms[b], distance, len(postings[a]), len(postings[b])))
+        pairs.sort(key=lambda p: (p[2], -p[3] - p[4]))
+        return pairs
+
+    def save(self, path):
+        """Speichert den Index (Pickle) für den nächsten Start."""
+        with open(path, "wb") as f:
+            pickle.dump((INDEX_VERSION, self), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path, signature=None):
+        """Lädt einen gespeicherten Index; None, falls veraltet oder nicht vorhanden."""
+        try:
+            with open(path, "rb") as f:
+                version, index = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return None
+        if version != INDEX_VERSION or (signature is not None and index.signature != signature):
+            return None
+        return index
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Bild-Index - Dateiname -> Pfad für den gesamten Bildordner
+
+Der Index wird einmal durch Scannen von IMAGE_BASE_DIR aufgebaut und als
+JSON gespeichert. Beim Aktualisieren wird je Verzeichnis nur die mtime
+geprüft; nur geänderte Verzeichnisse werden neu gelesen. Zu jeder Datei
+werden mtime und Größe aus dem Scan gemerkt, damit Abfragen (z.B. für
+Cache-Schlüssel) kein eigenes stat() brauchen.
+
+Bericht über fehlende und verwaiste Bilder (über alle Batch-CSVs):
+    python -m qc_core.image_index IMAGE_BASE_DIR INDEX_PATH --csv-dir CSV_DIR
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from qc_core.previews import IMAGE_EXTENSIONS
+
+INDEX_VERSION = 2
+
+
+class ImageIndex:
+    """Dateiname -> Pfad-Index eines Bildordners mit inkrementeller Aktualisierung."""
+
+    def __init__(self, root, index_path=None):
+        self.root = Path(root)
+        self.index_path = Path(index_path) if index_path else None
+        # relatives Verzeichnis -> {"mtime_ns", "dirs", "files": {Dateiname: [mtime_ns, Größe]}}
+        self._dirs = {}
+        self._by_name = {}
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self.last_refresh = 0.0
+        self.load()
+
+    # --- Persistenz ---
+
+    def load(self):
+        """Lädt einen gespeicherten Index, sofern er zum Bildordner passt."""
+        if self.index_path is None or not self.index_path.exists():
+            return False
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+        if data.get("version") != INDEX_VERSION or data.get("root") != str(self.root.resolve()):
+            return False
+        with self._lock:
+            self._dirs = data["dirs"]
+            self._rebuild_names()
+        return True
+
+    def save(self):
+        """Speichert den Index atomar."""
+        if self.index_path is None:
+            return
+        with self._lock:
+            data = {"version": INDEX_VERSION, "root": str(self.root.resolve()), "dirs": self._dirs}
+            payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_name(f"{self.index_path.name}.tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+    # --- Aufbau ---
+
+    def _rebuild_names(self):
+        by_name = {}
+        for rel_dir, entry in self._dirs.items():
+            for name in entry["files"]:
+                by_name.setdefault(name, []).append(rel_dir)
+        self._by_name = by_name
+
+    def refresh(self):
+        """Aktualisiert den Index; gibt die Anzahl neu gelesener Verzeichnisse zurück.
+
+        Unveränderte Verzeichnisse kosten nur ein stat(), neue
+        Unterverzeichnisse werden über die geänderte mtime des
+        Elternverzeichnisses erkannt.
+        """
+        if not self.root.exists():
+            return 0
+        with self._lock:
+            old_dirs = dict(self._dirs)
+        new_dirs = {}
+        rescanned = 0
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            abs_dir = self.root / rel_dir
+            try:
+                mtime = os.stat(abs_dir).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            entry = old_dirs.get(rel_dir)
+            if entry is None or entry["mtime_ns"] != mtime:
+                entry = self._scan_dir(abs_dir, rel_dir, mtime)
+                rescanned += 1
+            new_dirs[rel_dir] = entry
+            stack.extend(entry["dirs"])
+
+        with self._lock:
+            changed = rescanned > 0 or new_dirs.keys() != old_dirs.keys()
+            self._dirs = new_dirs
+            if changed:
+                self._rebuild_names()
+            self.last_refresh = time.time()
+        if changed:
+            self.save()
+        return rescanned
+
+    def _scan_dir(self, abs_dir, rel_dir, mtime):
+        dirs, files = [], {}
+        with os.scandir(abs_dir) as it:
+            for item in it:
+                if item.is_dir(follow_symlinks=False):
+                    dirs.append(os.path.join(rel_dir, item.name) if rel_dir else item.name)
+                elif Path(item.name).suffix.lower() in IMAGE_EXTENSIONS:
+                    try:
+                        st = item.stat()
+                    except FileNotFoundError:
+                        continue
+                    files[item.name] = [st.st_mtime_ns, st.st_size]
+        return {"mtime_ns": mtime, "dirs": dirs, "files": files}
+
+    def refresh_in_background(self, max_age):
+        """Startet refresh() in einem Thread, wenn der Index älter als `max_age` Sekunden ist."""
+        with self._lock:
+            if self._refreshing or time.time() - self.last_refresh < max_age:
+                return False
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="image-index-refresh", daemon=True).start()
+        return True
+
+    # --- Abfragen ---
+
+    def __len__(self):
+        return sum(len(paths) for paths in self._by_name.values())
+
+    def filenames(self):
+        """Alle indizierten Dateinamen."""
+        return set(self._by_name)
+
+    def _rel_dir(self, batch, filename):
+        rel_dirs = self._by_name.get(filename)
+        if not rel_dirs:
+            return None
+        for preferred in (batch, ""):
+            if preferred in rel_dirs:
+                return preferred
+        return rel_dirs[0]
+
+    def resolve(self, batch, filename):
+        """Pfad einer Bilddatei; bevorzugt `<root>/<batch>/`, dann `<root>/`, dann beliebige Fundstelle."""
+        rel_dir = self._rel_dir(batch, filename)
+        return self.root / rel_dir / filename if rel_dir is not None else None
+
+    def lookup(self, batch, filename):
+        """(Pfad, mtime_ns, Größe) einer Bilddatei wie resolve(), Stand des letzten Scans; None, wenn nicht indiziert.
+
+        Wird eine Datei an Ort und Stelle überschrieben (ohne neue mtime des
+        Verzeichnisses), gilt der alte Stand bis zum nächsten Neueinlesen.
+        """
+        rel_dir = self._rel_dir(batch, filename)
+        if rel_dir is None:
+            return None
+        entry = self._dirs.get(rel_dir)
+        stat = entry["files"].get(filename) if entry is not None else None
+        if stat is None:
+            return None
+        return (self.root / rel_dir / filename, *stat)
+
+    def all_paths(self):
+        """(relatives Verzeichnis, Dateiname) aller indizierten Bilder."""
+        return [(rel_dir, name) for name, rel_dirs in self._by_name.items() for rel_dir in rel_dirs]
+
+
+def coverage_report(index, df, resolve=None):
+    """Vergleicht CSV-Zeilen mit dem Bild-Index.
+
+    Gibt (Karten ohne Bild, Bilder ohne CSV-Zeile) als DataFrames zurück.
+    `resolve(batch, filename)` wird nur für Karten aufgerufen, die nicht im
+    Index stehen (z.B. für Ausweichpfade außerhalb des Bildordners).
+    """
+    names = index.filenames()
+    datei = df['Datei'].astype(str)
+    missing = df.loc[~datei.isin(names), [c for c in ('Datei', 'Batch') if c in df.columns]]
+    if resolve is not None and len(missing) > 0:
+        batches = missing['Batch'] if 'Batch' in missing.columns else pd.Series('', index=missing.index)
+        found = [resolve(b, f) is not None for b, f in zip(batches, missing['Datei'])]
+        missing = missing[[not hit for hit in found]]
+
+    known = set(datei)
+    orphans = pd.DataFrame(
+        [(rel_dir, name) for rel_dir, name in index.all_paths() if name not in known],
+        columns=['Verzeichnis', 'Datei'],
+    )
+    return missing.reset_index(drop=True), orphans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bild-Index aufbauen und Abdeckungsbericht erstellen")
+    parser.add_argument("image_dir", help="Bildverzeichnis (IMAGE_BASE_DIR)")
+    parser.add_argument("index_path", help="Index-Datei (IMAGE_INDEX_PATH)")
+    parser.add_argument("--csv-dir", help="Verzeichnis mit Batch-CSVs (CSV_DIR) für den Bericht")
+    parser.add_argument("--out", default=".", help="Zielverzeichnis für die Bericht-CSVs")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = ImageIndex(args.image_dir, args.index_path)
+    rescanned = index.refresh()
+    print(f"{len(index)} Bilder indiziert, {rescanned} Verzeichnisse gelesen ({time.perf_counter() - start:.1f}s)")
+
+    if args.csv_dir:
+        # Nur Datei/Batch jeder Batch-CSV; fehlt die Spalte Batch, gilt der Dateiname
+        frames = []
+        for path in sorted(Path(args.csv_dir).glob("*.csv")):
+            df = pd.read_csv(path, encoding="utf-8-sig", usecols=lambda c: c in ('Datei', 'Batch'))
+            frames.append(df if 'Batch' in df.columns else df.assign(Batch=path.stem))
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['Datei', 'Batch'])
+        missing, orphans = coverage_report(index, df)
+        out = Path(args.out)
+        missing.to_csv(out / "cards_without_image.csv", index=False, encoding="utf-8-sig")
+        orphans.to_csv(out / "images_without_card.csv", index=False, encoding="utf-8-sig")
+        print(f"{len(missing)} Karten ohne Bild, {len(orphans)} Bilder ohne CSV-Zeile")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Korrektur-Journal - inkrementelles Speichern einzelner Karten je Batch
+
+Jede Korrektur wird als JSON-Zeile an `<batch>.journal.jsonl` neben der
+Batch-CSV angehängt. Das Journal wird beim Laden über die CSV gelegt und
+bei Bedarf (oder im Hintergrund ab COMPACT_THRESHOLD Einträgen) in die
+CSV übernommen.
+
+Schreibzugriffe sind je Batch gesperrt: prozessintern über Thread-Locks,
+prozessübergreifend (mehrere Server, Kommandozeile) zusätzlich über
+`flock` auf `<batch>.<zweck>.lock`. Geladene Batches merken sich ihre
+Journal-Position und lesen später nur die neu angehängten Zeilen nach.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from qc_core.storage import iter_table, read_table, write_table
+
+try:
+    import fcntl
+except ImportError:  # Windows: nur prozessinterne Locks
+    fcntl = None
+
+# Ab so vielen Journal-Einträgen wird automatisch im Hintergrund kompaktiert
+COMPACT_THRESHOLD = 200
+
+_locks = {}
+_locks_guard = threading.Lock()
+_running = set()
+
+
+def _lock_for(csv_path, purpose="append"):
+    """Gibt einen Prozess-weiten Lock je Batch-CSV und Zweck zurück."""
+    key = (str(Path(csv_path).resolve()), purpose)
+    with _locks_guard:
+        if key not in _locks:
+            _locks[key] = threading.Lock()
+        return _locks[key]
+
+
+@contextmanager
+def locked(csv_path, purpose="append"):
+    """Sperrt einen Batch für einen Zweck, auch gegenüber anderen Prozessen."""
+    csv_path = Path(csv_path)
+    with _lock_for(csv_path, purpose):
+        if fcntl is None:
+            yield
+            return
+        with open(csv_path.with_name(f"{csv_path.stem}.{purpose}.lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def journal_path(csv_path):
+    """Pfad des Journals zu einer Batch-CSV."""
+    csv_path = Path(csv_path)
+    return csv_path.with_name(f"{csv_path.stem}.journal.jsonl")
+
+
+def pending_path(csv_path):
+    """Pfad des Journals, das gerade in die CSV übernommen wird."""
+    csv_path = Path(csv_path)
+    return csv_path.with_name(f"{csv_path.stem}.journal.compacting")
+
+
+def _parse_lines(data):
+    entries = []
+    for line in data.decode("utf-8").splitlines():
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return entries
+
+
+def _read_lines(path):
+    """Liest Journal-Einträge; unvollständige Zeilen (Absturz) werden übersprungen."""
+    try:
+        with open(path, "rb") as f:
+            return _parse_lines(f.read())
+    except FileNotFoundError:
+        return []
+
+
+def read_since(csv_path, position):
+    """Neu angehängte Einträge seit einer Journal-Position.
+
+    Eine Position ist (Inode, Byte-Offset) des Journals oder None, wenn es
+    noch keins gab. Gibt (Einträge, neue Position) zurück; gelesen werden
+    nur vollständige Zeilen. Wurde das Journal inzwischen in die CSV
+    übernommen (andere Datei), ist das Ergebnis (None, None) - der Batch
+    muss dann neu geladen werden.
+    """
+    path = journal_path(csv_path)
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return ([], None) if position is None or position[1] == 0 else (None, None)
+    with f:
+        inode = os.fstat(f.fileno()).st_ino
+        if position is not None and position[0] != inode:
+            return None, None
+        offset = position[1] if position is not None else 0
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    return _parse_lines(data[:end]), (inode, offset + end)
+
+
+def journal_changed(csv_path, position):
+    """Schnelle Prüfung (ein stat), ob seit einer Position etwas angehängt oder übernommen wurde."""
+    try:
+        st = os.stat(journal_path(csv_path))
+    except FileNotFoundError:
+        return position is not None and position[1] > 0
+    return position is None or (st.st_ino, st.st_size) != position
+
+
+def read_journal(csv_path):
+    """Alle noch nicht in die CSV übernommenen Einträge in Schreibreihenfolge."""
+    return _read_lines(pending_path(csv_path)) + _read_lines(journal_path(csv_path))
+
+
+def journal_size(csv_path):
+    """Anzahl offener Journal-Einträge."""
+    return len(read_journal(csv_path))
+
+
+def append_edits(csv_path, edits):
+    """Hängt Korrekturen mehrerer Karten in einem Schreibvorgang an.
+
+    `edits` ist eine Liste von (Zeile, Datei, Änderungen); gibt die
+    Einträge zurück.
+    """
+    with locked(csv_path):
+        return write_edits(csv_path, edits)[0]
+
+
+def write_edits(csv_path, edits):
+    """Wie append_edits(), aber ohne eigene Sperre (Aufrufer hält locked()).
+
+    Gibt (Einträge, Journal-Position nach dem Schreiben) zurück.
+    """
+    ts = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    entries = [
+        {"ts": ts, "row": int(row), "Datei": datei, "changes": changes}
+        for row, datei, changes in edits
+    ]
+    lines = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+    with open(journal_path(csv_path), "ab") as f:
+        f.write(lines.encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+        position = (os.fstat(f.fileno()).st_ino, f.tell())
+    return entries, position
+
+
+def resolve_row(df, entry):
+    """Findet die Zeile eines Eintrags ({"row", "Datei"}); fällt auf `Datei` zurück, falls sich die Reihenfolge geändert hat."""
+    row = entry.get("row")
+    datei = entry.get("Datei")
+    if row is not None and row in df.index and ('Datei' not in df.columns or df.at[row, 'Datei'] == datei):
+        return row
+    if 'Datei' in df.columns:
+        matches = df.index[df['Datei'] == datei]
+        if len(matches) > 0:
+            return matches[0]
+    return None
+
+
+def apply_edits(df, entries):
+    """Überträgt Journal-Einträge direkt in das DataFrame und gibt die geänderten Zeilen zurück."""
+    touched = []
+    for entry in entries:
+        row = resolve_row(df, entry)
+        if row is None:
+            continue
+        for field, value in entry.get("changes", {}).items():
+            if field not in df.columns:
+                df[field] = pd.Series(pd.NA, index=df.index, dtype=object)
+            elif not pd.api.types.is_string_dtype(df[field].dtype):
+                df[field] = df[field].astype(object)
+            df.at[row, field] = value
+        touched.append(row)
+    return touched
+
+
+def load_with_journal(csv_path, backend="csv"):
+    """Lädt eine Batch-CSV und legt offene Journal-Einträge darüber."""
+    return load_with_position(csv_path, backend)[0]
+
+
+def load_with_position(csv_path, backend="csv"):
+    """Wie load_with_journal(); gibt zusätzlich die Journal-Position für read_since() zurück."""
+    with locked(csv_path, "compact"):
+        df = read_table(csv_path, backend=backend)
+        with locked(csv_path):
+            entries, position = read_since(csv_path, None)
+            entries = _read_lines(pending_path(csv_path)) + entries
+    apply_edits(df, entries)
+    return df, position
+
+
+def _resolve_rows(csv_path, entries, chunksize, backend):
+    """Wie resolve_row() für alle Einträge, aber blockweise über die ganze Tabelle.
+
+    Gelesen wird nur die Spalte Datei. Einträge, deren Zeile nicht mehr zur
+    Datei passt (CSV umsortiert oder neu geschrieben), bekommen die erste
+    Zeile mit dieser Datei; nicht auffindbare Einträge entfallen - wie beim
+    Laden des ganzen Batches.
+    """
+    wanted = {entry.get("Datei") for entry in entries}
+    rows = {entry.get("row") for entry in entries}
+    datei_at, first_row = {}, {}
+    for chunk in iter_table(csv_path, ['Datei'], chunksize, backend):
+        if 'Datei' not in chunk.columns:
+            return entries
+        datei = chunk['Datei']
+        datei_at.update(datei[datei.index.isin(rows)].items())
+        for label, name in datei[datei.isin(wanted)].items():
+            first_row.setdefault(name, label)
+    resolved = []
+    for entry in entries:
+        row, name = entry.get("row"), entry.get("Datei")
+        if row in datei_at and datei_at[row] == name:
+            resolved.append(entry)
+        elif name in first_row:
+            resolved.append({**entry, "row": int(first_row[name])})
+    return resolved
+
+
+def iter_with_journal(csv_path, columns=None, chunksize=100_000, backend="csv"):
+    """Liest eine Batch-CSV blockweise und legt offene Journal-Einträge über jeden Block.
+
+    Die Einträge werden vorab über die ganze Tabelle ihrer Zeile zugeordnet
+    (_resolve_rows), damit blockweises und vollständiges Laden dasselbe
+    Ergebnis liefern; danach erhält jeder Block die Einträge seiner Zeilen.
+    Bei Spaltenauswahl werden nur Änderungen an gelesenen Spalten übernommen.
+    """
+    entries = read_journal(csv_path)
+    if entries:
+        entries = _resolve_rows(csv_path, entries, chunksize, backend)
+    for chunk in iter_table(csv_path, columns, chunksize, backend):
+        if entries and len(chunk) > 0:
+            first, last = chunk.index[0], chunk.index[-1]
+            in_chunk = [e for e in entries if first <= e.get("row", -1) <= last]
+            if columns is not None:
+                in_chunk = [
+                    {**e, "changes": {k: v for k, v in e.get("changes", {}).items() if k in chunk.columns}}
+                    for e in in_chunk
+                ]
+            apply_edits(chunk, in_chunk)
+        yield chunk
+
+
+def compact(csv_path, backend="csv"):
+    """Übernimmt das Journal atomar in die CSV und gibt die Anzahl übernommener Einträge zurück.
+
+    Das Journal wird zuerst umbenannt, damit parallel gespeicherte
+    Korrekturen in einem neuen Journal landen. Bricht der Vorgang ab,
+    wird die umbenannte Datei beim nächsten Laden bzw. Kompaktieren
+    erneut angewendet (das Setzen von Werten ist idempotent).
+    """
+    # Lokaler Import: batch_stats nutzt selbst die Journal-Pfade
+    from qc_core.batch_stats import batch_signature, restamp_sidecar
+
+    csv_path = Path(csv_path)
+    with locked(csv_path, "compact"):
+        before = batch_signature(csv_path)
+        journal, pending = journal_path(csv_path), pending_path(csv_path)
+        with locked(csv_path):
+            if journal.exists() and not pending.exists():
+                os.replace(journal, pending)
+        entries = _read_lines(pending)
+        if not entries:
+            pending.unlink(missing_ok=True)
+            return 0
+
+        df = read_table(csv_path, backend=backend)
+        apply_edits(df, entries)
+        write_table(df, csv_path, backend=backend)
+        pending.unlink(missing_ok=True)
+        # Inhalt unverändert - Statistik-Sidecar gilt weiter
+        restamp_sidecar(csv_path, before)
+        return len(entries)
+
+
+def compact_in_background(csv_path, backend="csv"):
+    """Startet compact() in einem Hintergrund-Thread, sofern nicht bereits aktiv."""
+    key = str(Path(csv_path).resolve())
+    with _locks_guard:
+        if key in _running:
+            return False
+        _running.add(key)
+
+    def run():
+        try:
+            compact(csv_path, backend)
+        finally:
+            with _locks_guard:
+                _running.discard(key)
+
+    threading.Thread(target=run, name=f"compact-{Path(csv_path).stem}", daemon=True).start()
+    return True
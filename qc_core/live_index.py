@@ -0,0 +1,203 @@
+"""
+Suchindex über den Gesamtbestand mit Nachträgen für geänderte Batches
+
+Invertierter Index und Trigramm-Index nach jeder Korrektur komplett neu
+zu bauen, wäre zu teuer. LiveIndex hält den zuletzt gebauten Index
+(Basis) mit dem Layout, auf das sich seine Positionen beziehen. Batches,
+deren Signatur sich seitdem geändert hat, bekommen einen eigenen kleinen
+Index (Nachtrag); ihre Zeilen im Basisindex werden ausgeblendet.
+
+    gleiche Zeilenzahl   Nachtrag an derselben Stelle des Layouts
+    andere Zeilenzahl    alter Abschnitt ausgeblendet, Batch hinten angehängt
+    neuer Batch          hinten angehängt
+    entfernter Batch     Abschnitt ausgeblendet
+
+Sind mehr als `max_overlays` Batches betroffen, wird die Basis im
+Hintergrund neu gebaut; bis dahin wird weiter mit Nachträgen gesucht.
+Treffer werden über das Layout des jeweiligen Stands (IndexState.layout)
+mit MasterView.take() geholt.
+"""
+
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from qc_core.master import Layout
+
+# Ab so vielen geänderten Batches wird die Basis neu gebaut - BEI BEDARF ANPASSEN
+MAX_OVERLAYS = 16
+
+
+@dataclass(frozen=True)
+class IndexState:
+    """Stand des Index zu einem Zeitpunkt: Basis, ausgeblendete Bereiche und Nachträge."""
+    base: object
+    layout: Layout
+    # (Startposition, Zeilenzahl) der ausgeblendeten Bereiche der Basis
+    hidden: tuple = ()
+    # (Startposition, Index) je Nachtrag
+    overlays: tuple = ()
+    version: tuple = ()
+
+    def _visible(self, rows):
+        """Positionen der Basis ohne die ausgeblendeten Bereiche (als Maske)."""
+        keep = np.ones(len(rows), dtype=bool)
+        for start, n_rows in self.hidden:
+            keep &= (rows < start) | (rows >= start + n_rows)
+        return keep
+
+    def search(self, func):
+        """(Positionen, Punkte) über Basis und Nachträge.
+
+        `func(index)` sucht in einem einzelnen Index und liefert
+        (Positionen, Punkte), z.B. SearchIndex.search(..., with_scores=True).
+        Sortiert wird nach Punkten, bei Gleichstand nach Position.
+        """
+        hits, scores = func(self.base)
+        keep = self._visible(hits)
+        all_hits, all_scores = [hits[keep]], [scores[keep]]
+        for start, index in self.overlays:
+            hits, scores = func(index)
+            all_hits.append(hits + start)
+            all_scores.append(scores)
+        hits = np.concatenate(all_hits).astype(np.int64)
+        scores = np.concatenate(all_scores)
+        order = np.lexsort((hits, -scores))
+        return hits[order], scores[order]
+
+    def similar_values(self, value, max_distance=2):
+        """Wie FuzzyIndex.similar_values() über Basis und Nachträge.
+
+        Gibt eine Liste (Feld, Begriff, Distanz, Positionen) nach Distanz
+        zurück; Positionen desselben Begriffs werden zusammengeführt.
+        """
+        merged = {}
+        for start, index in ((None, self.base),) + self.overlays:
+            for name, term_id, distance, rows in index.similar_values(value, max_distance=max_distance):
+                rows = np.asarray(rows, dtype=np.int64)
+                rows = rows[self._visible(rows)] if start is None else rows + start
+                if len(rows):
+                    merged.setdefault((name, index.terms[term_id], distance), []).append(rows)
+        results = [
+            (name, term, distance, np.sort(np.concatenate(parts)))
+            for (name, term, distance), parts in merged.items()
+        ]
+        results.sort(key=lambda r: r[2])
+        return results
+
+
+class LiveIndex:
+    """Basisindex mit Nachträgen je geändertem Batch (thread-sicher).
+
+    `build()` liefert (Index, Layout) über den ganzen Bestand,
+    `build_batch(name)` (Index, Zeilenzahl) eines Batches oder None, wenn
+    er nicht geladen werden kann. `load()` liefert optional einen
+    gespeicherten Stand (Index, Layout) oder None.
+    """
+
+    def __init__(self, build, build_batch, load=None, max_overlays=MAX_OVERLAYS):
+        self._build = build
+        self._build_batch = build_batch
+        self._load = load
+        self.max_overlays = max_overlays
+        self._base = None
+        self._layout = None
+        self._generation = 0
+        # Batch-Name -> (Signatur, Index, Zeilenzahl)
+        self._overlays = {}
+        self._lock = threading.Lock()
+        self._rebuilding = False
+
+    def _replace(self, base, layout):
+        """Setzt eine neue Basis; Nachträge gelten nur für die alte (Lock wird gehalten)."""
+        self._base, self._layout = base, layout
+        self._generation += 1
+        self._overlays = {}
+
+    def rebuild(self):
+        """Baut die Basis über den ganzen Bestand neu."""
+        base, layout = self._build()
+        with self._lock:
+            self._replace(base, layout)
+
+    def rebuild_in_background(self):
+        """Startet rebuild() in einem Thread, sofern nicht schon einer läuft."""
+        with self._lock:
+            if self._rebuilding:
+                return False
+            self._rebuilding = True
+
+        def run():
+            try:
+                self.rebuild()
+            finally:
+                with self._lock:
+                    self._rebuilding = False
+
+        threading.Thread(target=run, name="search-index-rebuild", daemon=True).start()
+        return True
+
+    def _overlay(self, name, signature):
+        """(Index, Zeilenzahl) eines geänderten Batches, je Signatur nur einmal gebaut."""
+        cached = self._overlays.get(name)
+        if cached is not None and cached[0] == signature:
+            return cached[1:]
+        built = self._build_batch(name)
+        if built is None:
+            return None, 0
+        self._overlays[name] = (signature,) + tuple(built)
+        return built
+
+    def state(self, signatures):
+        """IndexState für die aktuellen Signaturen je Batch ({Name: Signatur})."""
+        with self._lock:
+            if self._base is None:
+                loaded = self._load() if self._load is not None else None
+                self._replace(*(loaded or self._build()))
+            layout = self._layout
+            names, rows, sigs = list(layout.names), list(layout.rows), list(layout.signatures)
+            starts = layout.starts
+            hidden, overlays = [], []
+
+            def append(name, signature):
+                index, n_rows = self._overlay(name, signature)
+                if index is not None:
+                    overlays.append((int(sum(rows)), index))
+                    names.append(name)
+                    rows.append(n_rows)
+                    sigs.append(signature)
+
+            for i, name in enumerate(layout.names):
+                current = signatures.get(name)
+                if name is None or current == layout.signatures[i]:
+                    continue
+                hidden.append((int(starts[i]), layout.rows[i]))
+                names[i], sigs[i] = None, None
+                if current is None:
+                    continue
+                index, n_rows = self._overlay(name, current)
+                if index is not None and n_rows == layout.rows[i]:
+                    overlays.append((int(starts[i]), index))
+                    names[i], sigs[i] = name, current
+                elif index is not None:
+                    append(name, current)
+            known = set(layout.names)
+            for name, signature in signatures.items():
+                if name not in known:
+                    append(name, signature)
+
+            in_use = {name for name in names if name is not None}
+            self._overlays = {name: entry for name, entry in self._overlays.items() if name in in_use}
+            state_layout = Layout(tuple(names), tuple(rows), tuple(sigs))
+            state = IndexState(
+                base=self._base,
+                layout=state_layout,
+                hidden=tuple(hidden),
+                overlays=tuple(overlays),
+                version=(self._generation, state_layout),
+            )
+            n_changed = len(hidden) + len(names) - len(layout.names)
+        if n_changed > self.max_overlays:
+            self.rebuild_in_background()
+        return state
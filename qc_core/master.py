@@ -0,0 +1,249 @@
+"""
+Gesamtbestand - aus den Batch-CSVs zusammengesetzte Master-Ansicht
+
+Statt einer separat gepflegten Master-CSV werden Übersicht und Suche aus
+den Batch-Dateien (inkl. offener Journal-Korrekturen) aufgebaut. Die
+Kennzahlen je Batch stammen aus seinem Statistik-Sidecar und werden über
+die Signatur von CSV und Journal validiert; ändert sich ein Batch, wird
+nur sein Sidecar (oder ohne gültiges Sidecar der Batch selbst) neu
+gelesen und seine Zahlen werden in die Gesamtsummen übernommen.
+
+Eine zweite Kopie aller Karten wird nicht vorgehalten: Indizes werden aus
+den benötigten Spalten gebaut, Treffer über ihre Position im Gesamtbestand
+aus den einzelnen Batches geholt (take()). Positionen beziehen sich auf das
+Layout (Batches und Zeilenzahlen) beim Aufbau des Index, nicht auf den
+aktuellen Verzeichnisinhalt.
+"""
+
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from qc_core import journal
+from qc_core.batch_stats import BatchStats, batch_signature, load_sidecar, write_sidecar
+from qc_core.card_index import BatchView
+
+
+@dataclass(frozen=True)
+class Layout:
+    """Abschnitte des Gesamtbestands in Positionsreihenfolge: Batch, Zeilenzahl, Signatur.
+
+    Ein Abschnitt ohne Namen ist ausgeblendet (Batch entfernt oder mit
+    anderer Zeilenzahl weiter hinten neu angehängt); seine Positionen
+    liefern keine Karten mehr.
+    """
+    names: tuple = ()
+    rows: tuple = ()
+    signatures: tuple = ()
+
+    @property
+    def starts(self):
+        """Erste Position je Abschnitt, zuletzt die Gesamtzahl."""
+        return np.concatenate([[0], np.cumsum(self.rows, dtype=np.int64)]).astype(np.int64)
+
+
+class MasterView:
+    """Gesamtbestand aller Batch-CSVs eines Verzeichnisses mit inkrementeller Aggregation.
+
+    `loader(csv_path)` liefert einen Batch als BatchView (oder None bei
+    Fehlern); die App übergibt hier ihren gecachten Lader, damit Batches
+    nicht doppelt im Speicher liegen. Mit `stats_func(csv_path)` werden
+    fehlende Sidecars ohne Laden des Batches berechnet (z.B. blockweise).
+    """
+
+    def __init__(self, csv_dir, fields, loader=None, stats_func=None):
+        self.csv_dir = Path(csv_dir)
+        self.fields = list(fields)
+        self._loader = loader or (
+            lambda path: BatchView.from_frame(journal.load_with_journal(path), self.fields)
+        )
+        self._stats_func = stats_func
+        # Batch-Name -> (Signatur, BatchStats)
+        self._batches = {}
+        self._totals = BatchStats(batch="")
+        self._lock = threading.Lock()
+
+    def batch_paths(self):
+        """CSV-Pfade aller Batches, nach Name sortiert."""
+        if not self.csv_dir.exists():
+            return {}
+        return {path.stem: path for path in sorted(self.csv_dir.glob("*.csv"))}
+
+    def refresh(self):
+        """Liest geänderte, neue und entfernte Batches nach; gibt deren Namen zurück."""
+        with self._lock:
+            paths = self.batch_paths()
+            changed = []
+            for name in [name for name in self._batches if name not in paths]:
+                self._totals.merge(self._batches.pop(name)[1], sign=-1)
+                changed.append(name)
+            for name, path in paths.items():
+                if self._refresh_batch(name, path):
+                    changed.append(name)
+            return changed
+
+    def stats_of(self, name):
+        """Aktuelle Kennzahlen eines einzelnen Batches (prüft nur diesen Batch)."""
+        path = self.csv_dir / f"{name}.csv"
+        with self._lock:
+            if path.exists():
+                self._refresh_batch(name, path)
+            entry = self._batches.get(name)
+        return entry[1] if entry is not None else None
+
+    def _refresh_batch(self, name, path):
+        """Aktualisiert einen Batch aus Sidecar oder Kartendaten (Lock wird gehalten)."""
+        signature = batch_signature(path)
+        old = self._batches.get(name)
+        if old is not None and old[0] == signature:
+            return False
+        stats = load_sidecar(path, self.fields, signature)
+        if stats is None:
+            if self._stats_func is not None:
+                stats = self._stats_func(str(path))
+            else:
+                view = self._loader(str(path))
+                if view is None:
+                    return False
+                stats = BatchStats.from_completeness(name, view.completeness)
+            try:
+                write_sidecar(path, stats, self.fields, signature)
+            except OSError:
+                pass
+        if old is not None:
+            self._totals.merge(old[1], sign=-1)
+        self._totals.merge(stats)
+        self._batches[name] = (signature, stats)
+        return True
+
+    def signatures(self):
+        """Aktuelle Signatur je Batch (ohne refresh(), liest keine Kartendaten)."""
+        return {name: batch_signature(path) for name, path in self.batch_paths().items()}
+
+    def signature(self):
+        """Signatur des Gesamtbestands (Stand aller Batches beim letzten refresh())."""
+        with self._lock:
+            return tuple(sorted((name, sig) for name, (sig, _) in self._batches.items()))
+
+    def totals(self):
+        """Gesamtkennzahlen (Kopie)."""
+        with self._lock:
+            return BatchStats(
+                batch="",
+                total=self._totals.total,
+                field_counts=dict(self._totals.field_counts),
+                histogram=list(self._totals.histogram),
+            )
+
+    def batch_stats(self):
+        """Kennzahlen je Batch, nach Name sortiert."""
+        with self._lock:
+            return [self._batches[name][1] for name in sorted(self._batches)]
+
+    def views(self):
+        """Alle Batches als BatchView (über den Lader, also ggf. aus dem Cache)."""
+        views = []
+        for name, path in self.batch_paths().items():
+            view = self._loader(str(path))
+            if view is not None:
+                views.append((name, view))
+        return views
+
+    def frames(self, select=None):
+        """Je Batch ein DataFrame (nur lesen), z.B. für blockweise Exporte.
+
+        `select(view)` liefert optional eine boolesche Zeilenmaske je Batch
+        (z.B. nur problematische Karten).
+        """
+        frames = []
+        for name, view in self.views():
+            df = view.df if select is None else view.df[select(view)]
+            frames.append(df if 'Batch' in df.columns else df.assign(Batch=name))
+        return frames
+
+    def frame(self, columns=None):
+        """Alle Batches als ein DataFrame (Kopie, wird nicht vorgehalten).
+
+        `columns` beschränkt auf einzelne Spalten, z.B. die Suchfelder für
+        den Aufbau eines Index. Fehlt die Spalte `Batch`, wird sie aus dem
+        Dateinamen ergänzt.
+        """
+        return _concat([_select(name, view, columns) for name, view in self.views()], columns)
+
+    def snapshot(self, columns=None):
+        """(frame(columns), Layout) aus einem Durchgang über alle Batches.
+
+        Die Signatur eines Batches wird vor dem Laden gelesen: ändert er
+        sich währenddessen, gilt er beim nächsten Vergleich als geändert.
+        Batches, die nicht geladen werden können, stehen mit 0 Zeilen im
+        Layout.
+        """
+        names, rows, signatures, frames = [], [], [], []
+        for name, path in self.batch_paths().items():
+            signature = batch_signature(path)
+            view = self._loader(str(path))
+            names.append(name)
+            signatures.append(signature)
+            rows.append(0 if view is None else len(view.df))
+            if view is not None:
+                frames.append(_select(name, view, columns))
+        return _concat(frames, columns), Layout(tuple(names), tuple(rows), tuple(signatures))
+
+    def take(self, positions, layout=None):
+        """Karten nach Position im Gesamtbestand, in der gegebenen Reihenfolge.
+
+        Ohne `layout` gilt die Reihenfolge von frame(). Mit dem Layout
+        eines Index werden genau dessen Batches gelesen, unabhängig von
+        inzwischen hinzugekommenen Dateien. Positionen ausgeblendeter
+        Abschnitte oder eines Batches, der nicht mehr geladen werden kann
+        bzw. eine andere Zeilenzahl hat, entfallen; die übrigen bleiben
+        gültig. Der Index des Ergebnisses sind die Positionen.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        if layout is None:
+            loaded = dict(self.views())
+            layout = Layout(tuple(loaded), tuple(len(view.df) for view in loaded.values()))
+            view_of = loaded.get
+        else:
+            view_of = self._view_of
+        starts = layout.starts
+        owners = np.searchsorted(starts, positions, side="right") - 1
+        parts, columns = [], None
+        for owner in np.unique(owners):
+            name = layout.names[owner] if 0 <= owner < len(layout.names) else None
+            view = view_of(name) if name is not None else None
+            if view is None or len(view.df) != layout.rows[owner]:
+                continue
+            selected = np.flatnonzero(owners == owner)
+            part = view.df.iloc[positions[selected] - starts[owner]]
+            if 'Batch' not in part.columns:
+                part = part.assign(Batch=name)
+            parts.append(part.set_axis(selected))
+        if not parts:
+            view = next((view_of(name) for name in layout.names if name is not None), None)
+            columns = list(view.df.columns) if view is not None else ['Datei']
+            return pd.DataFrame(columns=columns + ([] if 'Batch' in columns else ['Batch']))
+        result = pd.concat(parts).sort_index()
+        return result.set_axis(positions[result.index])
+
+    def _view_of(self, name):
+        """BatchView eines Batches über den Lader; None, wenn die Datei fehlt."""
+        path = self.csv_dir / f"{name}.csv"
+        return self._loader(str(path)) if path.exists() else None
+
+
+def _select(name, view, columns):
+    """Spalten eines Batches für frame(); `Batch` wird bei Bedarf ergänzt."""
+    df = view.df if columns is None else view.df[[c for c in columns if c in view.df.columns]]
+    if 'Batch' not in df.columns and (columns is None or 'Batch' in columns):
+        df = df.assign(Batch=name)
+    return df
+
+
+def _concat(frames, columns):
+    if not frames:
+        return pd.DataFrame(columns=['Datei', 'Batch'] if columns is None else list(columns))
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,220 @@
+"""
+Seitenlogik - Kennzahlen, Tabellen und Texte der App-Seiten ohne Streamlit
+
+Die App-Datei baut nur die Widgets; was die Seiten anzeigen, wird hier
+aus der Datenschicht (QCService) berechnet:
+
+    Batch-Ansicht      Kennzahl-Kacheln, Tabellenseite, Formularfelder,
+                       Konfidenz, Duplikate und Prefetch der Karte,
+                       Batches von Suchen & Ersetzen
+    Gesamt-Übersicht   Kacheln, Vollständigkeitsstufen, Feld-Vollständigkeit,
+                       Batch-Vergleich
+    Duplikate und      Gruppen bzw. Cluster nach Nummer, Auswahl des
+    Schreibweisen      Normwerts
+    Diagnose           Cache-Zähler
+
+Feldnamen (z.B. die Kennzahlen der Kacheln) übergibt die App aus ihrer
+Konfiguration.
+"""
+
+import pandas as pd
+
+from qc_core.completeness import COMPLETE_MIN_FIELDS, SPARSE_MAX_FIELDS
+
+# Bereiche von Suchen & Ersetzen
+REPLACE_SCOPES = ("Dieser Batch", "Alle Batches")
+# Auswahl "eigene Schreibweise" als Normwert
+OWN_SPELLING = "✏️ Eigene Schreibweise"
+# Angezeigte Duplikate einer Karte
+DUPLICATES_SHOWN = 5
+
+# Hervorgehobene Kachel (z.B. spärliche Karten)
+HIGHLIGHT = "background-color: #fff3cd;"
+
+
+def share(part, total):
+    """Anteil in Prozent (0 bei leerem Bestand)."""
+    return part / total * 100 if total > 0 else 0
+
+
+def stat_box(value, label, heading="h3", style=None):
+    """HTML einer Kennzahl-Kachel (CSS-Klasse stat-box der App)."""
+    style = f' style="{style}"' if style else ""
+    return f"""
+    <div class="stat-box"{style}>
+        <{heading}>{value}</{heading}>
+        <p>{label}</p>
+    </div>
+    """
+
+
+# --- Batch-Ansicht ---
+
+def batch_boxes(stats, fields):
+    """Kacheln der Batch-Ansicht: Gesamt, gefüllte `fields` und spärliche Karten."""
+    total = stats.total
+    boxes = [stat_box(total, "Gesamt")]
+    for name in fields:
+        filled = stats.field_counts.get(name, 0)
+        boxes.append(stat_box(filled, f"{name} ({share(filled, total):.1f}%)"))
+    boxes.append(stat_box(stats.sparse, f"Spärlich ({share(stats.sparse, total):.1f}%)", style=HIGHLIGHT))
+    return boxes
+
+
+def replace_paths(service, csv_path, scope):
+    """CSV-Pfade im Bereich von Suchen & Ersetzen (REPLACE_SCOPES)."""
+    return [str(csv_path)] if scope == REPLACE_SCOPES[0] else service.batch_csv_paths()
+
+
+def table_page(df, order, page, page_rows, fields):
+    """Ausschnitt (Datei + bearbeitbare Felder) einer Seite des Tabellenmodus."""
+    start = (page - 1) * page_rows
+    columns = ['Datei'] + [name for name in fields if name in df.columns]
+    return df.loc[order[start:start + page_rows], columns]
+
+
+def editor_frame(original):
+    """Tabelle für den Tabelleneditor: leere Zellen als '' statt NaN."""
+    return original.astype(object).where(original.notna(), '')
+
+
+def cell_text(row, name):
+    """Wert eines Felds als Text für das Formular ('' bei leer oder fehlend)."""
+    value = row.get(name)
+    return str(value) if pd.notna(value) else ''
+
+
+def field_label(name, value):
+    """Beschriftung eines Formularfelds; leere Felder werden markiert."""
+    return f"⚠️ {name}" if value.strip() == '' else name
+
+
+def confidence_text(card_conf):
+    """Zeile zur VLM-Konfidenz einer Karte (aus ConfidenceTable.for_cards()); None ohne Ausgabe."""
+    if pd.notna(card_conf['Fehler']) and card_conf['Fehler']:
+        return f"**VLM-Ausgabe:** ⚠️ {card_conf['Fehler']}"
+    if pd.isna(card_conf['Konfidenz']):
+        return None
+    weakest = f" · schwächstes Feld: {card_conf['Schwächstes Feld']}" if card_conf['Schwächstes Feld'] else ""
+    return (
+        f"**VLM-Konfidenz:** {card_conf['Konfidenz']:.2f} "
+        f"(Mittel {card_conf['Mittel']:.2f}, {int(card_conf['Unsichere Felder'])} unsichere Felder{weakest})"
+    )
+
+
+def duplicates_text(report, batch, filename):
+    """Hinweis auf mögliche Duplikate einer Karte aus der letzten Prüfung; None ohne Treffer."""
+    if report is None:
+        return None
+    others = report.others_of(batch, filename)
+    if len(others) == 0:
+        return None
+    shown = others.head(DUPLICATES_SHOWN)
+    more = len(others) - len(shown)
+    return (
+        f"🧬 Mögliche Duplikate ({others['Gründe'].iloc[0]}): "
+        + ", ".join(f"`{b}/{d}`" for b, d in zip(shown['Batch'], shown['Datei']))
+        + (f" und {more} weitere" if more > 0 else "")
+    )
+
+
+def prefetch_text(stats, cache_mb=None):
+    """Zähler des Bild-Prefetchs; mit `cache_mb` auch die Belegung des Bild-Caches."""
+    text = (
+        f"⚡ Prefetch: {stats.hits} Treffer, {stats.inflight} im Laden, "
+        f"{stats.misses} Fehlgriffe ({stats.hit_rate:.0%})"
+    )
+    if cache_mb is not None:
+        text += f" · {stats.cached} Bilder ({stats.cached_bytes / 1024 ** 2:.0f}/{cache_mb} MB) im Speicher"
+    return text
+
+
+# --- Gesamt-Übersicht ---
+
+def overview_boxes(stats, fields):
+    """Kacheln der Übersicht: Gesamtzahl und Anteil gefüllter `fields`."""
+    boxes = [stat_box(f"{stats.total:,}", "Gesamt-Karteikarten", heading="h2")]
+    for name in fields:
+        pct = share(stats.field_counts.get(name, 0), stats.total)
+        boxes.append(stat_box(f"{pct:.1f}%", f"Mit {name}", heading="h2"))
+    return boxes
+
+
+def completeness_levels(stats):
+    """(Beschriftung, Karten, Anteil) für vollständige, mittlere und spärliche Karten."""
+    medium = stats.total - stats.complete - stats.sparse
+    return [
+        (f"Vollständig (≥{COMPLETE_MIN_FIELDS} Felder)", stats.complete, share(stats.complete, stats.total)),
+        (f"Mittel ({SPARSE_MAX_FIELDS + 1}-{COMPLETE_MIN_FIELDS - 1} Felder)", medium, share(medium, stats.total)),
+        (f"Spärlich (≤{SPARSE_MAX_FIELDS} Felder)", stats.sparse, share(stats.sparse, stats.total)),
+    ]
+
+
+def field_completeness(stats, fields):
+    """Ausgefüllte Karten je Feld, absteigend nach Anteil."""
+    table = pd.DataFrame({
+        'Feld': list(fields),
+        'Ausgefüllt': [stats.field_counts.get(name, 0) for name in fields],
+    })
+    table['Prozent'] = [share(filled, stats.total) for filled in table['Ausgefüllt']]
+    return table.sort_values('Prozent', ascending=False)
+
+
+def batch_comparison(batch_stats, fields):
+    """Kennzahlen je Batch (Index Batch): Gesamt, 'Mit <Feld>' und '% <Feld>'; dazu die Formate der Spalten."""
+    table = pd.DataFrame(
+        [
+            {'Batch': s.batch, 'Gesamt': s.total, **{f"Mit {name}": s.field_counts.get(name, 0) for name in fields}}
+            for s in batch_stats
+        ],
+        columns=['Batch', 'Gesamt'] + [f"Mit {name}" for name in fields],
+    ).set_index('Batch')
+    for name in fields:
+        table[f"% {name}"] = (table[f"Mit {name}"] / table['Gesamt'] * 100).round(1)
+    formats = {'Gesamt': '{:,}'}
+    formats.update({f"Mit {name}": '{:,}' for name in fields})
+    formats.update({f"% {name}": '{:.1f}%' for name in fields})
+    return table, formats
+
+
+# --- Duplikate und Schreibweisen ---
+
+def group_ids(table, column):
+    """Gruppen- bzw. Cluster-Nummern in Reihenfolge ihres ersten Auftretens."""
+    return table[column].drop_duplicates().tolist()
+
+
+def group(table, column, group_id):
+    """Zeilen einer Gruppe bzw. eines Clusters."""
+    return table[table[column] == group_id]
+
+
+def skipped_text(skipped):
+    """Hinweis auf übersprungene (zu große) Duplikatgruppen; None, wenn keine."""
+    if not skipped:
+        return None
+    return (
+        "Übersprungen (zu große Gruppen, z.B. Platzhalterwerte): "
+        + ", ".join(f"{reason}: {count}" for reason, count in skipped.items())
+    )
+
+
+def cluster_key(field_name, method, members):
+    """Widget-Schlüssel je Cluster-Inhalt; nach einer Übernahme ändern sich die Cluster und damit die Auswahl."""
+    return f"{field_name}_{method}_{abs(hash(tuple(members['Wert'])))}"
+
+
+def canonical_choices(members):
+    """Angebotene Normwerte: Schreibweisen des Clusters und eine eigene."""
+    return members['Wert'].tolist() + [OWN_SPELLING]
+
+
+# --- Diagnose ---
+
+def cache_text(stats):
+    """Zähler und Belegung des Daten-Caches."""
+    return (
+        f"Daten-Cache: {stats.hits} Treffer, {stats.misses} Fehlgriffe, "
+        f"{stats.evictions} verdrängt · {stats.entries} Einträge, "
+        f"{stats.nbytes / 1024 ** 2:.0f}/{stats.max_bytes / 1024 ** 2:.0f} MB"
+    )
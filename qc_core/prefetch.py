@@ -0,0 +1,144 @@
+"""
+Bild-Prefetch - lädt Nachbarkarten im Hintergrund in einen begrenzten Speicher-Cache
+
+Der Cache ist nach Bytes begrenzt (Originalauflösungen sind viel größer als
+Vorschauen). Schlüssel sollten den Stand der Bilddatei enthalten (z.B.
+mtime), damit ein neu gescanntes Bild nicht aus dem Cache kommt; fehlende
+Bilder (Loader liefert None) werden nicht zwischengespeichert.
+
+Die Warteschlange ist begrenzt: Beim Blättern werden noch nicht begonnene
+Ladevorgänge verworfen, die nicht mehr zu den aktuellen Nachbarn gehören.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from dataclasses import dataclass
+
+# Standardwerte - BEI BEDARF ANPASSEN
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+DEFAULT_WORKERS = 4
+# Höchstens so viele Ladevorgänge warten bzw. laufen gleichzeitig
+DEFAULT_MAX_PENDING = 32
+# Für so viele Sitzungen werden die eingeplanten Schlüssel gemerkt
+MAX_OWNERS = 256
+
+
+@dataclass
+class PrefetchStats:
+    hits: int = 0
+    inflight: int = 0
+    misses: int = 0
+    cached: int = 0
+    cached_bytes: int = 0
+
+    @property
+    def hit_rate(self):
+        """Anteil der Zugriffe, die ohne eigenes Laden bedient wurden."""
+        total = self.hits + self.inflight + self.misses
+        return (self.hits + self.inflight) / total if total else 0.0
+
+
+class ImagePrefetcher:
+    """Thread-Pool-Prefetcher mit LRU-Cache begrenzter Größe (Bytes).
+
+    `loader(key)` liefert Bytes oder None und muss ohne Streamlit-Kontext
+    lauffähig sein, da er in Hintergrund-Threads ausgeführt wird.
+    """
+
+    def __init__(self, loader, max_bytes=DEFAULT_MAX_BYTES, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING):
+        self.loader = loader
+        self.max_bytes = max_bytes
+        self.max_pending = max_pending
+        self._cache = OrderedDict()
+        self._bytes = 0
+        self._pending = {}
+        # Auftraggeber (z.B. Sitzung) -> zuletzt eingeplante Schlüssel
+        self._queued = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._stats = PrefetchStats()
+
+    def _store(self, key, value):
+        with self._lock:
+            self._pending.pop(key, None)
+            # Fehlende Bilder nicht merken - sie können später hinzukommen
+            if value is None or len(value) > self.max_bytes or key in self._cache:
+                return
+            self._cache[key] = value
+            self._bytes += len(value)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def _load(self, key):
+        try:
+            value = self.loader(key)
+        except Exception:
+            with self._lock:
+                self._pending.pop(key, None)
+            raise
+        self._store(key, value)
+        return value
+
+    def get(self, key):
+        """Gibt das Bild zu `key` zurück; lädt synchron, falls nicht vorgeladen."""
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self._stats.hits += 1
+                return self._cache[key]
+            future = self._pending.get(key)
+            if future is not None:
+                self._stats.inflight += 1
+            else:
+                self._stats.misses += 1
+        if future is not None:
+            try:
+                return future.result()
+            except CancelledError:
+                # Inzwischen verworfen (veralteter Prefetch) - selbst laden
+                pass
+        return self._load(key)
+
+    def prefetch(self, keys, owner=None):
+        """Plant das Laden der Schlüssel im Hintergrund ein (Reihenfolge = Priorität).
+
+        Noch wartende Schlüssel, die derselbe `owner` zuvor eingeplant hat
+        und die nicht mehr in `keys` stehen, werden verworfen. Neue Schlüssel
+        werden nur bis `max_pending` offene Ladevorgänge angenommen.
+        """
+        keys = list(keys)
+        with self._lock:
+            wanted = set(keys)
+            for key in self._queued.pop(owner, ()):
+                future = self._pending.get(key)
+                if key not in wanted and future is not None and future.cancel():
+                    del self._pending[key]
+            todo = [k for k in keys if k not in self._cache and k not in self._pending]
+            for key in todo[:max(0, self.max_pending - len(self._pending))]:
+                self._pending[key] = self._pool.submit(self._load, key)
+            self._queued[owner] = [k for k in keys if k in self._pending]
+            while len(self._queued) > MAX_OWNERS:
+                self._queued.popitem(last=False)
+
+    def stats(self):
+        """Momentaufnahme der Treffer-Zähler."""
+        with self._lock:
+            return PrefetchStats(
+                hits=self._stats.hits,
+                inflight=self._stats.inflight,
+                misses=self._stats.misses,
+                cached=len(self._cache),
+                cached_bytes=self._bytes,
+            )
+
+
+def neighbour_positions(position, count, k):
+    """Positionen der nächsten und vorherigen k Karten, nächste zuerst."""
+    positions = []
+    for distance in range(1, k + 1):
+        for candidate in (position + distance, position - distance):
+            if 0 <= candidate < count:
+                positions.append(candidate)
+    return positions
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Vorschaubilder - verkleinerte Karteikarten-Bilder mit Festplatten-Cache
+
+Vorschauen werden pro Stufe (Breite in Pixeln) unter
+`<cache_dir>/<breite>/<hash>.jpg` abgelegt. Der Hash enthält Pfad, mtime und
+Größe der Quelldatei, ein neu gescanntes Bild erzeugt also automatisch eine
+neue Vorschau.
+
+Vorab-Erzeugung für einen ganzen Bildordner:
+    python -m qc_core.previews IMAGE_BASE_DIR PREVIEW_CACHE_DIR --workers 8
+"""
+
+import argparse
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# Vorschau-Stufen (Breite in Pixeln); None = Originalauflösung zum Zoomen
+PREVIEW_WIDTH = 800
+ZOOM_LEVELS = [PREVIEW_WIDTH, None]
+JPEG_QUALITY = 85
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".tif", ".tiff"}
+
+
+def preview_path(src_path, width, cache_dir):
+    """Cache-Pfad der Vorschau einer Quelldatei in der gegebenen Breite."""
+    src_path = Path(src_path)
+    stat = src_path.stat()
+    key = f"{src_path.resolve()}|{stat.st_mtime_ns}|{stat.st_size}|{width}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return Path(cache_dir) / str(width) / digest[:2] / f"{digest}.jpg"
+
+
+def render_preview(src_path, width, target):
+    """Erzeugt eine verkleinerte JPEG-Vorschau und schreibt sie atomar nach `target`."""
+    # Erst hier importiert: die App braucht PIL nur, wenn tatsächlich Vorschauen entstehen
+    from PIL import Image
+
+    with Image.open(src_path) as img:
+        # JPEG direkt in reduzierter Auflösung dekodieren (DCT-Skalierung)
+        img.draft("RGB", (width, width * 4))
+        img.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        img.save(tmp, "JPEG", quality=JPEG_QUALITY, optimize=True)
+    os.replace(tmp, target)
+    return target
+
+
+def get_preview(src_path, width, cache_dir):
+    """Gibt den Pfad einer Vorschau zurück und erzeugt sie bei Bedarf.
+
+    Bei `width=None` oder fehlendem Cache-Verzeichnis wird das Original
+    zurückgegeben.
+    """
+    if width is None or not cache_dir:
+        return Path(src_path)
+    target = preview_path(src_path, width, cache_dir)
+    if target.exists():
+        return target
+    return render_preview(src_path, width, target)
+
+
+def iter_images(image_dir):
+    """Alle Bilddateien unterhalb eines Verzeichnisses."""
+    for root, _, files in os.walk(image_dir):
+        for name in files:
+            if Path(name).suffix.lower() in IMAGE_EXTENSIONS:
+                yield Path(root) / name
+
+
+def _generate_one(src_path, widths, cache_dir):
+    """Erzeugt alle Stufen einer Datei (Worker-Funktion für den Prozess-Pool)."""
+    created = 0
+    for width in widths:
+        target = preview_path(src_path, width, cache_dir)
+        if not target.exists():
+            render_preview(src_path, width, target)
+            created += 1
+    return created
+
+
+def generate_all(image_dir, cache_dir, widths=(PREVIEW_WIDTH,), workers=None):
+    """Erzeugt Vorschauen für alle Bilder eines Verzeichnisses parallel.
+
+    Gibt (Anzahl Bilder, neu erzeugte Vorschauen, Fehler) zurück.
+    """
+    widths = [w for w in widths if w is not None]
+    images = list(iter_images(image_dir))
+    created, errors = 0, []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_generate_one, path, widths, cache_dir): path for path in images}
+        for future in as_completed(futures):
+            try:
+                created += future.result()
+            except Exception as e:
+                errors.append((futures[future], e))
+    return len(images), created, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vorschaubilder für alle Karteikarten vorab erzeugen")
+    parser.add_argument("image_dir", help="Bildverzeichnis (IMAGE_BASE_DIR)")
+    parser.add_argument("cache_dir", help="Vorschau-Cache (PREVIEW_CACHE_DIR)")
+    parser.add_argument("--width", type=int, nargs="+", default=[PREVIEW_WIDTH], help="Breite(n) in Pixeln")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl Prozesse (Standard: alle Kerne)")
+    args = parser.parse_args()
+
+    total, created, errors = generate_all(args.image_dir, args.cache_dir, args.width, args.workers)
+    print(f"{total} Bilder, {created} Vorschauen neu erzeugt, {len(errors)} Fehler")
+    for path, error in errors:
+        print(f"  {path}: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+QC-Berichte ohne Browser - Kennzahlen und problematische Karten aller Batches
+
+Jeder Batch wird in einem eigenen Prozess blockweise gelesen (inkl. offener
+Journal-Korrekturen) und mit denselben Regeln wie in der App ausgewertet
+(calculate_statistics, Filter "Problematische Karten"). Geschrieben werden
+je gewähltem Format:
+
+    OUT_DIR/batches/<batch>.problematic.<fmt>  problematische Karten des Batches
+    OUT_DIR/batches/<batch>.fields.<fmt>       Füllgrad je Feld des Batches
+    OUT_DIR/summary.<fmt>                      Kennzahlen je Batch und gesamt
+    OUT_DIR/fields.<fmt>                       Füllgrad je Feld gesamt
+    OUT_DIR/problematic_cards.<fmt>            alle problematischen Karten
+
+Nebenbei werden die Statistik-Sidecars der Batches aktualisiert, die App
+muss sie danach nicht mehr selbst berechnen.
+
+Aufruf (z.B. als nächtlicher Job):
+    python -m qc_core.report CSV_DIR OUT_DIR --fields Komponist Signatur ... --format csv json --workers 8
+"""
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from qc_core import streaming
+from qc_core.batch_stats import BatchStats, batch_signature, write_sidecar
+from qc_core.completeness import COMPLETE_MIN_FIELDS, SPARSE_MAX_FIELDS, compute_completeness
+from qc_core.export import write_export
+from qc_core.service import DEFAULT_FIELDS, calculate_statistics
+
+# Format -> Dateiendung
+REPORT_FORMATS = {"csv": ".csv", "parquet": ".parquet", "json": ".json"}
+# Spalten der Liste problematischer Karten (wie der Export der Übersicht)
+PROBLEM_COLUMNS = ['Datei', 'Batch', 'Komponist', 'Signatur']
+
+
+def write_report(df, path_stem, formats):
+    """Schreibt eine Tabelle in allen gewählten Formaten (Pfad ohne Endung)."""
+    for fmt in formats:
+        path = Path(f"{path_stem}{REPORT_FORMATS[fmt]}")
+        if fmt == "json":
+            df.to_json(path, orient="records", force_ascii=False, indent=1)
+        else:
+            write_export([df], path, fmt, columns=list(df.columns))
+
+
+def summary_row(stats):
+    """Kennzahlen eines Batches (oder gesamt) als Tabellenzeile."""
+    values = calculate_statistics(stats)
+    row = {
+        "Batch": stats.batch or "GESAMT",
+        "Karten": values["total"],
+        f"Vollständig (≥{COMPLETE_MIN_FIELDS})": values["complete"],
+        "Mittel": values["total"] - values["complete"] - values["sparse"],
+        f"Spärlich (≤{SPARSE_MAX_FIELDS})": values["sparse"],
+        "Mit Komponist": values["komponist"],
+        "Mit Signatur": values["signatur"],
+        "Mit Titel": values["titel"],
+    }
+    row["Anteil vollständig [%]"] = round(100 * values["complete"] / values["total"], 2) if values["total"] else 0.0
+    return row
+
+
+def field_table(stats, fields):
+    """Füllgrad je Feld (Anzahl und Anteil gefüllter Karten)."""
+    counts = [stats.field_counts.get(name, 0) for name in fields]
+    return pd.DataFrame({
+        "Feld": list(fields),
+        "Gefüllt": counts,
+        "Anteil [%]": [round(100 * count / stats.total, 2) if stats.total else 0.0 for count in counts],
+    })
+
+
+def batch_report(csv_path, fields, columns, out_dir, formats, backend="csv", chunksize=streaming.CHUNK_ROWS):
+    """Wertet einen Batch aus und schreibt seine Berichte (Worker-Funktion für den Prozess-Pool).
+
+    Gibt (Kennzahlen, problematische Karten) zurück.
+    """
+    name = Path(csv_path).stem
+    signature = batch_signature(csv_path)
+    stats = BatchStats(batch=name, histogram=[0] * (len(fields) + 1))
+    problems = []
+    read_columns = list(dict.fromkeys(list(columns) + list(fields)))
+    for chunk in streaming.iter_cards([csv_path], read_columns, backend, chunksize):
+        completeness = compute_completeness(chunk, fields)
+        stats.merge(BatchStats.from_completeness(name, completeness))
+        problems.append(chunk.loc[completeness.sparse_mask()].reindex(columns=columns))
+    problem_df = pd.concat(problems, ignore_index=True) if problems else pd.DataFrame(columns=columns)
+    write_sidecar(csv_path, stats, fields, signature)
+
+    batch_dir = Path(out_dir) / "batches"
+    write_report(problem_df, batch_dir / f"{name}.problematic", formats)
+    write_report(field_table(stats, fields), batch_dir / f"{name}.fields", formats)
+    return stats, problem_df
+
+
+def run_reports(csv_dir, out_dir, fields, columns=PROBLEM_COLUMNS, formats=("csv",),
+                backend="csv", chunksize=streaming.CHUNK_ROWS, workers=None, progress=None):
+    """Berichte für alle Batches eines Verzeichnisses, parallel je Batch.
+
+    Gibt (Kennzahlen-Tabelle, Fehler) zurück; Fehler ist eine Liste von
+    (Pfad, Ausnahme), fehlerhafte Batches fehlen in den Gesamtberichten.
+    """
+    paths = sorted(Path(csv_dir).glob("*.csv"))
+    (Path(out_dir) / "batches").mkdir(parents=True, exist_ok=True)
+    args = (list(fields), list(columns), str(out_dir), list(formats), backend, chunksize)
+
+    results, errors = {}, []
+    if workers == 1 or len(paths) <= 1:
+        for path in paths:
+            try:
+                results[path] = batch_report(path, *args)
+            except Exception as e:
+                errors.append((path, e))
+            if progress:
+                progress(path, len(results) + len(errors), len(paths))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(batch_report, path, *args): path for path in paths}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    errors.append((futures[future], e))
+                if progress:
+                    progress(futures[future], len(results) + len(errors), len(paths))
+
+    # Gesamtberichte in der Reihenfolge der Batches
+    ordered = [results[path] for path in paths if path in results]
+    totals = BatchStats(batch="", histogram=[0] * (len(fields) + 1))
+    for stats, _ in ordered:
+        totals.merge(stats)
+    summary = pd.DataFrame([summary_row(stats) for stats, _ in ordered] + [summary_row(totals)])
+    write_report(summary, Path(out_dir) / "summary", formats)
+    write_report(field_table(totals, fields), Path(out_dir) / "fields", formats)
+    problem_frames = [problem_df for _, problem_df in ordered] or [pd.DataFrame(columns=columns)]
+    write_report(pd.concat(problem_frames, ignore_index=True), Path(out_dir) / "problematic_cards", formats)
+    return summary, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QC-Berichte für alle Batch-CSVs ohne Browser erzeugen")
+    parser.add_argument("csv_dir", help="Verzeichnis mit Batch-CSVs (CSV_DIR)")
+    parser.add_argument("out_dir", help="Zielverzeichnis der Berichte")
+    parser.add_argument("--fields", nargs="+", default=DEFAULT_FIELDS, help="Editierbare Felder (EDITABLE_FIELDS)")
+    parser.add_argument("--columns", nargs="+", default=PROBLEM_COLUMNS, help="Spalten der Liste problematischer Karten")
+    parser.add_argument("--format", nargs="+", default=["csv"], choices=list(REPORT_FORMATS), help="Ausgabeformate")
+    parser.add_argument("--backend", default="csv", help="Speicher-Backend (csv oder parquet)")
+    parser.add_argument("--chunk-rows", type=int, default=streaming.CHUNK_ROWS, help="Zeilen je gelesenem Block")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl Prozesse (Standard: alle Kerne)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary, errors = run_reports(
+        args.csv_dir, args.out_dir, args.fields, args.columns, args.format,
+        backend=args.backend, chunksize=args.chunk_rows, workers=args.workers,
+        progress=lambda path, done, total: print(f"[{done}/{total}] {path.name}", flush=True),
+    )
+    total = summary.iloc[-1]
+    print(f"{len(summary) - 1} Batches, {total['Karten']:,} Karten, "
+          f"{total[f'Spärlich (≤{SPARSE_MAX_FIELDS})']:,} problematisch ({time.perf_counter() - start:.1f}s)")
+    for path, error in errors:
+        print(f"  Fehler {path.name}: {error}")
+    if errors:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Suchindex - invertierter Index über konfigurierbare Felder
+
+Unterstützt Präfixsuche, akzent- und umlautunabhängige Treffer
+("Muller", "Mueller" und "Müller" finden "Müller") sowie Feldabfragen
+wie `Komponist:Bach`. Mehrere Begriffe werden UND-verknüpft.
+"""
+
+import bisect
+import pickle
+import re
+import unicodedata
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+INDEX_VERSION = 1
+TOKEN_PATTERN = re.compile(r"\w+")
+UMLAUT_DIGRAPHS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+
+# Punkte je Treffer: ganzes Wort gegenüber Wortanfang
+EXACT_SCORE = 2.0
+PREFIX_SCORE = 1.0
+
+
+def fold(text):
+    """Kleinschreibung ohne Akzente/Umlaut-Punkte ("Müller" -> "muller")."""
+    text = str(text)
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def fold_digraphs(text):
+    """Wie fold(), aber Umlaute als Digraph ("Müller" -> "mueller")."""
+    return fold(str(text).casefold().translate(UMLAUT_DIGRAPHS))
+
+
+def tokenize(text):
+    """Wörter eines bereits normalisierten Texts."""
+    return TOKEN_PATTERN.findall(text)
+
+
+def index_tokens(text):
+    """Alle Index-Schreibweisen der Wörter eines Werts."""
+    tokens = set(tokenize(fold(text)))
+    if not text.isascii():
+        tokens |= set(tokenize(fold_digraphs(text)))
+    return tokens
+
+
+def parse_query(query, fields):
+    """Zerlegt eine Suchanfrage in (Feld oder None, Schreibweisen)-Paare.
+
+    Jedes Wort wird in beiden Schreibweisen gesucht ("Müller" findet
+    damit auch "Mueller").
+
+    `Feld:Begriff` schränkt auf ein Feld ein (Groß-/Kleinschreibung egal);
+    unbekannte Feldnamen werden als normaler Suchtext behandelt.
+    """
+    by_name = {f.casefold(): f for f in fields}
+    terms = []
+    for part in query.split():
+        target = None
+        if ":" in part:
+            name, _, rest = part.partition(":")
+            if name.casefold() in by_name and rest:
+                target, part = by_name[name.casefold()], rest
+        for variants in zip(tokenize(fold(part)), tokenize(fold_digraphs(part))):
+            terms.append((target, tuple(dict.fromkeys(variants))))
+    return terms
+
+
+@dataclass
+class _FieldIndex:
+    vocab: list
+    postings: list
+    weight: float = 1.0
+
+    def lookup(self, token, prefix=True):
+        """(Zeilen, Punkte) aller Wörter, die `token` entsprechen bzw. damit beginnen."""
+        lo = bisect.bisect_left(self.vocab, token)
+        hi = bisect.bisect_left(self.vocab, token + "\uffff") if prefix else lo + (
+            lo < len(self.vocab) and self.vocab[lo] == token
+        )
+        if lo >= hi:
+            return None, None
+        rows = np.concatenate(self.postings[lo:hi])
+        scores = np.full(len(rows), PREFIX_SCORE, dtype=np.float32)
+        # Das Vokabular ist sortiert - ein exakter Treffer steht immer vorn
+        if self.vocab[lo] == token:
+            scores[:len(self.postings[lo])] = EXACT_SCORE
+        return rows, scores
+
+
+@dataclass
+class SearchIndex:
+    """Invertierter Index: je Feld sortiertes Vokabular und Zeilenlisten."""
+    n_rows: int
+    fields: dict = field(default_factory=dict)
+    signature: tuple = None
+
+    @classmethod
+    def build(cls, df, fields, weights=None, signature=None):
+        """Baut den Index über die gegebenen Spalten eines DataFrames."""
+        weights = weights or {}
+        index = cls(n_rows=len(df), signature=signature)
+        for name in fields:
+            if name not in df.columns:
+                continue
+            index.fields[name] = _build_field(df[name], weights.get(name, 1.0))
+        return index
+
+    def search(self, query, limit=None, prefix=True, with_scores=False):
+        """Gibt die Zeilenpositionen der Treffer absteigend nach Relevanz zurück.
+
+        Mit `with_scores=True` wird (Positionen, Punkte) zurückgegeben.
+        """
+        terms = parse_query(query, list(self.fields))
+        if not terms:
+            empty = np.array([], dtype=np.int64)
+            return (empty, np.array([], dtype=np.float32)) if with_scores else empty
+
+        total = np.zeros(self.n_rows, dtype=np.float32)
+        matched = np.ones(self.n_rows, dtype=bool)
+        for target, variants in terms:
+            term_scores = np.zeros(self.n_rows, dtype=np.float32)
+            for name, field_index in self.fields.items():
+                if target is not None and name != target:
+                    continue
+                for token in variants:
+                    rows, scores = field_index.lookup(token, prefix=prefix)
+                    if rows is not None:
+                        np.maximum.at(term_scores, rows, scores * field_index.weight)
+            matched &= term_scores > 0
+            total += term_scores
+
+        hits = np.flatnonzero(matched)
+        # Stabile Sortierung: gleiche Relevanz bleibt in Dateireihenfolge
+        order = np.argsort(-total[hits], kind="stable")
+        hits = hits[order]
+        if limit:
+            hits = hits[:limit]
+        return (hits, total[hits]) if with_scores else hits
+
+    def save(self, path):
+        """Speichert den Index (Pickle) für den nächsten Start."""
+        with open(path, "wb") as f:
+            pickle.dump((INDEX_VERSION, self), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path, signature=None):
+        """Lädt einen gespeicherten Index; None, falls veraltet oder nicht vorhanden."""
+        try:
+            with open(path, "rb") as f:
+                version, index = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return None
+        if version != INDEX_VERSION or (signature is not None and index.signature != signature):
+            return None
+        return index
+
+
+def _build_field(series, weight):
+    """Baut Vokabular und Zeilenlisten einer Spalte."""
+    vocab, postings = build_postings(series, index_tokens)
+    return _FieldIndex(vocab=vocab, postings=postings, weight=weight)
+
+
+def build_postings(series, token_func):
+    """Sortiertes Vokabular und Zeilenlisten einer Spalte.
+
+    Jeder unterschiedliche Wert wird nur einmal mit `token_func`
+    zerlegt; die Zuordnung zu den Zeilen erfolgt vektorisiert über die
+    Wert-Codes.
+    """
+    values = series.fillna("").astype(str)
+    codes, uniques = pd.factorize(values)
+    token_lists = [sorted(token_func(value)) for value in uniques]
+    lengths = np.fromiter((len(t) for t in token_lists), dtype=np.int64, count=len(token_lists))
+    flat_tokens = [token for tokens in token_lists for token in tokens]
+    if not flat_tokens:
+        return [], []
+
+    # Vokabular (sortiert) und Token-Code je Eintrag der flachen Liste
+    flat_codes, vocab = pd.factorize(pd.Series(flat_tokens), sort=True)
+    offsets = np.cumsum(lengths) - lengths
+
+    # Für jede Zeile die Token ihres Werts auswählen
+    row_lengths = lengths[codes]
+    out_starts = np.cumsum(row_lengths) - row_lengths
+    positions = (
+        np.arange(row_lengths.sum())
+        - np.repeat(out_starts, row_lengths)
+        + np.repeat(offsets[codes], row_lengths)
+    )
+    rows = np.repeat(np.arange(len(codes), dtype=np.int32), row_lengths)
+    token_codes = flat_codes[positions]
+
+    order = np.argsort(token_codes, kind="stable")
+    boundaries = np.flatnonzero(np.diff(token_codes[order])) + 1
+    postings = np.split(rows[order], boundaries)
+    return list(vocab), postings
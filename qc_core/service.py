@@ -0,0 +1,896 @@
+#!/usr/bin/env python3
+"""
+Datenschicht - Laden, Indizes, Statistik, Suche und Speichern ohne Streamlit
+
+Die App hält genau eine `QCService`-Instanz (st.cache_resource) und ruft
+nur noch deren Methoden auf; Caches, Bild-Index, Prefetcher, Gesamtbestand
+und Konfidenz-Tabelle werden erst beim ersten Zugriff angelegt, schwere
+Module (Bildverarbeitung, Suchindizes, Export) erst bei Bedarf importiert.
+Dieselbe Schicht ist ohne Browser nutzbar, z.B.:
+
+    python -m qc_core.service CSV_DIR --fields Komponist Signatur Titel ... stats
+    python -m qc_core.service CSV_DIR --fields ... search "Komponist:Bach"
+    python -m qc_core.service CSV_DIR --fields ... compact
+    python -m qc_core.service CSV_DIR --fields ... --audit AUDIT_DB revert BATCH
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import warnings
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from qc_core import journal
+from qc_core.batch_stats import BatchStats, batch_signature, write_sidecar
+from qc_core.cache import DataCache
+from qc_core.completeness import SPARSE_MAX_FIELDS
+from qc_core.changes import ChangeFeed, ConflictError, as_text, find_conflicts
+from qc_core.card_index import BatchView
+from qc_core.master import MasterView
+from qc_core.timing import Timings, timed_method
+
+DEFAULT_FIELDS = [
+    "Komponist", "Signatur", "Titel", "Textanfang",
+    "Verlag", "Material", "Textdichter", "Bearbeiter", "Bemerkungen"
+]
+# So viele Suchergebnisse (je Begriff und Datenstand) bleiben im Speicher, z.B. zum Blättern
+SEARCH_CACHE_ITEMS = 16
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Konfiguration der Datenschicht (entspricht den Konstanten im App-Skript)."""
+    csv_dir: str
+    editable_fields: tuple = tuple(DEFAULT_FIELDS)
+    search_fields: tuple = ("Komponist", "Titel", "Signatur", "Textanfang")
+    json_dir: str = ""
+    image_base_dir: str = ""
+    preview_cache_dir: str = ""
+    image_index_path: str = ""
+    image_index_max_age: int = 300
+    confidence_cache_path: str = ""
+    confidence_max_age: int = 300
+    duplicate_hash_path: str = ""
+    duplicate_max_age: int = 3600
+    authority_fields: tuple = ()
+    authority_index_path: str = ""
+    audit_db_path: str = ""
+    export_cache_dir: str = ""
+    search_index_path: str = ""
+    fuzzy_index_path: str = ""
+    storage_backend: str = "csv"
+    loading_mode: str = "memory"
+    chunk_rows: int = 100_000
+    chunked_search_limit: int = 1000
+    cache_max_mb: int = 2048
+    prefetch_neighbours: int = 3
+    prefetch_cache_mb: int = 256
+    timing_log_path: str = ""
+
+
+@dataclass
+class SearchResult:
+    """Ergebnis einer Suche: Treffer, Datenstand (für Exporte) und Gesamtzahl."""
+    results: pd.DataFrame
+    version: tuple
+    n_hits: int
+    # Ähnliche Schreibweisen (nur fehlertolerante Suche): Feld, Wert, Distanz, Karten
+    similar: list = field(default_factory=list)
+
+
+def calculate_statistics(batch_stats):
+    """Berechnet Statistiken aus den Kennzahlen eines Batches oder des Gesamtbestands."""
+    stats = {
+        "total": batch_stats.total,
+        "komponist": batch_stats.field_counts.get('Komponist', 0),
+        "signatur": batch_stats.field_counts.get('Signatur', 0),
+        "titel": batch_stats.field_counts.get('Titel', 0),
+    }
+
+    # Vollständigkeit (mindestens 6 Felder gefüllt)
+    stats["complete"] = batch_stats.complete
+    stats["sparse"] = batch_stats.sparse
+
+    return stats
+
+
+class QCService:
+    """Gemeinsame Datenschicht aller Sitzungen mit verzögert angelegten Singletons.
+
+    `warn(text)` meldet nicht fatale Probleme (z.B. nicht speicherbarer
+    Index); die App übergibt st.warning.
+    """
+
+    def __init__(self, settings, warn=None):
+        self.settings = settings
+        self.fields = list(settings.editable_fields)
+        self.warn = warn or (lambda text: warnings.warn(text, stacklevel=2))
+        self.timings = Timings(log_path=settings.timing_log_path or None)
+        self.data_cache = DataCache(max_bytes=settings.cache_max_mb * 1024 ** 2)
+        self.changes = ChangeFeed()
+        self._singletons = {}
+        self._singleton_locks = {}
+        self._guard = threading.Lock()
+        self._batch_list = (None, [])
+        self._duplicates = None
+        self._search_results = OrderedDict()
+        # Ausweichsuche nicht indizierter Bilder: (Stand des Bild-Index, {(Batch, Datei): Eintrag})
+        self._probed_images = (None, {})
+
+    def _singleton(self, name, factory):
+        """Legt ein Singleton beim ersten Zugriff an (thread-sicher).
+
+        Jedes Singleton hat eine eigene Sperre: ein langsamer Aufbau hält
+        nur Zugriffe auf dasselbe Singleton auf, nicht die übrigen.
+        """
+        instance = self._singletons.get(name)
+        if instance is not None:
+            return instance
+        with self._guard:
+            lock = self._singleton_locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in self._singletons:
+                self._singletons[name] = factory()
+            return self._singletons[name]
+
+    # --- Batches ---
+
+    def batch_list(self):
+        """Namen aller Batches; das Verzeichnis wird nur bei geänderter mtime neu gelesen."""
+        try:
+            mtime = os.stat(self.settings.csv_dir).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        cached_mtime, batches = self._batch_list
+        if cached_mtime != mtime:
+            batches = sorted(path.stem for path in Path(self.settings.csv_dir).glob("*.csv"))
+            self._batch_list = (mtime, batches)
+        return batches
+
+    def csv_path(self, batch):
+        """CSV-Pfad eines Batches."""
+        return Path(self.settings.csv_dir) / f"{batch}.csv"
+
+    def batch_csv_paths(self):
+        """CSV-Pfade aller Batches."""
+        return list(self.master.batch_paths().values())
+
+    @timed_method("Batch laden")
+    def load_batch(self, csv_path):
+        """Lädt Batch-CSV inkl. offener Journal-Korrekturen als BatchView (geteilt, wird beim Speichern direkt aktualisiert).
+
+        Korrekturen anderer Prozesse werden aus dem Journal nachgelesen und
+        direkt in den geladenen Batch übernommen.
+        """
+        def load():
+            df, position = journal.load_with_position(csv_path, self.settings.storage_backend)
+            view = BatchView.from_frame(df, self.fields)
+            view.journal_position = position
+            return view
+
+        view = self.data_cache.get(csv_path, load, kind="batch")
+        if view is not None and journal.journal_changed(csv_path, view.journal_position):
+            with journal.locked(csv_path):
+                caught_up = self._catch_up(view, csv_path)
+            if not caught_up:
+                # Journal wurde inzwischen in die CSV übernommen
+                self.data_cache.invalidate(csv_path, "batch")
+                view = self.data_cache.get(csv_path, load, kind="batch")
+        return view
+
+    def _catch_up(self, view, csv_path):
+        """Übernimmt neue Journal-Einträge in einen geladenen Batch (Aufrufer hält journal.locked()).
+
+        Gibt False zurück, wenn der Batch neu geladen werden muss.
+        """
+        entries, position = journal.read_since(csv_path, view.journal_position)
+        if entries is None:
+            return False
+        if entries:
+            rows = list(dict.fromkeys(journal.apply_edits(view.df, entries)))
+            view.rows_changed(rows)
+            fields = {name for entry in entries for name in entry.get("changes", {})}
+            self.changes.publish(Path(csv_path).stem, rows, fields)
+        view.journal_position = position
+        return True
+
+    def _load_batch_or_none(self, csv_path):
+        try:
+            return self.load_batch(csv_path)
+        except Exception as e:
+            self.warn(f"Fehler beim Laden von {Path(csv_path).name}: {e}")
+            return None
+
+    @property
+    def master(self):
+        """Gesamtbestand aus allen Batch-CSVs (nutzt die gecachten Batches)."""
+        def create():
+            stats_func = None
+            if self.settings.loading_mode == "chunked":
+                from qc_core import streaming
+
+                # Fehlende Sidecars blockweise berechnen, statt ganze Batches zu laden
+                stats_func = lambda path: streaming.batch_stats(
+                    path, self.fields, self.settings.storage_backend, self.settings.chunk_rows
+                )
+            return MasterView(
+                self.settings.csv_dir, self.fields, loader=self._load_batch_or_none, stats_func=stats_func
+            )
+        return self._singleton("master", create)
+
+    def batch_stats(self, batch, view=None):
+        """Kennzahlen eines Batches aus seinem Sidecar (ersatzweise aus dem geladenen Batch)."""
+        with self.timings.measure("Batch-Kennzahlen"):
+            stats = self.master.stats_of(batch)
+        if stats is None and view is not None:
+            stats = BatchStats.from_completeness(batch, view.completeness)
+        return stats
+
+    def load_card_list(self):
+        """Datei und Batch aller Karten (z.B. für den Abdeckungsbericht)."""
+        if self.settings.loading_mode == "chunked":
+            from qc_core import streaming
+
+            chunks = streaming.iter_cards(
+                self.batch_csv_paths(), ['Datei', 'Batch'], self.settings.storage_backend, self.settings.chunk_rows
+            )
+            return pd.concat(chunks, ignore_index=True)
+        return self.master.frame(['Datei', 'Batch'])
+
+    # --- Speichern ---
+
+    def save_corrections(self, batch, csv_path, row_index, changes, expected=None, source=None, reviewer=None):
+        """Speichert Korrekturen einer Karte im Journal und aktualisiert den geladenen Batch."""
+        self.save_bulk_corrections(
+            batch, csv_path, {row_index: changes},
+            expected={row_index: expected} if expected is not None else None, source=source, reviewer=reviewer
+        )
+
+    @timed_method("Speichern")
+    def save_bulk_corrections(self, batch, csv_path, edits, expected=None, source=None, reviewer=None):
+        """Speichert Korrekturen mehrerer Karten ({Zeile: {Feld: Wert}}) in einem Schreibvorgang.
+
+        `expected` ({Zeile: {Feld: gesehener Wert}}) aktiviert die
+        optimistische Sperre: Hat inzwischen jemand anderes eines dieser
+        Felder geändert, wird nichts gespeichert und ConflictError
+        ausgelöst. `source` kennzeichnet die Änderung im Feed (z.B. Sitzung)
+        und wird mit `reviewer` im Änderungsprotokoll vermerkt.
+
+        Bei anderen Fehlern wird nur dieser Batch aus dem Cache verworfen
+        (damit er beim nächsten Zugriff konsistent neu geladen wird) und die
+        Ausnahme weitergereicht.
+        """
+        try:
+            for _ in range(2):
+                # Geteilten Batch verwenden (kann seit dem Anzeigen neu geladen worden sein)
+                batch = self.load_batch(csv_path) or batch
+                with journal.locked(csv_path):
+                    # Stand anderer Prozesse übernehmen, dann prüfen und schreiben
+                    if not self._catch_up(batch, csv_path):
+                        self.data_cache.invalidate(csv_path, "batch")
+                        continue
+                    if expected:
+                        conflicts = find_conflicts(batch.df, edits, expected)
+                        if len(conflicts) > 0:
+                            raise ConflictError(conflicts)
+                    entries, position = journal.write_edits(
+                        csv_path, [(row, batch.df.at[row, 'Datei'], changes) for row, changes in edits.items()]
+                    )
+                    audit_rows = [
+                        (row, batch.df.at[row, 'Datei'], name,
+                         batch.df.at[row, name] if name in batch.df.columns else None, value)
+                        for row, changes in edits.items() for name, value in changes.items()
+                    ]
+                    journal.apply_edits(batch.df, entries)
+                    batch.journal_position = position
+                    batch.rows_changed(list(edits))
+                    # Statistik-Sidecar zum neuen Stand schreiben (Übersicht liest nur diese Datei);
+                    # unter der Sperre, damit Signatur und Kennzahlen zusammenpassen
+                    stats = BatchStats.from_completeness(Path(csv_path).stem, batch.completeness)
+                    write_sidecar(csv_path, stats, self.fields, batch_signature(csv_path))
+                    break
+            else:
+                raise RuntimeError("Journal wurde während des Speicherns übernommen - bitte erneut speichern")
+            self.changes.publish(
+                Path(csv_path).stem, list(edits), {name for changes in edits.values() for name in changes}, source
+            )
+            self._record_audit(Path(csv_path).stem, audit_rows, reviewer, source, entries[0]["ts"] if entries else None)
+            if journal.journal_size(csv_path) >= journal.COMPACT_THRESHOLD:
+                journal.compact_in_background(csv_path, self.settings.storage_backend)
+        except ConflictError:
+            raise
+        except Exception:
+            self.data_cache.invalidate(csv_path)
+            raise
+
+    def _record_audit(self, batch_name, changes, reviewer, source, ts):
+        """Protokolliert gespeicherte Änderungen; ein Fehler hier macht das Speichern nicht rückgängig."""
+        log = self.audit
+        if log is None:
+            return
+        try:
+            log.record(batch_name, changes, reviewer, source, ts)
+        except Exception as e:
+            self.warn(f"Änderungsprotokoll konnte nicht geschrieben werden: {e}")
+
+    def replace_preview(self, csv_paths, fields, pattern, replacement, regex=True, case=True):
+        """Vorschau von Suchen & Ersetzen über mehrere Batches (Spalten Zeile, Datei, Feld, Alt, Neu, Batch).
+
+        Löst `re.error` bei ungültigen regulären Ausdrücken aus.
+        """
+        from qc_core import bulk
+
+        compiled = bulk.compile_pattern(pattern, regex, case)
+        previews = []
+        for path in csv_paths:
+            view = self._load_batch_or_none(str(path))
+            if view is not None:
+                preview = bulk.replace_preview(view.df, fields, compiled, replacement, regex)
+                previews.append(preview.assign(Batch=Path(path).stem))
+        if not previews:
+            return bulk.replace_preview(pd.DataFrame(columns=['Datei']), [], compiled, replacement).assign(Batch='')
+        return pd.concat(previews, ignore_index=True)
+
+    def apply_replace(self, csv_paths, fields, pattern, replacement, regex=True, case=True, source=None, reviewer=None):
+        """Wendet Suchen & Ersetzen auf dem aktuellen Stand an; je Batch ein Schreibvorgang.
+
+        Gibt die Anzahl geänderter Karten zurück.
+        """
+        from qc_core import bulk
+
+        compiled = bulk.compile_pattern(pattern, regex, case)
+        n_changed = 0
+        for path in csv_paths:
+            view = self._load_batch_or_none(str(path))
+            if view is None:
+                continue
+            edits = bulk.changes_by_row(bulk.replace_preview(view.df, fields, compiled, replacement, regex))
+            if edits:
+                self.save_bulk_corrections(view, str(path), edits, source=source, reviewer=reviewer)
+                n_changed += len(edits)
+        return n_changed
+
+    # --- Änderungsprotokoll ---
+
+    @property
+    def audit(self):
+        """Änderungsprotokoll oder None, wenn kein AUDIT_DB_PATH gesetzt ist."""
+        if not self.settings.audit_db_path:
+            return None
+
+        def create():
+            from qc_core.audit import AuditLog
+
+            return AuditLog(self.settings.audit_db_path)
+        return self._singleton("audit", create)
+
+    def card_history(self, batch_name, datei):
+        """Änderungsverlauf einer Karte (leer ohne Protokoll)."""
+        log = self.audit
+        return log.card_history(batch_name, datei) if log is not None else pd.DataFrame()
+
+    def correction_rates(self, total=None):
+        """Korrekturquote je Feld: Karten mit vom Ausgangswert abweichendem Wert je Karten gesamt.
+
+        `total` ist die Kartenzahl des Gesamtbestands (fehlt sie, wird sie
+        aus den aktualisierten Kennzahlen gelesen).
+        """
+        log = self.audit
+        if log is None:
+            return pd.DataFrame(columns=["Feld", "Bearbeitet", "Korrigiert", "Quote"])
+        rates = log.field_rates()
+        if total is None:
+            self.master.refresh()
+            total = self.master.totals().total
+        return rates.assign(Quote=(rates["Korrigiert"] / total * 100).round(2) if total else 0.0)
+
+    def revert_to_original(self, batch_name, files=None, fields=None, rows=None, source=None, reviewer=None):
+        """Setzt geänderte Felder eines Batches (oder einzelner Karten) auf ihre Ausgangswerte zurück.
+
+        Ausgangswert ist der Stand vor der ersten protokollierten Änderung;
+        zurückgesetzt werden kann nur, was im Änderungsprotokoll steht. Leere
+        Ausgangswerte werden wieder zu fehlenden Werten. Protokollierte Zeilen
+        werden wie Journal-Einträge zugeordnet (Zeile, Datei zur Kontrolle);
+        `rows` beschränkt auf einzelne Zeilen (z.B. bei mehrfachem
+        Dateinamen). Das Zurücksetzen wird selbst protokolliert; gibt die
+        Anzahl geänderter Karten zurück.
+        """
+        from qc_core.audit import stored
+
+        log = self.audit
+        if log is None:
+            raise RuntimeError("Kein Änderungsprotokoll konfiguriert (AUDIT_DB_PATH)")
+        originals = log.original_values(batch_name, files)
+        if fields is not None:
+            originals = originals[originals["Feld"].isin(fields)]
+        path = str(self.csv_path(batch_name))
+        view = self.load_batch(path)
+        edits = {}
+        for logged_row, datei, name, value in originals[["Zeile", "Datei", "Feld", "Ausgangswert"]].itertuples(index=False):
+            entry = {"row": None if pd.isna(logged_row) else int(logged_row), "Datei": datei}
+            row = journal.resolve_row(view.df, entry)
+            if row is None or (rows is not None and row not in rows):
+                continue
+            value = as_text(value) or None
+            current = stored(view.df.at[row, name]) if name in view.df.columns else None
+            if current != value:
+                edits.setdefault(row, {})[name] = value
+        if edits:
+            self.save_bulk_corrections(view, path, edits, source=source, reviewer=reviewer)
+        return len(edits)
+
+    # --- Bilder ---
+
+    @property
+    def image_index(self):
+        """Bild-Index; wird beim ersten Zugriff aufgebaut, danach im Hintergrund aktualisiert."""
+        def create():
+            from qc_core.image_index import ImageIndex
+
+            index = ImageIndex(self.settings.image_base_dir, self.settings.image_index_path or None)
+            if len(index) == 0:
+                index.refresh()
+            return index
+        return self._singleton("image_index", create)
+
+    def _probe_image(self, batch, filename):
+        """(Pfad, mtime_ns, Größe) über verschiedene Pfad-Kombinationen; ein stat() je Versuch."""
+        base = Path(self.settings.image_base_dir)
+        for img_path in (base / batch / filename, base / filename, base.parent / batch / filename):
+            try:
+                stat = img_path.stat()
+            except OSError:
+                continue
+            return img_path, stat.st_mtime_ns, stat.st_size
+        return None
+
+    def find_image(self, batch, filename, index=None):
+        """Sucht die Bilddatei einer Karteikarte."""
+        # Schneller Weg über den Bild-Index
+        if index is not None:
+            img_path = index.resolve(batch, filename)
+            if img_path is not None:
+                return img_path
+
+        # Nicht im Index (z.B. neu hinzugekommen): Versuche verschiedene Pfad-Kombinationen
+        entry = self._probe_image(batch, filename)
+        return entry[0] if entry is not None else None
+
+    @timed_method("Bildpfad suchen")
+    def image_entry(self, batch, filename):
+        """(Pfad, mtime_ns, Größe) eines Kartenbilds oder None, wenn es fehlt.
+
+        Kommt aus dem Bild-Index (Stand des letzten Scans, ohne Zugriff auf
+        die Bildfreigabe). Nicht indizierte Bilder werden über die
+        Ausweichpfade gesucht; das Ergebnis (auch "nicht gefunden") gilt bis
+        zur nächsten Aktualisierung des Index.
+        """
+        index = self.image_index
+        entry = index.lookup(batch, filename)
+        if entry is not None:
+            return entry
+        refreshed, probed = self._probed_images
+        if refreshed != index.last_refresh:
+            probed = {}
+            self._probed_images = (index.last_refresh, probed)
+        if (batch, filename) not in probed:
+            probed[(batch, filename)] = self._probe_image(batch, filename)
+        return probed[(batch, filename)]
+
+    def image_key(self, batch, filename, width):
+        """Prefetch-Schlüssel (Pfad, Breite, mtime, Größe) eines Kartenbilds oder None, wenn es fehlt.
+
+        Durch mtime und Größe liefert ein neu gescanntes Bild einen neuen
+        Schlüssel und damit keine veraltete Vorschau.
+        """
+        entry = self.image_entry(batch, filename)
+        if entry is None:
+            return None
+        img_path, mtime_ns, size = entry
+        return (str(img_path), width, mtime_ns, size)
+
+    @timed_method("Bild lesen (Vorschau)")
+    def read_card_image(self, key):
+        """Liest Vorschau-Bytes zu einem image_key(); None, wenn die Datei inzwischen fehlt. Läuft auch im Prefetch-Thread."""
+        from qc_core.previews import get_preview
+
+        img_path, width, _, _ = key
+        try:
+            return get_preview(img_path, width, self.settings.preview_cache_dir).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    @property
+    def prefetcher(self):
+        """Bild-Prefetcher aller Sitzungen."""
+        def create():
+            from qc_core.prefetch import ImagePrefetcher
+
+            return ImagePrefetcher(self.read_card_image, max_bytes=self.settings.prefetch_cache_mb * 1024 ** 2)
+        return self._singleton("prefetcher", create)
+
+    @timed_method("Bild anzeigen")
+    def load_image(self, batch, filename, width):
+        """Lädt Karteikarten-Bild als Vorschau (width=None: Originalauflösung)."""
+        self.image_index.refresh_in_background(self.settings.image_index_max_age)
+        key = self.image_key(batch, filename, width)
+        return self.prefetcher.get(key) if key is not None else None
+
+    def prefetch_images(self, batch, df, order, card_index, width, owner=None):
+        """Lädt die Bilder der benachbarten Karten (in der aktuellen Reihenfolge) im Hintergrund vor.
+
+        `owner` (z.B. Sitzung) verwirft beim Blättern die noch wartenden
+        Vorladevorgänge der vorherigen Karte.
+        """
+        from qc_core.prefetch import neighbour_positions
+
+        positions = neighbour_positions(card_index, len(order), self.settings.prefetch_neighbours)
+        filenames = df['Datei'].loc[order[positions]]
+        keys = [self.image_key(batch, filename, width) for filename in filenames]
+        self.prefetcher.prefetch([key for key in keys if key is not None], owner)
+
+    def coverage_report(self):
+        """Karten ohne Bild und Bilder ohne CSV-Zeile."""
+        from qc_core.image_index import coverage_report
+
+        return coverage_report(self.image_index, self.load_card_list(), resolve=self.find_image)
+
+    # --- Konfidenz ---
+
+    @property
+    def confidence_table(self):
+        """Konfidenz-Tabelle aus JSON_DIR; wird im Hintergrund aufgebaut und aktualisiert.
+
+        Bis zum ersten Aufbau ist sie leer (bzw. auf dem gespeicherten Stand);
+        `ready` zeigt, ob JSON_DIR seit dem Start gelesen wurde.
+        """
+        def create():
+            from qc_core.confidence import ConfidenceTable
+
+            return ConfidenceTable(self.settings.json_dir, self.settings.confidence_cache_path or None)
+        table = self._singleton("confidence_table", create)
+        table.refresh_in_background(self.settings.confidence_max_age)
+        return table
+
+    def card_confidence(self, df):
+        """Niedrigste VLM-Konfidenz je Karte (NaN ohne JSON-Ausgabe)."""
+        return self.confidence_table.confidence(df['Datei'])
+
+    # --- Duplikate ---
+
+    @property
+    def image_hashes(self):
+        """Bild-Hashes der Duplikatprüfung; werden nur im Hintergrund aufgebaut und aktualisiert."""
+        def create():
+            from qc_core.duplicates import ImageHashes
+
+            return ImageHashes(self.settings.image_base_dir, self.settings.duplicate_hash_path or None)
+        hashes = self._singleton("image_hashes", create)
+        from qc_core.duplicates import indexed_image_paths
+
+        hashes.refresh_in_background(lambda: indexed_image_paths(self.image_index), self.settings.duplicate_max_age)
+        return hashes
+
+    @property
+    def duplicates_version(self):
+        """Stand der letzten Duplikatprüfung (0 = noch keine)."""
+        return self._duplicates.version if self._duplicates is not None else 0
+
+    def duplicate_report(self):
+        """Ergebnis der letzten Duplikatprüfung oder None."""
+        return self._duplicates
+
+    @timed_method("Duplikatprüfung")
+    def duplicates(self, refresh=False):
+        """Duplikatprüfung über den Gesamtbestand; das Ergebnis gilt bis zur nächsten Prüfung mit `refresh`."""
+        from qc_core import duplicates
+
+        with self._guard:
+            report = self._duplicates
+        if report is not None and not refresh:
+            return report
+
+        columns = list(dict.fromkeys(['Datei', 'Batch'] + duplicates.SIGNATURE_FIELDS + duplicates.WORK_FIELDS))
+        if self.settings.loading_mode == "chunked":
+            from qc_core import streaming
+
+            cards = pd.concat(
+                streaming.iter_cards(self.batch_csv_paths(), columns, self.settings.storage_backend, self.settings.chunk_rows),
+                ignore_index=True
+            )
+        else:
+            cards = self.master.frame(columns)
+        hashes = self.image_hashes
+        report = duplicates.find_duplicates(cards, duplicates.card_image_paths(cards, self.image_index), hashes)
+        report.version = self.duplicates_version + 1
+        report.hashed_images = len(hashes)
+        with self._guard:
+            self._duplicates = report
+        return report
+
+    # --- Schreibweisen ---
+
+    @property
+    def authority_index(self):
+        """Werte-Index der Normdaten-Felder (Zählungen je Batch, inkrementell)."""
+        def create():
+            from qc_core.authority import AuthorityIndex, value_counts
+
+            fields = list(self.settings.authority_fields)
+            if self.settings.loading_mode == "chunked":
+                from collections import Counter
+                from qc_core import streaming
+
+                def counts_func(csv_path):
+                    totals = {name: Counter() for name in fields}
+                    for chunk in streaming.iter_cards(
+                        [csv_path], fields, self.settings.storage_backend, self.settings.chunk_rows
+                    ):
+                        for name, counts in value_counts(chunk, fields).items():
+                            totals[name].update(counts)
+                    return {name: dict(counts) for name, counts in totals.items()}
+            else:
+                def counts_func(csv_path):
+                    view = self._load_batch_or_none(csv_path)
+                    return value_counts(view.df, fields) if view is not None else None
+
+            return AuthorityIndex(
+                self.settings.csv_dir, fields, counts_func, self.settings.authority_index_path or None
+            )
+        return self._singleton("authority_index", create)
+
+    @timed_method("Schreibweisen")
+    def value_clusters(self, field_name, method="fingerprint"):
+        """Cluster abweichender Schreibweisen eines Felds (aktualisiert geänderte Batches vorher)."""
+        index = self.authority_index
+        index.refresh()
+        return index.clusters(field_name, method)
+
+    def apply_canonical(self, field_name, values, canonical, source=None, reviewer=None):
+        """Setzt alle Karten mit einem der Werte auf den Normwert; je Batch ein Schreibvorgang.
+
+        Gelesen werden nur Batches, in denen einer der Werte vorkommt. Gibt
+        (Anzahl geänderter Karten, Anzahl Batches) zurück.
+        """
+        values = [value for value in values if value != canonical]
+        n_changed, n_batches = 0, 0
+        for name in self.authority_index.batches_with(field_name, values):
+            path = self.csv_path(name)
+            view = self._load_batch_or_none(str(path))
+            if view is None or field_name not in view.df.columns:
+                continue
+            rows = view.df.index[view.df[field_name].astype(str).isin(values) & view.df[field_name].notna()]
+            if len(rows):
+                self.save_bulk_corrections(
+                    view, str(path), {row: {field_name: canonical} for row in rows}, source=source, reviewer=reviewer
+                )
+                n_changed += len(rows)
+                n_batches += 1
+        return n_changed, n_batches
+
+    # --- Suche ---
+
+    @timed_method("Suchindex laden")
+    def load_persisted_index(self, index_cls, index_path, kind):
+        """Aktueller Stand (IndexState) eines Index über die Suchfelder des Gesamtbestands.
+
+        Die Basis wird einmal gebaut und auf Platte gespeichert; danach
+        geänderte Batches werden über eigene kleine Indizes nachgetragen
+        (LiveIndex), statt nach jeder Korrektur alles neu zu bauen.
+        Treffer liefert self.master.take(positions, state.layout).
+        """
+        from qc_core.live_index import LiveIndex
+
+        search_fields = list(self.settings.search_fields)
+        key = (str(Path(self.settings.csv_dir).resolve()), tuple(search_fields))
+
+        def load():
+            index = index_cls.load(index_path) if index_path else None
+            if index is None or not index.signature or index.signature[0] != key:
+                return None
+            self.timings.count(f"{index_cls.__name__}: von Platte")
+            return index, index.signature[1]
+
+        def build():
+            self.timings.count(f"{index_cls.__name__}: neu gebaut")
+            # Nur die Suchfelder zusammensetzen; die Kopie entfällt nach dem Aufbau
+            frame, layout = self.master.snapshot(search_fields)
+            index = index_cls.build(frame, search_fields, signature=(key, layout))
+            if index_path:
+                try:
+                    index.save(index_path)
+                except OSError as e:
+                    self.warn(f"Index konnte nicht gespeichert werden: {e}")
+            return index, layout
+
+        def build_batch(name):
+            self.timings.count(f"{index_cls.__name__}: Batch nachgetragen")
+            view = self._load_batch_or_none(str(self.csv_path(name)))
+            if view is None:
+                return None
+            df = view.df[[c for c in search_fields if c in view.df.columns]]
+            return index_cls.build(df, search_fields), len(df)
+
+        live = self._singleton(kind, lambda: LiveIndex(build, build_batch, load))
+        return live.state(self.master.signatures())
+
+    def load_search_index(self):
+        """Invertierter Suchindex (Präfix, akzent-/umlautunabhängig) über den Gesamtbestand."""
+        from qc_core.search import SearchIndex
+
+        return self.load_persisted_index(SearchIndex, self.settings.search_index_path, "search_index")
+
+    def load_fuzzy_index(self):
+        """Trigramm-Index der fehlertoleranten Suche über den Gesamtbestand."""
+        from qc_core.fuzzy import FuzzyIndex
+
+        return self.load_persisted_index(FuzzyIndex, self.settings.fuzzy_index_path, "fuzzy_index")
+
+    def _cached_search(self, version, compute):
+        """Suchergebnis je Stand (`version`) aus dem Speicher oder neu berechnet."""
+        with self._guard:
+            result = self._search_results.get(version)
+            if result is not None:
+                self._search_results.move_to_end(version)
+        if result is not None:
+            self.timings.count("Suche: aus Cache")
+            return result
+        result = compute()
+        with self._guard:
+            self._search_results[version] = result
+            while len(self._search_results) > SEARCH_CACHE_ITEMS:
+                self._search_results.popitem(last=False)
+        return result
+
+    @timed_method("Suche")
+    def search(self, term, fuzzy=False, max_distance=2):
+        """Sucht über alle Batches (Treffer nach Relevanz sortiert).
+
+        Ergebnisse werden je Begriff und Datenstand zwischengespeichert;
+        erneute Abfragen (z.B. beim Blättern) kosten nur die Prüfung des
+        Stands.
+        """
+        search_fields = list(self.settings.search_fields)
+        if self.settings.loading_mode == "chunked":
+            from qc_core import streaming
+
+            self.master.refresh()
+            version = (self.master.signature(), term, fuzzy, max_distance)
+
+            def compute():
+                # Ohne Gesamtindex: blockweise suchen, die besten Treffer behalten
+                results, n_hits = streaming.search(
+                    self.batch_csv_paths(), term, search_fields,
+                    limit=self.settings.chunked_search_limit, fuzzy=fuzzy, max_distance=max_distance,
+                    backend=self.settings.storage_backend, chunksize=self.settings.chunk_rows
+                )
+                return SearchResult(results, version, n_hits)
+            return self._cached_search(version, compute)
+
+        if fuzzy:
+            state = self.load_fuzzy_index()
+            version = (state.version, term, max_distance)
+
+            def compute():
+                hits, _ = state.search(lambda index: index.search(term, max_distance))
+                # Ähnliche Schreibweisen des Suchbegriffs je Feld (Originalschreibweise aus der ersten Karte)
+                matches = state.similar_values(term, max_distance=max_distance)
+                firsts = self.master.take(np.unique([rows[0] for *_, rows in matches]), state.layout)
+                similar = [
+                    {'Feld': name, 'Wert': firsts.at[rows[0], name], 'Distanz': distance, 'Karten': len(rows)}
+                    for name, _, distance, rows in matches if rows[0] in firsts.index
+                ]
+                return SearchResult(self.master.take(hits, state.layout), version, len(hits), similar)
+            return self._cached_search(version, compute)
+
+        state = self.load_search_index()
+        version = (state.version, term)
+
+        def compute():
+            hits, _ = state.search(lambda index: index.search(term, with_scores=True))
+            return SearchResult(self.master.take(hits, state.layout), version, len(hits))
+        return self._cached_search(version, compute)
+
+    # --- Export ---
+
+    @property
+    def export_cache(self):
+        """Export-Cache aller Sitzungen."""
+        def create():
+            from qc_core.export import ExportCache
+
+            return ExportCache(self.settings.export_cache_dir or Path(tempfile.gettempdir()) / "qc_exports")
+        return self._singleton("export_cache", create)
+
+    def complete_export(self):
+        """(frames_func, columns, version) des Gesamtexports, blockweise je Batch.
+
+        `version` ist der Stand aller Batches (Schlüssel im Export-Cache).
+        """
+        version = self.master.signature()
+        if self.settings.loading_mode == "chunked":
+            from qc_core import streaming
+
+            paths = self.batch_csv_paths()
+            backend, chunk_rows = self.settings.storage_backend, self.settings.chunk_rows
+            return (
+                lambda: streaming.iter_cards(paths, None, backend, chunk_rows),
+                lambda: streaming.all_columns(paths, backend),
+                version,
+            )
+        return self.master.frames, None, version
+
+    def problem_export(self, columns):
+        """(frames_func, columns, version) der problematischen Karten."""
+        version = (self.master.signature(), SPARSE_MAX_FIELDS)
+        if self.settings.loading_mode == "chunked":
+            from qc_core import streaming
+
+            paths = self.batch_csv_paths()
+            return (
+                lambda: streaming.problem_cards(
+                    paths, self.fields, columns,
+                    backend=self.settings.storage_backend, chunksize=self.settings.chunk_rows
+                ),
+                columns,
+                version,
+            )
+        return lambda: self.master.frames(select=lambda view: view.completeness.sparse_mask()), columns, version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Datenschicht der Qualitätskontrolle ohne Browser")
+    parser.add_argument("csv_dir", help="Verzeichnis mit Batch-CSVs (CSV_DIR)")
+    parser.add_argument("--fields", nargs="+", default=DEFAULT_FIELDS, help="Editierbare Felder (EDITABLE_FIELDS)")
+    parser.add_argument("--backend", default="csv", help="Speicher-Backend (csv oder parquet)")
+    parser.add_argument("--mode", default="memory", choices=["memory", "chunked"], help="Lademodus (LOADING_MODE)")
+    parser.add_argument("--audit", default="", help="Änderungsprotokoll (AUDIT_DB_PATH)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Kennzahlen je Batch und gesamt")
+    search = commands.add_parser("search", help="Suche über alle Batches")
+    search.add_argument("term")
+    search.add_argument("--fuzzy", action="store_true", help="Fehlertolerant suchen")
+    search.add_argument("--out", help="Treffer als CSV speichern")
+    commands.add_parser("compact", help="Offene Journale in die CSVs übernehmen")
+    revert = commands.add_parser("revert", help="Batch auf die Ausgangswerte zurücksetzen (benötigt --audit)")
+    revert.add_argument("batch")
+    revert.add_argument("--reviewer", default="kommandozeile", help="Name im Änderungsprotokoll")
+    args = parser.parse_args()
+
+    service = QCService(Settings(
+        csv_dir=args.csv_dir, editable_fields=tuple(args.fields),
+        storage_backend=args.backend, loading_mode=args.mode, audit_db_path=args.audit,
+    ))
+
+    if args.command == "stats":
+        service.master.refresh()
+        for stats in service.master.batch_stats() + [service.master.totals()]:
+            values = calculate_statistics(stats)
+            print(f"{stats.batch or 'GESAMT':<30} {values['total']:>9,} Karten, "
+                  f"{values['complete']:>9,} vollständig, {values['sparse']:>9,} spärlich")
+    elif args.command == "search":
+        result = service.search(args.term, fuzzy=args.fuzzy)
+        print(f"{result.n_hits:,} Treffer")
+        if args.out:
+            result.results.to_csv(args.out, index=False, encoding="utf-8-sig")
+        else:
+            print(result.results.head(20).to_string(index=False))
+    elif args.command == "compact":
+        for path in service.batch_csv_paths():
+            if journal.journal_size(path) > 0 and journal.compact(path, args.backend):
+                print(f"{path.name}: Journal übernommen")
+    elif args.command == "revert":
+        if not args.audit:
+            parser.error("revert benötigt --audit")
+        n_cards = service.revert_to_original(args.batch, reviewer=args.reviewer, source="cli")
+        print(f"{n_cards:,} Karten auf Ausgangswerte zurückgesetzt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Speicher-Backend - CSV (Standard) oder Parquet-Spiegel für schnelle Lesezugriffe
+
+Die CSV bleibt das Import-/Exportformat und wird bei jeder Übernahme von
+Korrekturen geschrieben. Im Backend "parquet" liegt neben jeder CSV eine
+`<name>.parquet`, aus der spaltenweise gelesen wird. Ist die CSV neuer als
+der Spiegel (z.B. extern bearbeitet), wird sie beim nächsten Lesen neu
+importiert.
+
+Alle Batch-CSVs eines Verzeichnisses vorab importieren (benötigt pyarrow):
+    python -m qc_core.storage CSV_DIR [CSV ...]
+"""
+
+import argparse
+import importlib.util
+import os
+from pathlib import Path
+
+import pandas as pd
+
+BACKENDS = ("csv", "parquet")
+
+
+def parquet_available():
+    """True, wenn pyarrow installiert ist (ohne es zu importieren)."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def resolve_backend(backend):
+    """Prüft das gewünschte Backend; ohne pyarrow wird auf CSV zurückgefallen."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unbekanntes Speicher-Backend: {backend!r} (erlaubt: {', '.join(BACKENDS)})")
+    if backend == "parquet" and not parquet_available():
+        return "csv"
+    return backend
+
+
+def parquet_path(csv_path):
+    """Pfad des Parquet-Spiegels zu einer CSV."""
+    return Path(csv_path).with_suffix(".parquet")
+
+
+def _mirror_is_fresh(csv_path, pq_path):
+    try:
+        return os.stat(pq_path).st_mtime_ns >= os.stat(csv_path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def _project(df, columns):
+    if columns is None:
+        return df
+    return df[[c for c in columns if c in df.columns]]
+
+
+def _stable_schema(df):
+    """Gemischte Spalten (object, z.B. Zahlen mit Textkorrekturen) als Text, damit pyarrow sie schreiben kann."""
+    mixed = {c: "string" for c in df.columns if df[c].dtype == object}
+    return df.astype(mixed) if mixed else df
+
+
+def _write_parquet_tmp(df, csv_path):
+    pq_path = parquet_path(csv_path)
+    tmp = pq_path.with_name(f"{pq_path.name}.tmp")
+    try:
+        _stable_schema(df).to_parquet(tmp, index=False)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return tmp, pq_path
+
+
+def write_parquet(df, csv_path):
+    """Schreibt den Parquet-Spiegel atomar."""
+    tmp, pq_path = _write_parquet_tmp(df, csv_path)
+    os.replace(tmp, pq_path)
+    return pq_path
+
+
+def import_csv(csv_path):
+    """Liest eine CSV vollständig und legt den Parquet-Spiegel an."""
+    df = pd.read_csv(csv_path, encoding="utf-8-sig")
+    write_parquet(df, csv_path)
+    return df
+
+
+def read_table(csv_path, columns=None, backend="csv"):
+    """Liest eine Tabelle, optional nur die angegebenen Spalten.
+
+    Fehlende Spalten werden ignoriert, damit Batches mit abweichendem
+    Schema gelesen werden können.
+    """
+    backend = resolve_backend(backend)
+    if backend == "parquet":
+        pq_path = parquet_path(csv_path)
+        if not _mirror_is_fresh(csv_path, pq_path):
+            return _project(import_csv(csv_path), columns)
+        if columns is None:
+            return pd.read_parquet(pq_path)
+        import pyarrow.parquet as pq
+        available = set(pq.read_schema(pq_path).names)
+        return pd.read_parquet(pq_path, columns=[c for c in columns if c in available])
+
+    if columns is None:
+        return pd.read_csv(csv_path, encoding="utf-8-sig")
+    wanted = set(columns)
+    return _project(pd.read_csv(csv_path, encoding="utf-8-sig", usecols=lambda c: c in wanted), columns)
+
+
+def iter_table(csv_path, columns=None, chunksize=100_000, backend="csv"):
+    """Liest eine Tabelle blockweise; die Zeilen-Labels laufen über die Blöcke fort.
+
+    Ist der Parquet-Spiegel veraltet, wird die CSV blockweise gelesen
+    (ohne Neuimport, der die ganze Tabelle laden würde).
+    """
+    backend = resolve_backend(backend)
+    if backend == "parquet" and _mirror_is_fresh(csv_path, parquet_path(csv_path)):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(parquet_path(csv_path))
+        if columns is not None:
+            available = set(parquet_file.schema_arrow.names)
+            columns = [c for c in columns if c in available]
+        start = 0
+        for record_batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            df = record_batch.to_pandas()
+            df.index = pd.RangeIndex(start, start + len(df))
+            start += len(df)
+            yield df
+        return
+
+    wanted = None if columns is None else set(columns)
+    usecols = None if columns is None else (lambda c: c in wanted)
+    for chunk in pd.read_csv(csv_path, encoding="utf-8-sig", usecols=usecols, chunksize=chunksize):
+        yield _project(chunk, columns)
+
+
+def table_columns(csv_path, backend="csv"):
+    """Spaltennamen einer Tabelle, ohne Daten zu lesen."""
+    if resolve_backend(backend) == "parquet" and _mirror_is_fresh(csv_path, parquet_path(csv_path)):
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(parquet_path(csv_path)).names)
+    return list(pd.read_csv(csv_path, encoding="utf-8-sig", nrows=0).columns)
+
+
+def write_table(df, csv_path, backend="csv"):
+    """Schreibt die CSV atomar und aktualisiert ggf. den Parquet-Spiegel.
+
+    Der Spiegel wird vor dem Ersetzen der CSV geschrieben: scheitert er,
+    bleibt die CSV unverändert.
+    """
+    csv_path = Path(csv_path)
+    pq_tmp = None
+    if resolve_backend(backend) == "parquet":
+        pq_tmp, pq_path = _write_parquet_tmp(df, csv_path)
+    tmp = csv_path.with_name(f"{csv_path.name}.tmp")
+    df.to_csv(tmp, index=False, encoding="utf-8-sig")
+    os.replace(tmp, csv_path)
+    if pq_tmp is not None:
+        os.replace(pq_tmp, pq_path)
+        # Spiegel gilt als aktuell, wenn er nicht älter als die CSV ist
+        os.utime(pq_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSVs in Parquet-Spiegel importieren")
+    parser.add_argument("paths", nargs="+", help="CSV-Dateien oder Verzeichnisse mit CSVs")
+    args = parser.parse_args()
+
+    if not parquet_available():
+        parser.error("pyarrow ist nicht installiert (pip install pyarrow)")
+
+    for path in map(Path, args.paths):
+        csv_files = sorted(path.glob("*.csv")) if path.is_dir() else [path]
+        for csv_path in csv_files:
+            df = import_csv(csv_path)
+            print(f"{csv_path.name}: {len(df):,} Zeilen -> {parquet_path(csv_path).name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Blockweise Verarbeitung - Kennzahlen, Problemkarten und Suche mit begrenztem Speicher
+
+Für Bestände, die nicht vollständig in den Arbeitsspeicher passen: Jeder
+Batch wird in Blöcken von CHUNK_ROWS Zeilen (inkl. offener Journal-
+Korrekturen) gelesen und sofort verarbeitet; gehalten werden nur die
+Ergebnisse (Zählwerte, gefilterte Zeilen bzw. die besten Suchtreffer).
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+from qc_core import journal
+from qc_core.batch_stats import BatchStats
+from qc_core.completeness import SPARSE_MAX_FIELDS, compute_completeness
+from qc_core.fuzzy import FuzzyIndex
+from qc_core.search import SearchIndex
+from qc_core.storage import table_columns
+
+CHUNK_ROWS = 100_000
+
+
+def _with_batch(chunk, csv_path):
+    return chunk if 'Batch' in chunk.columns else chunk.assign(Batch=Path(csv_path).stem)
+
+
+def iter_cards(csv_paths, columns=None, backend="csv", chunksize=CHUNK_ROWS):
+    """Blöcke aller Batches nacheinander; fehlt `Batch`, wird sie aus dem Dateinamen ergänzt."""
+    for csv_path in csv_paths:
+        for chunk in journal.iter_with_journal(csv_path, columns, chunksize, backend):
+            yield _with_batch(chunk, csv_path)
+
+
+def all_columns(csv_paths, backend="csv"):
+    """Spalten aller Batches in der Reihenfolge ihres ersten Auftretens (inkl. `Batch`)."""
+    columns = {}
+    for csv_path in csv_paths:
+        columns.update(dict.fromkeys(table_columns(csv_path, backend)))
+    columns.setdefault('Batch')
+    return list(columns)
+
+
+def batch_stats(csv_path, fields, backend="csv", chunksize=CHUNK_ROWS):
+    """Kennzahlen eines Batches in einem blockweisen Durchlauf."""
+    name = Path(csv_path).stem
+    stats = BatchStats(batch=name, histogram=[0] * (len(fields) + 1))
+    for chunk in journal.iter_with_journal(csv_path, list(fields), chunksize, backend):
+        stats.merge(BatchStats.from_completeness(name, compute_completeness(chunk, fields)))
+    return stats
+
+
+def problem_cards(csv_paths, fields, columns, max_fields=SPARSE_MAX_FIELDS, backend="csv", chunksize=CHUNK_ROWS):
+    """Blöcke mit den Karten, die höchstens `max_fields` gefüllte Felder haben."""
+    read_columns = list(dict.fromkeys(list(columns) + list(fields)))
+    for chunk in iter_cards(csv_paths, read_columns, backend, chunksize):
+        sparse = compute_completeness(chunk, fields).sparse_mask(max_fields)
+        yield chunk.loc[sparse].reindex(columns=columns)
+
+
+def search(csv_paths, query, fields, columns=None, limit=1000, fuzzy=False, max_distance=2,
+           backend="csv", chunksize=CHUNK_ROWS):
+    """Suche ohne Gesamtindex: je Block ein Index, behalten werden die besten `limit` Treffer.
+
+    Gibt (Treffer-DataFrame, Gesamtzahl der Treffer) zurück. Die Relevanz
+    entspricht der indexbasierten Suche; bei gleicher Relevanz bleibt die
+    Dateireihenfolge erhalten.
+    """
+    read_columns = None if columns is None else list(dict.fromkeys(list(columns) + list(fields)))
+    best = None
+    n_hits = 0
+    offset = 0
+    for chunk in iter_cards(csv_paths, read_columns, backend, chunksize):
+        if fuzzy:
+            hits, scores = FuzzyIndex.build(chunk, fields).search(query, max_distance)
+        else:
+            hits, scores = SearchIndex.build(chunk, fields).search(query, with_scores=True)
+        n_hits += len(hits)
+        if len(hits) > 0:
+            found = chunk.iloc[hits].assign(_score=scores, _position=offset + hits)
+            best = found if best is None else pd.concat([best, found])
+            best = best.sort_values(['_score', '_position'], ascending=[False, True]).head(limit)
+        offset += len(chunk)
+
+    if best is None:
+        return pd.DataFrame(columns=columns or []), 0
+    results = best.drop(columns=['_score', '_position']).reset_index(drop=True)
+    if columns is not None:
+        results = results.reindex(columns=columns)
+    return results, n_hits
@@ -0,0 +1,133 @@
+"""
+Laufzeitmessung - Dauer je Verarbeitungsstufe und Zähler für Cache-Treffer
+
+Jede Messung wird mit Zeitstempel in einem Ringpuffer je Stufe gehalten
+(für p50/p95 im Diagnose-Bereich) und kann als JSON Lines exportiert bzw.
+fortlaufend an eine Datei angehängt werden, um Regressionen über die Zeit
+zu verfolgen.
+"""
+
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# Gehaltene Messungen je Stufe
+DEFAULT_MAX_SAMPLES = 1000
+
+
+class Timings:
+    """Thread-sichere Sammlung von Laufzeiten je Stufe und Zählern."""
+
+    def __init__(self, max_samples=DEFAULT_MAX_SAMPLES, log_path=None):
+        self.max_samples = max_samples
+        self.log_path = log_path
+        # Stufe -> deque von (Zeitstempel, Sekunden)
+        self._samples = {}
+        self._counters = {}
+        self._unlogged = []
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        """Erfasst eine Messung."""
+        ts = time.time()
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.max_samples)
+            samples.append((ts, seconds))
+            if self.log_path:
+                self._unlogged.append((ts, stage, seconds))
+
+    @contextmanager
+    def measure(self, stage):
+        """Kontextmanager: misst die Dauer des Blocks (auch bei Ausnahmen)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def timed(self, stage):
+        """Decorator: misst jeden Aufruf der Funktion als Stufe `stage`."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.measure(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name, n=1):
+        """Erhöht einen Zähler (z.B. "Suchindex: von Platte")."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def counters(self):
+        """Momentaufnahme aller Zähler."""
+        with self._lock:
+            return dict(self._counters)
+
+    def summary(self):
+        """Anzahl, p50, p95 und Maximum je Stufe in Millisekunden."""
+        with self._lock:
+            samples = {stage: [s for _, s in values] for stage, values in self._samples.items()}
+        rows = []
+        for stage, seconds in sorted(samples.items()):
+            ms = np.asarray(seconds) * 1000
+            rows.append((stage, len(ms), np.percentile(ms, 50), np.percentile(ms, 95), ms.max()))
+        return pd.DataFrame(rows, columns=["Stufe", "Anzahl", "p50 [ms]", "p95 [ms]", "max [ms]"])
+
+    def to_jsonl(self):
+        """Alle gehaltenen Messungen und Zähler als JSON Lines."""
+        with self._lock:
+            records = sorted(
+                (ts, stage, seconds) for stage, values in self._samples.items() for ts, seconds in values
+            )
+            counters = dict(self._counters)
+        lines = [_line(ts, stage, seconds) for ts, stage, seconds in records]
+        lines.append(json.dumps({"ts": _iso(time.time()), "counters": counters}, ensure_ascii=False))
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        """Hängt die seit dem letzten Aufruf erfassten Messungen an `log_path` an."""
+        if not self.log_path:
+            return 0
+        with self._lock:
+            records, self._unlogged = self._unlogged, []
+        if records:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write("".join(_line(ts, stage, seconds) + "\n" for ts, stage, seconds in records))
+        return len(records)
+
+    def reset(self):
+        """Verwirft alle Messungen und Zähler."""
+        with self._lock:
+            self._samples.clear()
+            self._counters.clear()
+            self._unlogged.clear()
+
+
+def timed_method(stage):
+    """Decorator für Methoden: misst jeden Aufruf über `self.timings` als Stufe `stage`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.timings.measure(stage):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="milliseconds")
+
+
+def _line(ts, stage, seconds):
+    return json.dumps({"ts": _iso(ts), "stage": stage, "ms": round(seconds * 1000, 3)}, ensure_ascii=False)
@@ -0,0 +1,175 @@
+"""
+Ansichtslogik - Filter, Formular-Abgleich und Blättern ohne Streamlit
+
+Was die App zwischen Datenschicht und Widgets rechnet, liegt hier, damit
+Kommandozeile und Tests dieselben Regeln nutzen:
+
+    Filter und Sortierungen der Batch-Ansicht (BATCH_FILTERS/BATCH_SORTS)
+    Abgleich von Formulareingaben mit Änderungen anderer Prüfer
+    Seiten großer Tabellen und Position einer Karte in der Reihenfolge
+
+Filter sind Funktionen (DataFrame, Füllgrad, Kontext) -> boolesche Maske,
+Sortierungen Spaltennamen oder Funktionen (DataFrame, Füllgrad, Kontext)
+-> Sortierwerte. Der Kontext (BatchContext) gibt Zugriff auf Datenschicht
+und Batch-Namen, z.B. für Konfidenz oder Duplikatprüfung. Funktionen, die
+solche Daten nutzen, werden mit @uses("confidence"/"duplicates")
+gekennzeichnet; nur dann hängt die gecachte Reihenfolge von deren Stand ab.
+"""
+
+from dataclasses import dataclass
+
+import pandas as pd
+
+from qc_core.changes import as_text
+from qc_core.confidence import LOW_CONFIDENCE
+
+
+@dataclass(frozen=True)
+class BatchContext:
+    """Datenschicht (QCService) und Name des angezeigten Batches."""
+    service: object
+    batch: str
+
+
+# Stand der Daten, von denen Filter und Sortierungen abhängen können
+STATES = {
+    "confidence": lambda service: service.confidence_table.version,
+    "duplicates": lambda service: service.duplicates_version,
+}
+
+
+def uses(*states):
+    """Kennzeichnet einen Filter bzw. eine Sortierung als abhängig von Daten aus STATES."""
+    unknown = set(states) - set(STATES)
+    if unknown:
+        raise ValueError(f"Unbekannte Abhängigkeit: {', '.join(sorted(unknown))}")
+
+    def mark(func):
+        func.uses = states
+        return func
+    return mark
+
+
+def depends_on(name, *funcs):
+    """True, wenn eine der Funktionen die Daten `name` (aus STATES) nutzt."""
+    return any(name in getattr(func, "uses", ()) for func in funcs)
+
+
+def states_of(service, *funcs):
+    """Stand der Daten, die die Funktionen nutzen (Teil des Cache-Schlüssels)."""
+    names = dict.fromkeys(name for func in funcs for name in getattr(func, "uses", ()))
+    return tuple(STATES[name](service) for name in names)
+
+
+# --- Filter und Sortierungen ---
+
+def sparse(df, completeness, context):
+    """Filter: problematische Karten (wenige Felder gefüllt)."""
+    return completeness.sparse_mask()
+
+
+def missing(field):
+    """Filter: Karten ohne Wert in `field`."""
+    def mask(df, completeness, context):
+        return ~completeness.filled[field]
+    return mask
+
+
+@uses("confidence")
+def low_confidence(df, completeness, context):
+    """Filter: Karten mit VLM-Konfidenz unter LOW_CONFIDENCE."""
+    return context.service.card_confidence(df) < LOW_CONFIDENCE
+
+
+@uses("duplicates")
+def duplicates(df, completeness, context):
+    """Filter: Karten, die in der letzten Duplikatprüfung aufgefallen sind (ohne Prüfung: keine)."""
+    report = context.service.duplicate_report()
+    if report is None:
+        return pd.Series(False, index=df.index)
+    return report.mask(df, context.batch)
+
+
+@uses("confidence")
+def confidence(df, completeness, context):
+    """Sortierung: niedrigste VLM-Konfidenz je Karte (ohne JSON-Ausgabe zuletzt)."""
+    return context.service.card_confidence(df)
+
+
+def batch_order(service, view, batch, filter_name, sort_name, filters, sorts):
+    """Zeilen-Labels eines Batches nach Filter und Sortierung.
+
+    `filters` und `sorts` bilden Namen auf Filter (None = alle Karten) bzw.
+    Sortierungen ab. Gecacht wird je Batch-Version und Name; Filter und
+    Sortierungen mit @uses zusätzlich je Stand der genutzten Daten (nur
+    dann wird z.B. die Konfidenz-Tabelle überhaupt angelegt).
+    """
+    context = BatchContext(service, batch)
+    card_filter, sort = filters[filter_name], sorts[sort_name]
+    mask_func = None
+    if card_filter is not None:
+        mask_func = lambda df, completeness: card_filter(df, completeness, context)
+    sort_column, sort_key = sort, None
+    if callable(sort):
+        sort_column = lambda df, completeness: sort(df, completeness, context)
+        sort_key = (sort_name, *states_of(service, sort))
+    return view.ordering((filter_name, *states_of(service, card_filter)), mask_func, sort_column, sort_key)
+
+
+def position_of(order, labels):
+    """Erste Position einer der Zeilen (Labels) in der Reihenfolge; None, falls keine enthalten ist."""
+    positions = pd.Index(order).get_indexer(labels)
+    positions = positions[positions >= 0]
+    return int(positions.min()) if len(positions) else None
+
+
+# --- Mehrere Prüfer ---
+
+def changed_rows(changes, batch):
+    """Zeilen eines Batches, die in den Änderungen (aus dem Feed) vorkommen."""
+    return {row for change in changes if change.batch == batch for row in change.rows}
+
+
+def sync_field(entered, seen, current):
+    """Gleicht eine Formulareingabe mit dem aktuellen Wert ab; gibt (Eingabe, gesehener Wert) zurück.
+
+    `seen` ist der Wert, auf dem die Eingabe beruht (None = neu geöffnet).
+    Solange das Feld unverändert ist, übernimmt es Werte, die andere
+    inzwischen gespeichert haben; eigene Eingaben bleiben erhalten.
+    """
+    if entered is None or seen is None or entered in (seen, current):
+        return current, current
+    return entered, seen
+
+
+def form_changes(entered, seen):
+    """(Änderungen, gesehene Werte) der Felder, deren Eingabe vom gesehenen Wert abweicht."""
+    changes = {field: value for field, value in entered.items() if value != seen[field]}
+    return changes, {field: seen[field] for field in changes}
+
+
+def table_expected(original, edits):
+    """Gesehene Werte der geänderten Zellen eines Tabelleneditors ({Zeile: {Feld: Wert}})."""
+    return {
+        row: {field: as_text(original.at[row, field]) for field in changes}
+        for row, changes in edits.items()
+    }
+
+
+def accept_conflicts(seen, df, row, conflicts):
+    """Übernimmt die aktuellen Werte der Konfliktfelder als gesehen - erneutes Speichern überschreibt sie."""
+    for field in conflicts['Feld']:
+        seen[field] = as_text(df.at[row, field])
+
+
+# --- Blättern ---
+
+def page_count(n_rows, page_rows):
+    """Anzahl der Seiten (mindestens 1)."""
+    return max(1, (n_rows - 1) // page_rows + 1)
+
+
+def page_bounds(page, page_rows, n_rows):
+    """(Start, Ende) der Zeilen einer Seite (1-basiert), begrenzt auf `n_rows`."""
+    start = (page - 1) * page_rows
+    return start, min(start + page_rows, n_rows)
@@ -8,23 +8,137 @@ Streamlit-basierte Webanwendung zur Ergebniskontrolle und Korrektur
 import streamlit as st
 import pandas as pd
 from pathlib import Path
-import json
-from PIL import Image
-import os
+import re
+import time
+import uuid
+
+from qc_core import journal
+from qc_core.previews import PREVIEW_WIDTH
+from qc_core.export import EXPORT_FORMATS, available_formats
+from qc_core.storage import parquet_available
+from qc_core import bulk
+from qc_core import pages
+from qc_core import views
+from qc_core.authority import KEY_METHODS, cluster_summary, filter_clusters, to_merge
+from qc_core.changes import ConflictError
+from qc_core.service import QCService, Settings
 
 # === KONFIGURATION === PFADE BITTE ENTSPRECHEND ANPASSEN !
 CSV_DIR = "XXXXXX/output_batches/csv"
 JSON_DIR = "XXXXXXX/output_batches/json"
-MASTER_CSV = "XXXXXXX/results/metadata_vlm_complete_UPDATED.csv"
+CONFIDENCE_CACHE_PATH = "XXXXXXX/confidence_table.pkl"  # Konfidenz-Tabelle aus den JSON-Ausgaben
+CONFIDENCE_MAX_AGE = 300  # Sekunden bis zur nächsten (inkrementellen) Aktualisierung
 IMAGE_BASE_DIR = "XXXXXXX/jpeg_output"
+PREVIEW_CACHE_DIR = "XXXXXXX/preview_cache"  # Verkleinerte Vorschaubilder (leer = Originale anzeigen)
+IMAGE_INDEX_PATH = "XXXXXXX/image_index.json"  # Dateiname -> Pfad-Index des Bildordners
+IMAGE_INDEX_MAX_AGE = 300  # Sekunden bis zur nächsten (inkrementellen) Aktualisierung
+DUPLICATE_HASH_PATH = "XXXXXXX/image_hashes.pkl"  # Bild-Hashes der Duplikatprüfung (leer = nur im Speicher)
+DUPLICATE_MAX_AGE = 3600  # Sekunden bis zur nächsten (inkrementellen) Aktualisierung der Bild-Hashes
+EXPORT_CACHE_DIR = "XXXXXXX/export_cache"  # Erzeugte Exportdateien je Datenstand (leer = Temp-Verzeichnis)
+AUDIT_DB_PATH = "XXXXXXX/qc_audit.sqlite"  # Änderungsprotokoll mit Ausgangswerten (leer = kein Protokoll)
 LOGO_PATH = "XXXXXXXX/WUNSCH_Logo.png"
 
+# Speicher-Backend: "csv" oder "parquet" (Parquet-Spiegel neben jeder CSV, benötigt pyarrow)
+STORAGE_BACKEND = "csv"
+
+# Lademodus: "memory" (Gesamtbestand im Speicher, gespeicherte Suchindizes) oder "chunked"
+# (Problemkarten, Suche, Export und fehlende Statistiken blockweise mit begrenztem Speicher -
+# für Bestände, die nicht in den Arbeitsspeicher passen)
+LOADING_MODE = "memory"
+CHUNK_ROWS = 100_000  # Zeilen je Block im Modus "chunked"
+CHUNKED_SEARCH_LIMIT = 1000  # Max. Treffer der blockweisen Suche
+
+# Speicherbudget für geladene CSVs (alle Sitzungen gemeinsam) - BEI BEDARF ANPASSEN
+CACHE_MAX_MB = 2048
+
+# Bild-Prefetch: Anzahl vorgeladener Nachbarkarten je Richtung und Größe des Bild-Caches
+PREFETCH_NEIGHBOURS = 3
+PREFETCH_CACHE_MB = 256
+
+# Diagnose: Laufzeiten je Stufe (p50/p95) und Cache-Zähler in der Sidebar.
+# Aus = nur über die URL erreichbar (?diagnose=1)
+DIAGNOSTICS = False
+TIMING_LOG_PATH = ""  # Messungen fortlaufend als JSON Lines anhängen (leer = aus)
+
 # Felder die editierbar sein sollen - BITTE ANPASSEN !
 EDITABLE_FIELDS = [
     "Komponist", "Signatur", "Titel", "Textanfang",
     "Verlag", "Material", "Textdichter", "Bearbeiter", "Bemerkungen"
 ]
 
+# Kennzahlen: Kacheln der Batch-Ansicht, Kacheln und Batch-Vergleich der Übersicht - BITTE ANPASSEN !
+STAT_FIELDS = ["Komponist", "Signatur", "Titel"]
+OVERVIEW_FIELDS = ["Komponist", "Signatur"]
+
+# Filter und Sortierungen der Batch-Ansicht - BITTE ANPASSEN !
+# Filter: None = alle Karten, sonst Funktion aus qc_core.views (DataFrame, Füllgrad, Kontext) -> boolesche Maske
+# (eigene Funktionen, die Konfidenz oder Duplikatprüfung nutzen, mit @views.uses(...) kennzeichnen)
+BATCH_FILTERS = {
+    "Alle Karten": None,
+    "Problematische Karten": views.sparse,
+    "Ohne Komponist": views.missing("Komponist"),
+    "Ohne Signatur": views.missing("Signatur"),
+    "Niedrige Konfidenz": views.low_confidence,
+    "Duplikate": views.duplicates,
+}
+# Sortierung: Spaltenname oder Funktion (DataFrame, Füllgrad, Kontext) -> Sortierwerte
+BATCH_SORTS = {
+    "Nach Dateiname": "Datei",
+    "Nach Komponist": "Komponist",
+    "Nach Signatur": "Signatur",
+    "Niedrigste Konfidenz zuerst": views.confidence,
+}
+
+# Tabellenmodus: Zeilen je Seite des Tabelleneditors
+TABLE_PAGE_ROWS = 500
+
+# Ergebnistabellen (Suche, Übersicht): nur die aktuelle Seite wird an den Browser geschickt
+RESULT_PAGE_ROWS = 100
+RESULT_MAX_ROWS = 10_000  # Zum Blättern angebotene Zeilen; Exporte enthalten alle Treffer
+
+# Durchsuchbare Felder der Suche - BITTE ANPASSEN !
+SEARCH_FIELDS = ["Komponist", "Titel", "Signatur", "Textanfang"]
+SEARCH_INDEX_PATH = "XXXXXXX/search_index.pkl"  # Gespeicherter Suchindex (leer = nur im Speicher)
+FUZZY_INDEX_PATH = "XXXXXXX/fuzzy_index.pkl"  # Gespeicherter Index der fehlertoleranten Suche
+FUZZY_MAX_DISTANCE = 2  # Standard für die erlaubte Editierdistanz je Wort
+SEARCH_DISPLAY_COLUMNS = ['Datei', 'Batch', 'Komponist', 'Signatur', 'Titel']  # Angezeigte Spalten der Treffer
+PROBLEM_COLUMNS = ['Datei', 'Batch', 'Komponist', 'Signatur']  # Spalten im Export problematischer Karten
+
+# Schreibweisen vereinheitlichen: Feld -> Standardverfahren der Cluster - BITTE ANPASSEN !
+# "fingerprint" (Wörter, Reihenfolge egal), "ngram" (Leerzeichen egal), "initials" (abgekürzte Personennamen)
+AUTHORITY_FIELDS = {"Komponist": "fingerprint", "Verlag": "fingerprint", "Textdichter": "fingerprint"}
+AUTHORITY_INDEX_PATH = "XXXXXXX/authority_index.pkl"  # Gespeicherte Werte-Zählungen je Batch
+
+# Konfiguration der Datenschicht (qc_core.service) - hier nichts anpassen
+SETTINGS = Settings(
+    csv_dir=CSV_DIR,
+    editable_fields=tuple(EDITABLE_FIELDS),
+    search_fields=tuple(SEARCH_FIELDS),
+    json_dir=JSON_DIR,
+    image_base_dir=IMAGE_BASE_DIR,
+    preview_cache_dir=PREVIEW_CACHE_DIR,
+    image_index_path=IMAGE_INDEX_PATH,
+    image_index_max_age=IMAGE_INDEX_MAX_AGE,
+    confidence_cache_path=CONFIDENCE_CACHE_PATH,
+    confidence_max_age=CONFIDENCE_MAX_AGE,
+    duplicate_hash_path=DUPLICATE_HASH_PATH,
+    duplicate_max_age=DUPLICATE_MAX_AGE,
+    export_cache_dir=EXPORT_CACHE_DIR,
+    search_index_path=SEARCH_INDEX_PATH,
+    fuzzy_index_path=FUZZY_INDEX_PATH,
+    authority_fields=tuple(AUTHORITY_FIELDS),
+    authority_index_path=AUTHORITY_INDEX_PATH,
+    audit_db_path=AUDIT_DB_PATH,
+    storage_backend=STORAGE_BACKEND,
+    loading_mode=LOADING_MODE,
+    chunk_rows=CHUNK_ROWS,
+    chunked_search_limit=CHUNKED_SEARCH_LIMIT,
+    cache_max_mb=CACHE_MAX_MB,
+    prefetch_neighbours=PREFETCH_NEIGHBOURS,
+    prefetch_cache_mb=PREFETCH_CACHE_MB,
+    timing_log_path=TIMING_LOG_PATH,
+)
+
 # === PAGE CONFIG ===
 st.set_page_config(
     page_title="OCR - Qualitätskontrolle",
@@ -83,71 +197,168 @@ st.markdown("""
 
 # === HILFSFUNKTIONEN ===
 
-@st.cache_data
-def load_csv_data(csv_path):
-    """Lädt CSV-Daten mit Caching."""
+@st.cache_resource
+def get_service():
+    """Gemeinsame Datenschicht aller Sitzungen (Caches, Indizes, Gesamtbestand)."""
+    return QCService(SETTINGS, warn=st.warning)
+
+service = get_service()
+timings = service.timings
+rerun_start = time.perf_counter()
+
+# Sitzungskennung für den Änderungs-Feed (eigene Änderungen nicht melden)
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex[:8]
+    st.session_state.change_seq = service.changes.latest
+
+def reviewer():
+    """Name des Prüfers für das Änderungsprotokoll (None = nicht angegeben)."""
+    return st.session_state.get('reviewer', '').strip() or None
+
+def foreign_changes():
+    """Änderungen anderer Sitzungen und Prozesse seit dem letzten Durchlauf (None = zu viele)."""
+    changes, st.session_state.change_seq = service.changes.since(st.session_state.change_seq)
+    if changes is None:
+        return None
+    return [change for change in changes if change.source != st.session_state.session_id]
+
+def diagnostics_enabled():
+    """Diagnose-Bereich anzeigen: über DIAGNOSTICS oder die URL (?diagnose=1)."""
+    if DIAGNOSTICS:
+        return True
+    if hasattr(st, "query_params"):
+        return "diagnose" in st.query_params
+    return "diagnose" in st.experimental_get_query_params()
+
+def load_image(batch, filename, width=PREVIEW_WIDTH):
+    """Lädt Karteikarten-Bild als Vorschau (width=None: Originalauflösung)."""
     try:
-        df = pd.read_csv(csv_path, encoding="utf-8-sig")
-        return df
+        return service.load_image(batch, filename, width)
     except Exception as e:
-        st.error(f"Fehler beim Laden: {e}")
+        st.error(f"Fehler beim Laden des Bildes: {e}")
         return None
 
-def load_image(batch, filename):
-    """Lädt Karteikarten-Bild."""
+def load_batch(csv_path):
+    """Lädt Batch-CSV inkl. offener Journal-Korrekturen als BatchView (geteilt, wird beim Speichern direkt aktualisiert)."""
     try:
-        # Versuche verschiedene Pfad-Kombinationen
-        possible_paths = [
-            Path(IMAGE_BASE_DIR) / batch / filename,
-            Path(IMAGE_BASE_DIR) / filename,
-            Path(IMAGE_BASE_DIR).parent / batch / filename,
-        ]
-        
-        for img_path in possible_paths:
-            if img_path.exists():
-                return Image.open(img_path)
-        
-        return None
+        return service.load_batch(csv_path)
     except Exception as e:
-        st.error(f"Fehler beim Laden des Bildes: {e}")
+        st.error(f"Fehler beim Laden: {e}")
         return None
 
-def save_corrections(df, csv_path):
-    """Speichert korrigierte Daten."""
+def save_corrections(batch, csv_path, row_index, changes, expected=None):
+    """Speichert Korrekturen einer Karte im Journal und aktualisiert den geladenen Batch."""
+    return save_bulk_corrections(
+        batch, csv_path, {row_index: changes}, {row_index: expected} if expected is not None else None
+    )
+
+def save_bulk_corrections(batch, csv_path, edits, expected=None):
+    """Speichert Korrekturen mehrerer Karten ({Zeile: {Feld: Wert}}) in einem Schreibvorgang.
+
+    Mit `expected` (gesehene Werte) wird nicht gespeichert, wenn jemand
+    anderes diese Felder inzwischen geändert hat; die Konflikte stehen dann
+    in st.session_state.conflicts.
+    """
+    st.session_state.conflicts = None
     try:
-        df.to_csv(csv_path, index=False, encoding="utf-8-sig")
+        service.save_bulk_corrections(
+            batch, csv_path, edits, expected, source=st.session_state.session_id, reviewer=reviewer()
+        )
         return True
+    except ConflictError as e:
+        st.session_state.conflicts = e.conflicts
+        st.warning(f"⚠️ {len(e.conflicts)} Feld(er) wurden inzwischen von jemand anderem geändert - nichts gespeichert.")
+        st.dataframe(e.conflicts, use_container_width=True, hide_index=True)
+        return False
     except Exception as e:
         st.error(f"Fehler beim Speichern: {e}")
         return False
 
 def get_batch_list():
     """Gibt Liste aller verfügbaren Batches zurück."""
-    csv_dir = Path(CSV_DIR)
-    if csv_dir.exists():
-        batches = sorted([f.stem for f in csv_dir.glob("*.csv")])
-        return batches
-    return []
-
-def calculate_statistics(df):
-    """Berechnet Statistiken für ein DataFrame."""
-    total = len(df)
+    return service.batch_list()
+
+def open_card(batch_name, datei=None):
+    """Wechselt in die Batch-Ansicht, bei `datei` direkt zu dieser Karte (nur als Callback nutzbar)."""
+    st.session_state.mode = "📦 Batch-Ansicht"
+    st.session_state.selected_batch = batch_name
+    st.session_state.card_index = 0
+    if datei is not None:
+        # Karte soll sichtbar sein, egal welcher Filter zuletzt aktiv war
+        st.session_state.batch_filter = list(BATCH_FILTERS)[0]
+        st.session_state.table_mode = False
+        st.session_state.jump_to = (batch_name, datei)
+
+def paged_table(name, table, version, on_open=None, style=None, columns=None, **kwargs):
+    """Zeigt eine Seite einer großen Tabelle; nur diese Zeilen werden übertragen.
+
+    Geblättert wird über höchstens RESULT_MAX_ROWS Zeilen; die Seite
+    springt bei neuem `version` (z.B. Suchbegriff) zurück auf 1. Mit
+    `on_open(zeile)` öffnet ein Klick auf eine Zeile diese, `style(df)`
+    formatiert die angezeigte Seite; `columns` wählt die angezeigten Spalten.
+    """
+    n_rows = min(len(table), RESULT_MAX_ROWS)
+    n_pages = views.page_count(n_rows, RESULT_PAGE_ROWS)
+    version_key = abs(hash(version))
+    page = 1
+    if n_pages > 1:
+        page = st.number_input(f"Seite (von {n_pages}):", 1, n_pages, 1, key=f"page_{name}_{version_key}")
+    start, stop = views.page_bounds(page, RESULT_PAGE_ROWS, n_rows)
+    rows = table.iloc[start:stop]
+    if columns is not None:
+        rows = rows[columns]
+    if n_pages > 1 or len(table) > n_rows:
+        st.caption(
+            f"Zeilen {start + 1:,}–{start + len(rows):,} von {len(table):,}"
+            + (f" (geblättert wird in den ersten {n_rows:,})" if len(table) > n_rows else "")
+        )
     
-    stats = {
-        "total": total,
-        "komponist": (df['Komponist'].fillna('').str.strip() != '').sum(),
-        "signatur": (df['Signatur'].fillna('').str.strip() != '').sum(),
-        "titel": (df['Titel'].fillna('').str.strip() != '').sum(),
-    }
+    data = style(rows) if style is not None else rows
+    if on_open is None:
+        st.dataframe(data, **kwargs)
+        return
+    key = f"table_{name}_{version_key}_{page}"
+    
+    def selected():
+        selection = st.session_state[key].selection.rows
+        if selection:
+            on_open(rows.iloc[selection[0]])
     
-    # Vollständigkeit (mindestens 6 Felder gefüllt)
-    field_counts = df[EDITABLE_FIELDS].fillna('').apply(
-        lambda row: sum(str(val).strip() != '' for val in row), axis=1
+    st.dataframe(data, key=key, on_select=selected, selection_mode="single-row", **kwargs)
+    st.caption("👆 Zeile anklicken, um sie in der Batch-Ansicht zu öffnen.")
+
+def export_widget(name, label, version, frames_func, file_stem, columns=None):
+    """Export auf Anfrage: Datei wird erst beim Klick erzeugt und je Datenstand wiederverwendet."""
+    cache = service.export_cache
+    fmt = st.selectbox(
+        "Format:",
+        available_formats(),
+        format_func=lambda f: EXPORT_FORMATS[f][0],
+        key=f"export_fmt_{name}"
     )
-    stats["complete"] = (field_counts >= 6).sum()
-    stats["sparse"] = (field_counts <= 2).sum()
+    path = cache.path_for(name, version, fmt)
+    ready_key = f"export_ready_{name}"
     
-    return stats
+    if st.button(f"📦 {label} vorbereiten", key=f"export_btn_{name}"):
+        try:
+            with st.spinner("Export wird erstellt..."):
+                cache.get(name, version, fmt, frames_func, columns)
+            st.session_state[ready_key] = str(path)
+        except Exception as e:
+            st.error(f"Export fehlgeschlagen: {e}")
+    
+    # Download-Button nur für den angeforderten Stand (wird beim Herunterladen zurückgesetzt)
+    if st.session_state.get(ready_key) == str(path) and path.exists():
+        _, suffix, mime = EXPORT_FORMATS[fmt]
+        with open(path, "rb") as f:
+            st.download_button(
+                label=f"📥 {label} herunterladen",
+                data=f,
+                file_name=f"{file_stem}{suffix}",
+                mime=mime,
+                key=f"export_dl_{name}",
+                on_click=lambda: st.session_state.pop(ready_key, None)
+            )
 
 # === SIDEBAR ===
 
@@ -163,24 +374,57 @@ with st.sidebar:
     # Modus-Auswahl
     mode = st.radio(
         "Ansicht:",
-        ["📦 Batch-Ansicht", "📊 Gesamt-Übersicht", "🔍 Suche"],
-        index=0
+        ["📦 Batch-Ansicht", "📊 Gesamt-Übersicht", "🔍 Suche", "🧬 Duplikate", "🏷️ Schreibweisen"],
+        key="mode"
     )
     
+    # Prüfername für das Änderungsprotokoll
+    if service.audit is not None:
+        st.text_input("👤 Prüfer:", key="reviewer", placeholder="Name oder Kürzel")
+    
     st.markdown("---")
     
     # Batch-Auswahl (nur im Batch-Modus)
     if mode == "📦 Batch-Ansicht":
         batches = get_batch_list()
         if batches:
+            if st.session_state.get("selected_batch") not in batches:
+                st.session_state.pop("selected_batch", None)
             selected_batch = st.selectbox(
                 "Batch wählen:",
                 batches,
-                index=0
+                key="selected_batch"
             )
         else:
             st.warning("Keine Batches gefunden!")
             selected_batch = None
+        
+        # Offene Korrekturen im Journal
+        if selected_batch:
+            batch_csv = Path(CSV_DIR) / f"{selected_batch}.csv"
+            pending = journal.journal_size(batch_csv)
+            if pending > 0:
+                st.caption(f"📝 {pending} Korrektur(en) noch nicht in der CSV")
+                if st.button("🗜️ Journal in CSV übernehmen", use_container_width=True):
+                    journal.compact(batch_csv, STORAGE_BACKEND)
+                    st.rerun()
+            
+            # Alle protokollierten Korrekturen des Batches zurücknehmen
+            if service.audit is not None:
+                with st.expander("↩️ Batch auf Ausgangswerte zurücksetzen"):
+                    st.caption(
+                        "Setzt alle im Änderungsprotokoll erfassten Felder auf ihren Wert vor der ersten "
+                        "protokollierten Änderung zurück (OCR-Ausgabe, sofern vorher nicht korrigiert wurde)."
+                    )
+                    confirm = st.checkbox("Ja, alle Korrekturen dieses Batches zurücknehmen", key=f"revert_confirm_{selected_batch}")
+                    if st.button("↩️ Zurücksetzen", disabled=not confirm, use_container_width=True):
+                        try:
+                            n_reverted = service.revert_to_original(
+                                selected_batch, source=st.session_state.session_id, reviewer=reviewer()
+                            )
+                            st.success(f"✅ {n_reverted} Karten zurückgesetzt")
+                        except Exception as e:
+                            st.error(f"Fehler beim Zurücksetzen: {e}")
     
     st.markdown("---")
     
@@ -192,8 +436,17 @@ with st.sidebar:
     - 💾 Änderungen speichern
     - 📊 Statistiken ansehen
     - 🔍 Karteikarten durchsuchen
+    - 🧬 Duplikate prüfen
+    - 🏷️ Schreibweisen vereinheitlichen
+    - 🕘 Änderungsverlauf & Ausgangswerte
     """)
     
+    if STORAGE_BACKEND == "parquet" and not parquet_available():
+        st.warning("pyarrow ist nicht installiert - CSV-Backend aktiv.")
+    
+    # Diagnose (wird am Ende des Durchlaufs gefüllt, damit er die aktuellen Messungen enthält)
+    diagnostics_slot = st.container() if diagnostics_enabled() else None
+    
     st.markdown("---")
     st.markdown("**TEAMNAME**") # BITTE ANPASSEN
     st.markdown("EINRICHTUNG") # BITTE ANPASSEN
@@ -207,58 +460,26 @@ if mode == "📦 Batch-Ansicht" and selected_batch:
     
     # Lade Batch-Daten
     csv_path = Path(CSV_DIR) / f"{selected_batch}.csv"
-    df = load_csv_data(str(csv_path))
+    batch = load_batch(str(csv_path))
     
-    if df is not None and len(df) > 0:
-        
-        # Statistiken
-        stats = calculate_statistics(df)
-        
-        col1, col2, col3, col4, col5 = st.columns(5)
-        
-        with col1:
-            st.markdown(f"""
-            <div class="stat-box">
-                <h3>{stats['total']}</h3>
-                <p>Gesamt</p>
-            </div>
-            """, unsafe_allow_html=True)
+    if batch is not None and len(batch.df) > 0:
+        df = batch.df
         
-        with col2:
-            pct = (stats['komponist'] / stats['total'] * 100) if stats['total'] > 0 else 0
-            st.markdown(f"""
-            <div class="stat-box">
-                <h3>{stats['komponist']}</h3>
-                <p>Komponist ({pct:.1f}%)</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            pct = (stats['signatur'] / stats['total'] * 100) if stats['total'] > 0 else 0
-            st.markdown(f"""
-            <div class="stat-box">
-                <h3>{stats['signatur']}</h3>
-                <p>Signatur ({pct:.1f}%)</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col4:
-            pct = (stats['titel'] / stats['total'] * 100) if stats['total'] > 0 else 0
-            st.markdown(f"""
-            <div class="stat-box">
-                <h3>{stats['titel']}</h3>
-                <p>Titel ({pct:.1f}%)</p>
-            </div>
-            """, unsafe_allow_html=True)
+        # Änderungen anderer Prüfer an diesem Batch seit dem letzten Durchlauf
+        other_changes = foreign_changes()
+        changed_by_others = set()
+        if other_changes is None:
+            st.toast("🔔 Viele Änderungen anderer Prüfer - die Ansicht zeigt den aktuellen Stand.")
+        else:
+            changed_by_others = views.changed_rows(other_changes, selected_batch)
+            if changed_by_others:
+                st.toast(f"🔔 {len(changed_by_others)} Karte(n) in diesem Batch wurden von anderen Prüfern geändert.")
         
-        with col5:
-            pct = (stats['sparse'] / stats['total'] * 100) if stats['total'] > 0 else 0
-            st.markdown(f"""
-            <div class="stat-box" style="background-color: #fff3cd;">
-                <h3>{stats['sparse']}</h3>
-                <p>Spärlich ({pct:.1f}%)</p>
-            </div>
-            """, unsafe_allow_html=True)
+        # Kennzahlen (aus dem Sidecar des Batches)
+        with timings.measure("Statistik"):
+            boxes = pages.batch_boxes(service.batch_stats(selected_batch, batch), STAT_FIELDS)
+        for col, box in zip(st.columns(len(boxes)), boxes):
+            col.markdown(box, unsafe_allow_html=True)
         
         st.markdown("---")
         
@@ -268,67 +489,151 @@ if mode == "📦 Batch-Ansicht" and selected_batch:
         with col_filter1:
             filter_option = st.selectbox(
                 "Filter:",
-                ["Alle Karten", "Problematische Karten", "Ohne Komponist", "Ohne Signatur"]
+                list(BATCH_FILTERS),
+                key="batch_filter"
             )
         
         with col_filter2:
             sort_option = st.selectbox(
                 "Sortierung:",
-                ["Nach Dateiname", "Nach Komponist", "Nach Signatur"]
+                list(BATCH_SORTS)
             )
         
-        # Filtere DataFrame
-        filtered_df = df.copy()
-        
-        if filter_option == "Problematische Karten":
-            field_counts = filtered_df[EDITABLE_FIELDS].fillna('').apply(
-                lambda row: sum(str(val).strip() != '' for val in row), axis=1
+        # Reihenfolge der Zeilen-Labels (gecacht je Batch-Version, Filter, Sortierung,
+        # Konfidenz-Stand und Stand der Duplikatprüfung)
+        if views.depends_on("duplicates", BATCH_FILTERS[filter_option]) and service.duplicate_report() is None:
+            st.info("Noch keine Duplikatprüfung durchgeführt - siehe Ansicht 🧬 Duplikate.")
+        uses_confidence = views.depends_on("confidence", BATCH_FILTERS[filter_option], BATCH_SORTS[sort_option])
+        if uses_confidence and not service.confidence_table.ready:
+            st.info("Konfidenz-Tabelle wird im Hintergrund aus JSON_DIR aufgebaut - Reihenfolge folgt beim nächsten Laden.")
+        with timings.measure("Filter/Sortierung"):
+            order = views.batch_order(
+                service, batch, selected_batch, filter_option, sort_option, BATCH_FILTERS, BATCH_SORTS
             )
-            filtered_df = filtered_df[field_counts <= 2]
-        elif filter_option == "Ohne Komponist":
-            filtered_df = filtered_df[filtered_df['Komponist'].fillna('').str.strip() == '']
-        elif filter_option == "Ohne Signatur":
-            filtered_df = filtered_df[filtered_df['Signatur'].fillna('').str.strip() == '']
         
-        # Sortiere
-        if sort_option == "Nach Komponist":
-            filtered_df = filtered_df.sort_values('Komponist')
-        elif sort_option == "Nach Signatur":
-            filtered_df = filtered_df.sort_values('Signatur')
-        else:
-            filtered_df = filtered_df.sort_values('Datei')
+        st.markdown(f"**{len(order)} Karten** (gefiltert)")
         
-        filtered_df = filtered_df.reset_index(drop=True)
+        # Sprung aus Suche oder Übersicht (open_card) zur gewählten Karte
+        jump = st.session_state.pop("jump_to", None)
+        if jump is not None and jump[0] == selected_batch:
+            position = views.position_of(order, batch.locate(jump[1]))
+            if position is not None:
+                st.session_state.card_index = position
+            else:
+                st.warning(f"Karte `{jump[1]}` nicht in {selected_batch} gefunden.")
         
-        st.markdown(f"**{len(filtered_df)} Karten** (gefiltert)")
+        # Suchen & Ersetzen: Vorschau aller Treffer, dann ein Schreibvorgang je Batch
+        with st.expander("🔁 Suchen & Ersetzen"):
+            col_fr1, col_fr2 = st.columns(2)
+            with col_fr1:
+                replace_fields = st.multiselect("Felder:", EDITABLE_FIELDS, default=EDITABLE_FIELDS, key="replace_fields")
+                replace_pattern = st.text_input("Suchen:", key="replace_pattern")
+                replace_value = st.text_input("Ersetzen durch:", key="replace_value")
+            with col_fr2:
+                replace_regex = st.checkbox("Regulärer Ausdruck", key="replace_regex")
+                replace_case = st.checkbox("Groß-/Kleinschreibung beachten", value=True, key="replace_case")
+                replace_scope = st.radio("Bereich:", pages.REPLACE_SCOPES, key="replace_scope")
+            
+            scope_paths = pages.replace_paths(service, csv_path, replace_scope)
+            replace_args = (tuple(replace_fields), replace_pattern, replace_value, replace_regex, replace_case, replace_scope)
+            
+            col_fr3, col_fr4 = st.columns(2)
+            with col_fr3:
+                if st.button("👁️ Vorschau", key="replace_preview_btn", disabled=not replace_pattern):
+                    try:
+                        preview = service.replace_preview(
+                            scope_paths, replace_fields, replace_pattern, replace_value, replace_regex, replace_case
+                        )
+                        st.session_state.replace_preview = (replace_args, preview)
+                    except re.error as e:
+                        st.error(f"Ungültiger regulärer Ausdruck: {e}")
+            
+            # Vorschau nur anzeigen, solange die Eingaben unverändert sind
+            preview_state = st.session_state.get("replace_preview")
+            if preview_state is not None and preview_state[0] == replace_args:
+                preview = preview_state[1]
+                if len(preview) == 0:
+                    st.info("Keine Treffer.")
+                else:
+                    st.markdown(f"**{len(preview)} Änderungen** in {preview['Batch'].nunique()} Batch(es)")
+                    st.dataframe(
+                        preview[['Batch', 'Datei', 'Feld', 'Alt', 'Neu']].head(bulk.PREVIEW_ROWS),
+                        use_container_width=True, hide_index=True
+                    )
+                    with col_fr4:
+                        if st.button("✅ Ersetzungen übernehmen", key="replace_apply_btn"):
+                            # Ersetzungen je Batch auf dem aktuellen Stand neu berechnen und gesammelt speichern
+                            try:
+                                n_changed = service.apply_replace(
+                                    scope_paths, replace_fields, replace_pattern, replace_value, replace_regex, replace_case,
+                                    source=st.session_state.session_id, reviewer=reviewer()
+                                )
+                                st.session_state.pop("replace_preview", None)
+                                st.success(f"✅ {n_changed} Karten geändert!")
+                                st.rerun()
+                            except Exception as e:
+                                st.error(f"Fehler beim Speichern: {e}")
+        
+        table_mode = st.toggle("📋 Tabellenmodus", key="table_mode")
+        
+        if len(order) > 0 and table_mode:
+            # Tabelleneditor über die gefilterten Karten; geänderte Zellen werden gesammelt gespeichert
+            n_pages = views.page_count(len(order), TABLE_PAGE_ROWS)
+            page = 1
+            if n_pages > 1:
+                page = st.number_input(f"Seite (von {n_pages}):", 1, n_pages, 1, key="table_page")
+            original = pages.table_page(df, order, page, TABLE_PAGE_ROWS, EDITABLE_FIELDS)
+            
+            edited = st.data_editor(
+                pages.editor_frame(original),
+                disabled=['Datei'],
+                use_container_width=True,
+                num_rows="fixed",
+                key=f"table_{selected_batch}_{batch.version}_{filter_option}_{sort_option}_{page}"
+            )
+            
+            table_changes = bulk.diff_frames(original, edited, EDITABLE_FIELDS)
+            st.caption(f"{sum(len(c) for c in table_changes.values())} geänderte Zellen in {len(table_changes)} Karten")
+            
+            if st.button("💾 Tabelle speichern", disabled=not table_changes, key="table_save"):
+                # Gesehene Werte der geänderten Zellen als Prüfung gegen zwischenzeitliche Änderungen
+                if save_bulk_corrections(batch, csv_path, table_changes, views.table_expected(original, table_changes)):
+                    st.success(f"✅ {len(table_changes)} Karten gespeichert!")
+                    st.rerun()
+                elif st.session_state.conflicts is None:
+                    st.error("❌ Fehler beim Speichern!")
         
         # Karteikarten-Navigation
-        if len(filtered_df) > 0:
+        elif len(order) > 0:
             
             # === FIX: Session State für card_index ===
             # Stelle sicher, dass card_index im gültigen Bereich liegt
-            if st.session_state.card_index >= len(filtered_df):
-                st.session_state.card_index = len(filtered_df) - 1
+            if st.session_state.card_index >= len(order):
+                st.session_state.card_index = len(order) - 1
             
             col_nav1, col_nav2, col_nav3 = st.columns([1, 3, 1])
             
             with col_nav2:
-                # === FIX: Slider an Session State binden ===
-                card_index = st.slider(
-                    "Karteikarte:",
-                    0,
-                    len(filtered_df) - 1,
-                    value=st.session_state.card_index,  # Session State als value verwenden
-                    format="Karte %d"
-                )
+                if len(order) > 1:
+                    # === FIX: Slider an Session State binden ===
+                    card_index = st.slider(
+                        "Karteikarte:",
+                        0,
+                        len(order) - 1,
+                        value=st.session_state.card_index,  # Session State als value verwenden
+                        format="Karte %d"
+                    )
+                else:
+                    # Slider braucht min < max
+                    card_index = 0
                 # Session State aktualisieren
                 st.session_state.card_index = card_index
             
             st.markdown("---")
             
-            # Aktuelle Karte
-            current_row = filtered_df.iloc[card_index]
-            original_index = df[df['Datei'] == current_row['Datei']].index[0]
+            # Aktuelle Karte (direkt über das Zeilen-Label, auch bei doppelten Dateinamen eindeutig)
+            original_index = order[card_index]
+            current_row = df.loc[original_index]
             
             # Layout: Bild links, Metadaten rechts
             col_img, col_meta = st.columns([1, 1])
@@ -336,8 +641,11 @@ if mode == "📦 Batch-Ansicht" and selected_batch:
             with col_img:
                 st.markdown("### 🖼️ Karteikarte")
                 
-                # Lade und zeige Bild
-                img = load_image(selected_batch, current_row['Datei'])
+                # Lade und zeige Bild (Vorschau, bei Bedarf Originalauflösung)
+                zoom = st.toggle("🔍 Volle Auflösung", key="image_zoom")
+                width = None if zoom else PREVIEW_WIDTH
+                img = load_image(selected_batch, current_row['Datei'], width)
+                service.prefetch_images(selected_batch, df, order, card_index, width, st.session_state.session_id)
                 
                 if img is not None:
                     st.image(img, use_container_width=True)
@@ -348,36 +656,55 @@ if mode == "📦 Batch-Ansicht" and selected_batch:
                 # Dateiinfo
                 st.markdown(f"**Datei:** `{current_row['Datei']}`")
                 st.markdown(f"**Batch:** `{selected_batch}`")
+                
+                # VLM-Konfidenz aus JSON_DIR (falls vorhanden)
+                confidence_text = pages.confidence_text(
+                    service.confidence_table.for_cards(df.loc[[original_index], 'Datei']).iloc[0]
+                )
+                if confidence_text is not None:
+                    st.markdown(confidence_text)
+                
+                # Mögliche Duplikate aus der letzten Duplikatprüfung
+                duplicates_text = pages.duplicates_text(service.duplicate_report(), selected_batch, current_row['Datei'])
+                if duplicates_text is not None:
+                    st.warning(duplicates_text)
+                
+                st.caption(pages.prefetch_text(service.prefetcher.stats(), PREFETCH_CACHE_MB))
             
             with col_meta:
                 st.markdown("### ✏️ Metadaten")
                 
-                # Bearbeitbare Felder
+                if original_index in changed_by_others:
+                    st.info("🔔 Diese Karte wurde gerade von einem anderen Prüfer geändert.")
+                
+                # Bearbeitbare Felder; `seen` hält je Feld den Wert, auf dem die Eingabe beruht.
+                # Von anderen gespeicherte Werte werden übernommen, solange das Feld hier unverändert ist.
+                card_key = f"{selected_batch}_{original_index}"
+                seen = st.session_state.setdefault(f"seen_{card_key}", {})
                 edited_data = {}
                 
                 for field in EDITABLE_FIELDS:
-                    current_value = str(current_row.get(field, '')) if pd.notna(current_row.get(field)) else ''
-                    
-                    # Farbmarkierung für leere Felder
-                    if current_value.strip() == '':
-                        label = f"⚠️ {field}"
-                    else:
-                        label = field
+                    current_value = pages.cell_text(current_row, field)
+                    widget_key = f"{field}_{card_key}"
+                    st.session_state[widget_key], seen[field] = views.sync_field(
+                        st.session_state.get(widget_key), seen.get(field), current_value
+                    )
+                    label = pages.field_label(field, current_value)
                     
                     # Textarea für längere Felder
                     if field in ['Textanfang', 'Bemerkungen']:
                         edited_data[field] = st.text_area(
                             label,
-                            value=current_value,
                             height=80,
-                            key=f"{field}_{card_index}"
+                            key=widget_key
                         )
                     else:
                         edited_data[field] = st.text_input(
                             label,
-                            value=current_value,
-                            key=f"{field}_{card_index}"
+                            key=widget_key
                         )
+                    if seen[field] != current_value:
+                        st.caption(f"⚠️ Inzwischen gespeichert: `{current_value}`")
                 
                 st.markdown("---")
                 
@@ -386,19 +713,40 @@ if mode == "📦 Batch-Ansicht" and selected_batch:
                 
                 with col_save2:
                     if st.button("💾 Änderungen speichern", use_container_width=True):
-                        # Update DataFrame
-                        for field, value in edited_data.items():
-                            df.at[original_index, field] = value
+                        # Nur geänderte Felder ins Journal schreiben (mit dem gesehenen Wert als Prüfung)
+                        changes, expected = views.form_changes(edited_data, seen)
                         
-                        # Speichere CSV
-                        if save_corrections(df, csv_path):
+                        if not changes:
+                            st.info("Keine Änderungen.")
+                        elif save_corrections(batch, csv_path, original_index, changes, expected):
                             st.success("✅ Änderungen gespeichert!")
-                            # Cache leeren damit Änderungen sichtbar werden
-                            st.cache_data.clear()
+                            # DataFrame und Füllgrad wurden direkt aktualisiert - kein Neuladen nötig
                             st.rerun()
+                        elif st.session_state.conflicts is not None:
+                            # Erneutes Speichern überschreibt bewusst den Wert des anderen Prüfers
+                            views.accept_conflicts(seen, df, original_index, st.session_state.conflicts)
+                            st.info("Erneut speichern überschreibt die Werte des anderen Prüfers mit deinen Eingaben.")
                         else:
                             st.error("❌ Fehler beim Speichern!")
                 
+                # Änderungsverlauf aus dem Protokoll
+                if service.audit is not None:
+                    with st.expander("🕘 Änderungsverlauf"):
+                        history = service.card_history(selected_batch, current_row['Datei'])
+                        if len(history) == 0:
+                            st.caption("Noch keine protokollierten Änderungen.")
+                        else:
+                            st.dataframe(history, use_container_width=True, hide_index=True)
+                            if st.button("↩️ Karte auf Ausgangswerte zurücksetzen", key=f"revert_card_{card_key}"):
+                                try:
+                                    service.revert_to_original(
+                                        selected_batch, files=[current_row['Datei']], rows=[original_index],
+                                        source=st.session_state.session_id, reviewer=reviewer()
+                                    )
+                                    st.rerun()
+                                except Exception as e:
+                                    st.error(f"Fehler beim Zurücksetzen: {e}")
+                
                 st.markdown("---")
                 
                 # === FIX: Navigation Buttons mit Session State Update ===
@@ -411,9 +759,9 @@ if mode == "📦 Batch-Ansicht" and selected_batch:
                             st.rerun()
                 
                 with col_next:
-                    if card_index < len(filtered_df) - 1:
+                    if card_index < len(order) - 1:
                         if st.button("Nächste ➡️", use_container_width=True, key="btn_next"):
-                            st.session_state.card_index = min(len(filtered_df) - 1, card_index + 1)
+                            st.session_state.card_index = min(len(order) - 1, card_index + 1)
                             st.rerun()
         
         else:
@@ -423,82 +771,34 @@ elif mode == "📊 Gesamt-Übersicht":
     
     st.title("📊 Gesamt-Übersicht")
     
-    # Lade Master-CSV
-    if Path(MASTER_CSV).exists():
-        df = load_csv_data(MASTER_CSV)
+    # Gesamtbestand aus den Batch-CSVs (nur geänderte Batches werden neu gelesen)
+    master = service.master
+    
+    if master.batch_paths():
+        with timings.measure("Gesamtbestand aktualisieren"):
+            master.refresh()
+        totals = master.totals()
         
-        if df is not None:
+        if totals.total > 0:
             # Gesamt-Statistiken
-            stats = calculate_statistics(df)
-            
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.markdown(f"""
-                <div class="stat-box">
-                    <h2>{stats['total']:,}</h2>
-                    <p>Gesamt-Karteikarten</p>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col2:
-                pct = (stats['komponist'] / stats['total'] * 100) if stats['total'] > 0 else 0 #BITTE ANPASSEN
-                st.markdown(f"""
-                <div class="stat-box">
-                    <h2>{pct:.1f}%</h2>
-                    <p>Mit Komponist</p>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col3:
-                pct = (stats['signatur'] / stats['total'] * 100) if stats['total'] > 0 else 0 #BITTE ANPASSEN
-                st.markdown(f"""
-                <div class="stat-box">
-                    <h2>{pct:.1f}%</h2>
-                    <p>Mit Signatur</p>
-                </div>
-                """, unsafe_allow_html=True)
+            for col, box in zip(st.columns(1 + len(OVERVIEW_FIELDS)), pages.overview_boxes(totals, OVERVIEW_FIELDS)):
+                col.markdown(box, unsafe_allow_html=True)
             
             st.markdown("---")
             
             # Vollständigkeit
             st.markdown("### 📈 Vollständigkeit")
             
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                pct = (stats['complete'] / stats['total'] * 100) if stats['total'] > 0 else 0
-                st.metric("Vollständig (≥6 Felder)", f"{stats['complete']:,}", f"{pct:.1f}%")
-            
-            with col2:
-                medium = stats['total'] - stats['complete'] - stats['sparse']
-                pct = (medium / stats['total'] * 100) if stats['total'] > 0 else 0
-                st.metric("Mittel (3-5 Felder)", f"{medium:,}", f"{pct:.1f}%")
-            
-            with col3:
-                pct = (stats['sparse'] / stats['total'] * 100) if stats['total'] > 0 else 0
-                st.metric("Spärlich (≤2 Felder)", f"{stats['sparse']:,}", f"{pct:.1f}%")
+            for col, (label, count, pct) in zip(st.columns(3), pages.completeness_levels(totals)):
+                col.metric(label, f"{count:,}", f"{pct:.1f}%")
             
             st.markdown("---")
             
             # Feld-Vollständigkeit
             st.markdown("### 📋 Feld-Vollständigkeit")
             
-            field_stats = []
-            for field in EDITABLE_FIELDS:
-                filled = (df[field].fillna('').str.strip() != '').sum()
-                percentage = (filled / len(df)) * 100
-                field_stats.append({
-                    'Feld': field,
-                    'Ausgefüllt': filled,
-                    'Prozent': percentage
-                })
-            
-            field_df = pd.DataFrame(field_stats)
-            field_df = field_df.sort_values('Prozent', ascending=False)
-            
             st.dataframe(
-                field_df.style.format({'Ausgefüllt': '{:,}', 'Prozent': '{:.1f}%'}),
+                pages.field_completeness(totals, EDITABLE_FIELDS).style.format({'Ausgefüllt': '{:,}', 'Prozent': '{:.1f}%'}),
                 use_container_width=True,
                 hide_index=True
             )
@@ -508,120 +808,336 @@ elif mode == "📊 Gesamt-Übersicht":
             # Batch-Vergleich
             st.markdown("### 📦 Batch-Vergleich")
             
-            if 'Batch' in df.columns:
-                batch_stats = df.groupby('Batch').agg({
-                    'Datei': 'count',
-                    'Komponist': lambda x: (x.fillna('').str.strip() != '').sum(), #BITTE ANPASSEN
-                    'Signatur': lambda x: (x.fillna('').str.strip() != '').sum() #BITTE ANPASSEN
-                }).rename(columns={
-                    'Datei': 'Gesamt',
-                    'Komponist': 'Mit Komponist', #BITTE ANPASSEN
-                    'Signatur': 'Mit Signatur' #BITTE ANPASSEN
-                })
-                
-                batch_stats['% Komponist'] = (batch_stats['Mit Komponist'] / batch_stats['Gesamt'] * 100).round(1) #BITTE ANPASSEN
-                batch_stats['% Signatur'] = (batch_stats['Mit Signatur'] / batch_stats['Gesamt'] * 100).round(1) #BITTE ANPASSEN
-                
-                st.dataframe(
-                    batch_stats.style.format({
-                        'Gesamt': '{:,}',
-                        'Mit Komponist': '{:,}', #BITTE ANPASSEN
-                        'Mit Signatur': '{:,}', #BITTE ANPASSEN
-                        '% Komponist': '{:.1f}%', #BITTE ANPASSEN
-                        '% Signatur': '{:.1f}%' #BITTE ANPASSEN
-                    }),
+            # Je Batch gecachte Kennzahlen statt groupby über alle Karten
+            batch_stats, batch_formats = pages.batch_comparison(master.batch_stats(), OVERVIEW_FIELDS)
+            
+            if len(batch_stats) > 0:
+                # Seitenweise; Klick auf einen Batch öffnet ihn in der Batch-Ansicht
+                paged_table(
+                    "batch_stats", batch_stats, master.signature(),
+                    on_open=lambda row: open_card(row.name),
+                    style=lambda page: page.style.format(batch_formats),
                     use_container_width=True
                 )
             
             st.markdown("---")
             
+            # Bildabdeckung
+            st.markdown("### 🖼️ Bildabdeckung")
+            
+            image_index = service.image_index
+            st.caption(f"{len(image_index):,} Bilder im Index")
+            
+            if st.button("Abdeckung prüfen"):
+                st.session_state.coverage = service.coverage_report()
+            
+            if 'coverage' in st.session_state:
+                missing, orphans = st.session_state.coverage
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.metric("Karten ohne Bild", f"{len(missing):,}")
+                    if len(missing) > 0:
+                        st.download_button(
+                            label="📥 Karten ohne Bild",
+                            data=missing.to_csv(index=False).encode('utf-8-sig'),
+                            file_name="cards_without_image.csv",
+                            mime="text/csv"
+                        )
+                
+                with col2:
+                    st.metric("Bilder ohne CSV-Zeile", f"{len(orphans):,}")
+                    if len(orphans) > 0:
+                        st.download_button(
+                            label="📥 Bilder ohne CSV-Zeile",
+                            data=orphans.to_csv(index=False).encode('utf-8-sig'),
+                            file_name="images_without_card.csv",
+                            mime="text/csv"
+                        )
+            
+            st.markdown("---")
+            
+            # Korrekturen aus dem Änderungsprotokoll: welche Felder werden am häufigsten korrigiert?
+            if service.audit is not None:
+                st.markdown("### 📝 Korrekturen")
+                
+                rates = service.correction_rates(totals.total)
+                if len(rates) == 0:
+                    st.info("Noch keine protokollierten Korrekturen.")
+                else:
+                    col1, col2 = st.columns([1, 1])
+                    
+                    with col1:
+                        st.caption("Korrekturquote je Feld (Karten mit vom Ausgangswert abweichendem Wert)")
+                        st.dataframe(
+                            rates.style.format({'Bearbeitet': '{:,}', 'Korrigiert': '{:,}', 'Quote': '{:.2f}%'}),
+                            use_container_width=True, hide_index=True
+                        )
+                    
+                    with col2:
+                        st.bar_chart(rates.set_index('Feld')['Quote'])
+                    
+                    st.caption("Durchsatz je Prüfer und Tag")
+                    st.dataframe(service.audit.reviewer_throughput(), use_container_width=True, hide_index=True)
+                
+                st.markdown("---")
+            
             # Export
             st.markdown("### 💾 Export")
             
             col1, col2 = st.columns(2)
             
+            # Im Modus "chunked" blockweise direkt aus den Batch-Dateien
+            complete_frames, complete_columns, complete_version = service.complete_export()
+            problem_frames, problem_columns, problem_version = service.problem_export(PROBLEM_COLUMNS)
+            
             with col1:
-                # Download CSV
-                csv = df.to_csv(index=False, encoding='utf-8-sig').encode('utf-8-sig')
-                st.download_button(
-                    label="📥 CSV herunterladen",
-                    data=csv,
-                    file_name="XXXX_complete.csv", #Bitte anpassen!
-                    mime="text/csv"
+                # Gesamtexport (alle Spalten, blockweise je Batch geschrieben)
+                export_widget(
+                    "complete", "Gesamtexport",
+                    complete_version,
+                    complete_frames,
+                    "XXXX_complete", #Bitte anpassen!
+                    columns=complete_columns
                 )
             
             with col2:
-                # Download Problematische Karten
-                field_counts = df[EDITABLE_FIELDS].fillna('').apply(
-                    lambda row: sum(str(val).strip() != '' for val in row), axis=1
-                )
-                problematic = df[field_counts <= 2]
-                
-                if len(problematic) > 0:
-                    csv_prob = problematic[['Datei', 'Batch', 'Komponist', 'Signatur']].to_csv( #BITTE ANPASSEN
-                        index=False, 
-                        encoding='utf-8-sig'
-                    ).encode('utf-8-sig')
-                    st.download_button(
-                        label="⚠️ Problematische Karten",
-                        data=csv_prob,
-                        file_name="problematic_cards.csv",
-                        mime="text/csv"
+                # Problematische Karten
+                if totals.sparse > 0:
+                    export_widget(
+                        "problematic", "⚠️ Problematische Karten",
+                        problem_version,
+                        problem_frames,
+                        "problematic_cards",
+                        columns=problem_columns
                     )
     else:
-        st.error(f"Master-CSV nicht gefunden: {MASTER_CSV}")
+        st.error(f"Keine Batch-CSVs gefunden: {CSV_DIR}")
 
 elif mode == "🔍 Suche":
     
     st.title("🔍 Suche")
     
-    # Lade Master-CSV
-    if Path(MASTER_CSV).exists():
-        df = load_csv_data(MASTER_CSV)
+    # Gesamtbestand aus den Batch-CSVs (inkl. offener Korrekturen)
+    if get_batch_list():
+        # Suchfeld
+        search_term = st.text_input(
+            "Suchbegriff:",
+            placeholder="z.B. Bach, Müll, Komponist:Bach Titel:Kantate" #BITTE ANPASSEN
+        )
+        st.caption(
+            f"Durchsucht {', '.join(SEARCH_FIELDS)} nach Wortanfängen, unabhängig von Akzenten "
+            "und Umlauten. Mehrere Begriffe müssen alle vorkommen; `Feld:Begriff` sucht in einem Feld."
+        )
+        
+        col_fuzzy1, col_fuzzy2 = st.columns([1, 2])
         
-        if df is not None:
-            # Suchfeld
-            search_term = st.text_input(
-                "Suchbegriff:",
-                placeholder="Komponist, Titel, Signatur..." #BITTE ANPASSEN
+        with col_fuzzy1:
+            fuzzy_mode = st.toggle("🔤 Fehlertolerant (OCR-Fehler)", key="fuzzy_mode")
+        
+        with col_fuzzy2:
+            max_distance = st.slider(
+                "Max. Editierdistanz je Wort:",
+                1, 3,
+                value=FUZZY_MAX_DISTANCE,
+                disabled=not fuzzy_mode
             )
+        
+        if search_term:
+            # Suche über den Suchindex (Treffer nach Relevanz sortiert)
+            with st.spinner("Durchsuche Batches..."):
+                found = service.search(search_term, fuzzy=fuzzy_mode, max_distance=max_distance)
+            results, results_version = found.results, found.version
+            if found.n_hits > len(results):
+                st.caption(f"{found.n_hits:,} Treffer insgesamt, die {len(results):,} relevantesten werden angezeigt.")
             
-            if search_term:
-                # Suche in allen relevanten Feldern
-                mask = (
-                    df['Komponist'].fillna('').str.contains(search_term, case=False) | #BITTE ANPASSEN
-                    df['Titel'].fillna('').str.contains(search_term, case=False) | #BITTE ANPASSEN
-                    df['Signatur'].fillna('').str.contains(search_term, case=False) | #BITTE ANPASSEN
-                    df['Textanfang'].fillna('').str.contains(search_term, case=False) #BITTE ANPASSEN
-                )
-                
-                results = df[mask]
-                
-                st.markdown(f"**{len(results)} Treffer** für '{search_term}'")
-                
-                if len(results) > 0:
-                    st.markdown("---")
-                    
-                    # Zeige Ergebnisse
-                    display_cols = ['Datei', 'Batch', 'Komponist', 'Signatur', 'Titel'] #BITTE ANPASSEN
+            # Ähnliche Schreibweisen des Suchbegriffs je Feld
+            if found.similar:
+                with st.expander(f"🔤 Ähnliche Schreibweisen ({len(found.similar)})"):
                     st.dataframe(
-                        results[display_cols],
+                        pd.DataFrame(found.similar),
                         use_container_width=True,
                         hide_index=True
                     )
-                    
-                    # Export Suchergebnisse
-                    csv = results.to_csv(index=False, encoding='utf-8-sig').encode('utf-8-sig')
-                    st.download_button(
-                        label="📥 Suchergebnisse exportieren",
-                        data=csv,
-                        file_name=f"search_{search_term}.csv",
-                        mime="text/csv"
-                    )
-            else:
-                st.info("Gib einen Suchbegriff ein, um Karteikarten zu finden.")
+            
+            st.markdown(f"**{len(results)} Treffer** für '{search_term}'")
+            
+            if len(results) > 0:
+                st.markdown("---")
+                
+                # Zeige Ergebnisse seitenweise; Klick auf einen Treffer öffnet die Karte
+                paged_table(
+                    "search", results, results_version,
+                    columns=[c for c in SEARCH_DISPLAY_COLUMNS if c in results.columns],
+                    on_open=lambda row: open_card(row['Batch'], row['Datei']),
+                    use_container_width=True,
+                    hide_index=True
+                )
+                
+                # Export Suchergebnisse
+                export_widget(
+                    "search", "Suchergebnisse",
+                    results_version,
+                    lambda: [results],
+                    f"search_{search_term}"
+                )
+        else:
+            st.info("Gib einen Suchbegriff ein, um Karteikarten zu finden.")
+    else:
+        st.error(f"Keine Batch-CSVs gefunden: {CSV_DIR}")
+
+elif mode == "🧬 Duplikate":
+    
+    st.title("🧬 Duplikate")
+    
+    if get_batch_list():
+        hashes = service.image_hashes
+        col_dup1, col_dup2 = st.columns([3, 1])
+        with col_dup1:
+            st.caption(
+                f"Exakte Duplikate (gleicher Dateiname im Batch, identische Bilddatei) und mögliche Duplikate "
+                f"(ähnliches Bild, gleiche Signatur oder gleiches Werk) im Gesamtbestand · "
+                f"{len(hashes):,} Bilder gehasht" + (" (Aktualisierung läuft)" if hashes.refreshing else "")
+            )
+        with col_dup2:
+            recheck = st.button("🔄 Neu prüfen", use_container_width=True)
+        
+        with st.spinner("Prüfe Gesamtbestand auf Duplikate..."):
+            report = service.duplicates(refresh=recheck)
+        cards = report.cards
+        
+        col_d1, col_d2, col_d3 = st.columns(3)
+        col_d1.metric("Gruppen", f"{report.groups:,}")
+        col_d2.metric("Betroffene Karten", f"{len(cards):,}")
+        col_d3.metric("Geprüft", time.strftime("%H:%M:%S", time.localtime(report.created)))
+        skipped_text = pages.skipped_text(report.skipped)
+        if skipped_text is not None:
+            st.caption(skipped_text)
+        
+        if len(cards) > 0:
+            # Gruppen nach Grund filtern
+            reason_counts = report.reason_counts()
+            reasons = st.multiselect(
+                "Gründe:",
+                list(reason_counts.index),
+                format_func=lambda reason: f"{reason} ({reason_counts[reason]})",
+                key="duplicate_reasons"
+            )
+            shown = report.with_reasons(reasons)
+            group_ids = pages.group_ids(shown, 'Gruppe')
+            st.markdown(f"**{len(group_ids):,} Gruppen** (gefiltert)")
+            
+            if group_ids:
+                # Eine Gruppe zur Prüfung
+                position = st.number_input("Gruppe Nr.:", 1, len(group_ids), 1, key="duplicate_group") - 1
+                members = pages.group(shown, 'Gruppe', group_ids[position])
+                st.markdown(f"**Gründe:** {members['Gründe'].iloc[0]}")
+                st.dataframe(members, use_container_width=True, hide_index=True)
+                
+                # Bilder nebeneinander (höchstens 4)
+                image_cols = st.columns(min(len(members), 4))
+                for col, (_, member) in zip(image_cols, members.head(4).iterrows()):
+                    with col:
+                        img = load_image(member['Batch'], member['Datei'])
+                        if img is not None:
+                            st.image(img, use_container_width=True)
+                        st.caption(f"`{member['Batch']}/{member['Datei']}`")
+                if len(members) > 4:
+                    st.caption(f"{len(members) - 4} weitere Karten in dieser Gruppe")
+            
+            st.markdown("---")
+            st.markdown("### 📥 Export")
+            export_widget(
+                "duplicates", "Duplikatliste",
+                report.export_version,
+                lambda: [cards],
+                "duplicates"
+            )
+        else:
+            st.success("Keine Duplikate gefunden.")
     else:
-        st.error(f"Master-CSV nicht gefunden: {MASTER_CSV}")
+        st.error(f"Keine Batch-CSVs gefunden: {CSV_DIR}")
+
+elif mode == "🏷️ Schreibweisen":
+    
+    st.title("🏷️ Schreibweisen")
+    
+    if get_batch_list():
+        col_a1, col_a2 = st.columns(2)
+        with col_a1:
+            authority_field = st.selectbox("Feld:", list(AUTHORITY_FIELDS), key="authority_field")
+        with col_a2:
+            methods = list(KEY_METHODS)
+            authority_method = st.selectbox(
+                "Verfahren:",
+                methods,
+                index=methods.index(AUTHORITY_FIELDS[authority_field]),
+                format_func=lambda method: KEY_METHODS[method][0],
+                key=f"authority_method_{authority_field}"
+            )
+        st.caption(
+            "Abweichende Schreibweisen mit gleichem Normalisierungsschlüssel bilden einen Cluster. "
+            "Der gewählte Normwert wird auf alle Karten der ausgewählten Schreibweisen in allen Batches übernommen."
+        )
+        
+        with st.spinner("Zähle Schreibweisen..."):
+            clusters = service.value_clusters(authority_field, authority_method)
+        
+        cluster_filter = st.text_input("Cluster filtern:", placeholder="z.B. Bach", key="authority_filter") #BITTE ANPASSEN
+        shown = filter_clusters(clusters, cluster_filter)
+        cluster_ids = pages.group_ids(shown, 'Cluster')
+        
+        col_m1, col_m2, col_m3 = st.columns(3)
+        col_m1.metric("Cluster", f"{len(cluster_ids):,}")
+        col_m2.metric("Schreibweisen", f"{len(shown):,}")
+        col_m3.metric("Karten", f"{int(shown['Karten'].sum()):,}")
+        
+        if cluster_ids:
+            # Übersicht: ein Cluster je Zeile, häufigste Schreibweise als Vorschlag
+            st.dataframe(cluster_summary(shown), use_container_width=True, hide_index=True, height=250)
+            
+            position = st.number_input("Cluster Nr. (in der Liste):", 1, len(cluster_ids), 1, key="authority_cluster") - 1
+            members = pages.group(shown, 'Cluster', cluster_ids[position])
+            st.dataframe(members[['Wert', 'Karten', 'Batches']], use_container_width=True, hide_index=True)
+            
+            # Auswahl gilt je Cluster-Inhalt (nach einer Übernahme ändern sich die Cluster);
+            # bewusst leer, damit nicht versehentlich verschiedene Personen zusammengeführt werden
+            member_key = pages.cluster_key(authority_field, authority_method, members)
+            selected_values = st.multiselect(
+                "Zusammenführen:",
+                members['Wert'].tolist(),
+                key=f"authority_members_{member_key}",
+                placeholder="Schreibweisen auswählen, die dieselbe Person bzw. denselben Wert meinen"
+            )
+            canonical = st.selectbox(
+                "Normwert:",
+                pages.canonical_choices(members),
+                key=f"authority_canonical_{member_key}"
+            )
+            if canonical == pages.OWN_SPELLING:
+                canonical = st.text_input("Eigene Schreibweise:", key=f"authority_own_{member_key}").strip()
+            
+            affected = to_merge(members, selected_values, canonical)
+            if canonical and len(affected) > 0:
+                st.markdown(
+                    f"**{int(affected['Karten'].sum())} Karten** mit {len(affected)} Schreibweise(n) "
+                    f"werden auf `{canonical}` gesetzt."
+                )
+                if st.button("✅ Normwert übernehmen", key="authority_apply"):
+                    try:
+                        n_changed, n_batches = service.apply_canonical(
+                            authority_field, affected['Wert'].tolist(), canonical,
+                            source=st.session_state.session_id, reviewer=reviewer()
+                        )
+                        st.success(f"✅ {n_changed} Karten in {n_batches} Batch(es) geändert!")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Fehler beim Speichern: {e}")
+        else:
+            st.success("Keine abweichenden Schreibweisen gefunden.")
+    else:
+        st.error(f"Keine Batch-CSVs gefunden: {CSV_DIR}")
 
 # === FOOTER ===
 st.markdown("---")
@@ -631,3 +1147,30 @@ st.markdown("""
     <p>Name Museum | Team oder Arbeitsgruppe</p> #Bitte anpassen!
 </div>
 """, unsafe_allow_html=True)
+
+# === DIAGNOSE ===
+timings.record("Rerun gesamt", time.perf_counter() - rerun_start)
+timings.flush()
+
+if diagnostics_slot is not None:
+    with diagnostics_slot:
+        with st.expander("🩺 Diagnose", expanded=True):
+            st.markdown("**Laufzeiten je Stufe**")
+            st.dataframe(timings.summary().round(1), use_container_width=True, hide_index=True)
+            
+            st.markdown("**Caches**")
+            st.caption(pages.cache_text(service.data_cache.stats()))
+            st.caption(pages.prefetch_text(service.prefetcher.stats()))
+            for name, value in sorted(timings.counters().items()):
+                st.caption(f"{name}: {value}")
+            
+            st.download_button(
+                label="📥 Messungen (JSON Lines)",
+                data=timings.to_jsonl(),
+                file_name="qc_timings.jsonl",
+                mime="application/x-ndjson",
+                key="diagnostics_download"
+            )
+            if st.button("🧹 Messungen zurücksetzen", key="diagnostics_reset"):
+                timings.reset()
+                st.rerun()
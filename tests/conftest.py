@@ -0,0 +1,25 @@
+import pandas as pd
+import pytest
+
+# Felder der Test-Batches (wie EDITABLE_FIELDS der App)
+FIELDS = [
+    "Komponist", "Signatur", "Titel", "Textanfang",
+    "Verlag", "Material", "Textdichter", "Bearbeiter", "Bemerkungen"
+]
+N_CARDS = 20
+
+
+def make_batch(csv_dir, name="batch_01", n_cards=N_CARDS):
+    """Schreibt eine Batch-CSV mit gefüllten Feldern und gibt ihren Pfad zurück."""
+    df = pd.DataFrame({"Datei": [f"karte_{i:03d}.jpg" for i in range(n_cards)]})
+    for field in FIELDS:
+        df[field] = [f"{field} {i}" for i in range(n_cards)]
+    df["Batch"] = name
+    path = csv_dir / f"{name}.csv"
+    df.to_csv(path, index=False, encoding="utf-8-sig")
+    return path
+
+
+@pytest.fixture
+def batch_csv(tmp_path):
+    return make_batch(tmp_path)
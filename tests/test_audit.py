@@ -0,0 +1,46 @@
+import pandas as pd
+
+from qc_core import journal
+from qc_core.service import QCService, Settings
+
+
+def test_revert_restores_missing_value(batch_csv, tmp_path):
+    df = pd.read_csv(batch_csv, encoding="utf-8-sig")
+    df.loc[2, "Bemerkungen"] = None
+    df.to_csv(batch_csv, index=False, encoding="utf-8-sig")
+
+    service = QCService(Settings(csv_dir=str(batch_csv.parent), audit_db_path=str(tmp_path / "audit.sqlite")))
+    view = service.load_batch(str(batch_csv))
+    filled = view.completeness.counts[2]
+    service.save_corrections(view, str(batch_csv), 2, {"Bemerkungen": "neu", "Titel": "Titel neu"})
+
+    originals = service.audit.original_values("batch_01")
+    originals = originals.set_index("Feld")["Ausgangswert"]
+    assert pd.isna(originals["Bemerkungen"]) and originals["Titel"] == "Titel 2"
+
+    assert service.revert_to_original("batch_01") == 1
+    view = service.load_batch(str(batch_csv))
+    assert pd.isna(view.df.at[2, "Bemerkungen"])
+    assert view.df.at[2, "Titel"] == "Titel 2"
+    assert view.completeness.counts[2] == filled
+    assert pd.isna(journal.load_with_journal(batch_csv).at[2, "Bemerkungen"])
+    # Nichts mehr abweichend: erneutes Zurücksetzen ändert nichts
+    assert service.revert_to_original("batch_01") == 0
+    assert service.audit.field_rates()["Korrigiert"].tolist() == [0, 0]
+
+
+def test_revert_keeps_cards_with_same_filename_apart(batch_csv, tmp_path):
+    df = pd.read_csv(batch_csv, encoding="utf-8-sig")
+    df.loc[5, "Datei"] = df.loc[4, "Datei"]
+    df.to_csv(batch_csv, index=False, encoding="utf-8-sig")
+
+    service = QCService(Settings(csv_dir=str(batch_csv.parent), audit_db_path=str(tmp_path / "audit.sqlite")))
+    view = service.load_batch(str(batch_csv))
+    service.save_corrections(view, str(batch_csv), 5, {"Titel": "Titel neu"})
+    service.save_corrections(view, str(batch_csv), 4, {"Verlag": "Verlag neu"})
+
+    assert service.revert_to_original("batch_01", files=["karte_004.jpg"], rows=[5]) == 1
+    df = service.load_batch(str(batch_csv)).df
+    assert df.loc[[4, 5], ["Titel", "Verlag"]].values.tolist() == [["Titel 4", "Verlag neu"], ["Titel 5", "Verlag 5"]]
+    assert service.revert_to_original("batch_01") == 1
+    assert service.load_batch(str(batch_csv)).df.at[4, "Verlag"] == "Verlag 4"
@@ -0,0 +1,35 @@
+import pandas as pd
+
+from qc_core.authority import AuthorityIndex, SimilarValues, initials_key, similar_groups, value_counts
+
+
+def test_initials_only_for_abbreviated_names():
+    assert initials_key("Bach, J. S.") == initials_key("J.S. Bach") == initials_key("Bach J.S.")
+    assert initials_key("Schumann, Robert") != initials_key("Schumann, Richard")
+
+
+def test_similar_groups_follow_changed_values():
+    totals = {"Schubert": 40, "Schuberl": 2, "Sch ubert": 1, "Mozart": 10, "Mozarf": 1}
+    similar = SimilarValues()
+    groups = sorted(sorted(g) for g in similar_groups(totals, similar))
+    assert groups == [["Mozarf", "Mozart"], ["Sch ubert", "Schuberl", "Schubert"]]
+
+    # Nach Korrekturen: neuer Tippfehler, "Mozarf" verschwunden - nur der neue Wert wird verglichen
+    totals = {"Schubert": 42, "Sch ubert": 1, "Mozart": 11, "Beethoven": 5, "Beethoveh": 1}
+    assert sorted(sorted(g) for g in similar_groups(totals, similar)) == sorted(
+        sorted(g) for g in similar_groups(totals)
+    )
+    assert similar._added == {"beethoven", "beethoveh"}
+
+
+def test_clusters_after_batch_change(tmp_path):
+    path = tmp_path / "batch_01.csv"
+    pd.DataFrame({"Komponist": ["Bach, J. S.", "J.S. Bach", "Händel", "Handel"]}).to_csv(path, index=False)
+    index = AuthorityIndex(tmp_path, ["Komponist"], lambda p: value_counts(pd.read_csv(p), ["Komponist"]))
+    index.refresh()
+    table = index.clusters("Komponist", "fingerprint")
+    assert sorted(table["Wert"]) == ["Bach, J. S.", "Handel", "Händel", "J.S. Bach"]
+
+    pd.DataFrame({"Komponist": ["Bach, J. S.", "Bach, J. S.", "Händel", "Handel"]}).to_csv(path, index=False)
+    assert index.refresh() == ["batch_01"]
+    assert index.clusters("Komponist", "fingerprint")[["Wert", "Karten"]].values.tolist() == [["Handel", 1], ["Händel", 1]]
@@ -0,0 +1,39 @@
+from conftest import FIELDS, N_CARDS
+
+from qc_core import journal
+from qc_core.batch_stats import BatchStats, load_sidecar, sidecar_path, write_sidecar
+from qc_core.card_index import BatchView
+from qc_core.master import MasterView
+
+
+def test_sidecar_follows_journal(batch_csv):
+    view = BatchView.from_frame(journal.load_with_journal(batch_csv), FIELDS)
+    stats = BatchStats.from_completeness("batch_01", view.completeness)
+    write_sidecar(batch_csv, stats, FIELDS)
+    assert load_sidecar(batch_csv, FIELDS) == stats
+    # Andere Felder oder eine neue Journal-Zeile machen das Sidecar ungültig
+    assert load_sidecar(batch_csv, FIELDS[:2]) is None
+    journal.append_edits(batch_csv, [(0, "karte_000.jpg", {"Komponist": ""})])
+    assert load_sidecar(batch_csv, FIELDS) is None
+
+
+def test_master_totals_read_sidecars(tmp_path, batch_csv):
+    loaded = []
+
+    def loader(path):
+        loaded.append(path)
+        return BatchView.from_frame(journal.load_with_journal(path), FIELDS)
+
+    master = MasterView(tmp_path, FIELDS, loader=loader)
+    assert master.refresh() == ["batch_01"] and len(loaded) == 1
+    assert sidecar_path(batch_csv).exists()
+
+    # Neuer Server: Kennzahlen nur aus dem Sidecar, ohne den Batch zu laden
+    master = MasterView(tmp_path, FIELDS, loader=loader)
+    master.refresh()
+    assert len(loaded) == 1
+    assert master.totals().total == N_CARDS and master.totals().sparse == 0
+
+    journal.append_edits(batch_csv, [(3, "karte_003.jpg", {"Titel": None})])
+    assert master.refresh() == ["batch_01"]
+    assert master.totals().field_counts["Titel"] == N_CARDS - 1
@@ -0,0 +1,75 @@
+import pytest
+
+from qc_core import journal
+from qc_core.changes import ConflictError
+from qc_core.service import QCService, Settings
+
+
+def two_servers(csv_path):
+    """Zwei unabhängige Datenschichten auf denselben Dateien (wie zwei Server-Prozesse)."""
+    settings = Settings(csv_dir=str(csv_path.parent))
+    return QCService(settings), QCService(settings)
+
+
+def test_same_field_raises_conflict(batch_csv):
+    first, second = two_servers(batch_csv)
+    view_a = first.load_batch(str(batch_csv))
+    view_b = second.load_batch(str(batch_csv))
+    seen = view_a.df.at[3, "Titel"]
+    assert view_b.df.at[3, "Titel"] == seen
+
+    second.save_corrections(view_b, str(batch_csv), 3, {"Titel": "Titel von B"}, expected={"Titel": seen})
+    with pytest.raises(ConflictError) as error:
+        first.save_corrections(view_a, str(batch_csv), 3, {"Titel": "Titel von A"}, expected={"Titel": seen})
+
+    conflicts = error.value.conflicts
+    assert conflicts[["Zeile", "Feld", "Gesehen", "Aktuell", "Neu"]].values.tolist() == [
+        [3, "Titel", seen, "Titel von B", "Titel von A"]
+    ]
+    # Nichts gespeichert: im Journal steht nur die Korrektur von B
+    assert [entry["changes"] for entry in journal.read_journal(batch_csv)] == [{"Titel": "Titel von B"}]
+
+
+def test_same_value_is_no_conflict(batch_csv):
+    first, second = two_servers(batch_csv)
+    view_a = first.load_batch(str(batch_csv))
+    view_b = second.load_batch(str(batch_csv))
+    seen = view_a.df.at[3, "Titel"]
+
+    second.save_corrections(view_b, str(batch_csv), 3, {"Titel": "Neu"}, expected={"Titel": seen})
+    first.save_corrections(view_a, str(batch_csv), 3, {"Titel": "Neu"}, expected={"Titel": seen})
+
+    assert first.load_batch(str(batch_csv)).df.at[3, "Titel"] == "Neu"
+
+
+def test_other_field_is_merged(batch_csv):
+    first, second = two_servers(batch_csv)
+    view_a = first.load_batch(str(batch_csv))
+    view_b = second.load_batch(str(batch_csv))
+    seen_title = view_b.df.at[3, "Titel"]
+    seen_composer = view_a.df.at[3, "Komponist"]
+
+    second.save_corrections(view_b, str(batch_csv), 3, {"Titel": "Titel von B"}, expected={"Titel": seen_title})
+    first.save_corrections(
+        view_a, str(batch_csv), 3, {"Komponist": "Komponist von A"}, expected={"Komponist": seen_composer}
+    )
+
+    # Beide Korrekturen landen in beiden Servern und auf Platte
+    for service in (first, second):
+        df = service.load_batch(str(batch_csv)).df
+        assert (df.at[3, "Titel"], df.at[3, "Komponist"]) == ("Titel von B", "Komponist von A")
+    df = journal.load_with_journal(batch_csv)
+    assert (df.at[3, "Titel"], df.at[3, "Komponist"]) == ("Titel von B", "Komponist von A")
+
+
+def test_change_feed_reports_other_server(batch_csv):
+    first, second = two_servers(batch_csv)
+    first.load_batch(str(batch_csv))
+    seq = first.changes.latest
+
+    view_b = second.load_batch(str(batch_csv))
+    second.save_corrections(view_b, str(batch_csv), 5, {"Verlag": "Verlag von B"})
+
+    first.load_batch(str(batch_csv))
+    changes, _ = first.changes.since(seq)
+    assert [(change.rows, change.fields) for change in changes] == [([5], ["Verlag"])]
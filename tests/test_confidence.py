@@ -0,0 +1,72 @@
+import json
+import time
+
+import pandas as pd
+
+from qc_core import views
+from qc_core.confidence import ConfidenceTable, parse_file
+from qc_core.service import QCService, Settings
+
+
+def write_json(json_dir, datei, confidences):
+    record = {"Datei": datei, "fields": {name: {"value": "x", "confidence": c} for name, c in confidences.items()}}
+    path = json_dir / f"{datei}.json"
+    path.write_text(json.dumps(record), encoding="utf-8")
+    return path
+
+
+def test_parse_file(tmp_path):
+    path = write_json(tmp_path, "karte_000.jpg", {"Titel": 0.9, "Komponist": 40})
+    assert parse_file(str(path)) == [("karte_000.jpg", 0.4, 0.65, "Komponist", 1, "")]
+    broken = tmp_path / "kaputt.json"
+    broken.write_text("{", encoding="utf-8")
+    assert parse_file(str(broken))[0][1] == 0.0
+
+
+def test_refresh_reads_only_changed_files(tmp_path):
+    json_dir = tmp_path / "json"
+    json_dir.mkdir()
+    for i in range(3):
+        write_json(json_dir, f"karte_{i:03d}.jpg", {"Titel": 0.1 * (i + 1)})
+    table = ConfidenceTable(json_dir, tmp_path / "confidence.pkl", workers=1)
+    assert table.refresh() == 3 and table.ready
+    assert table.refresh() == 0
+
+    write_json(json_dir, "karte_001.jpg", {"Titel": 0.9})
+    assert table.refresh() == 1
+    datei = pd.Series(["karte_001.jpg", "karte_002.jpg", "fehlt.jpg"], index=[5, 6, 7])
+    confidence = table.confidence(datei)
+    assert confidence.index.tolist() == [5, 6, 7]
+    assert confidence.iloc[:2].round(2).tolist() == [0.9, 0.3] and pd.isna(confidence.iloc[2])
+    # Gespeicherte Tabelle wird beim nächsten Start geladen
+    assert len(ConfidenceTable(json_dir, tmp_path / "confidence.pkl")) == 3
+
+
+def test_parallel_parse(tmp_path, monkeypatch):
+    from qc_core import confidence
+
+    monkeypatch.setattr(confidence, "PARALLEL_MIN_FILES", 1)
+    for i in range(4):
+        write_json(tmp_path, f"karte_{i:03d}.jpg", {"Titel": 0.5})
+    table = ConfidenceTable(tmp_path, workers=2)
+    assert table.refresh() == 4 and len(table) == 4
+
+
+def test_confidence_table_builds_in_background(batch_csv, tmp_path):
+    json_dir = tmp_path / "json"
+    json_dir.mkdir()
+    write_json(json_dir, "karte_003.jpg", {"Titel": 0.1})
+    service = QCService(Settings(csv_dir=str(batch_csv.parent), json_dir=str(json_dir)))
+    view = service.load_batch(str(batch_csv))
+    filters = {"Alle": None, "Niedrige Konfidenz": views.low_confidence}
+    sorts = {"Datei": "Datei"}
+
+    # Ohne Konfidenz-Filter wird die Tabelle gar nicht angelegt
+    views.batch_order(service, view, "batch_01", "Alle", "Datei", filters, sorts)
+    assert "confidence_table" not in service._singletons
+
+    table = service.confidence_table
+    deadline = time.time() + 10
+    while not table.ready and time.time() < deadline:
+        time.sleep(0.01)
+    assert list(views.batch_order(service, view, "batch_01", "Niedrige Konfidenz", "Datei", filters, sorts)) == [3]
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from qc_core import duplicates
+from qc_core.duplicates import ImageHashes, find_duplicates
+
+
+def cards(rows):
+    return pd.DataFrame(rows, columns=["Batch", "Datei", "Signatur", "Komponist", "Titel", "Textanfang"])
+
+
+def test_metadata_and_filename_groups():
+    report = find_duplicates(cards([
+        ("batch_01", "karte_000.jpg", "Mus. 12", "Bach", "Air", "a"),
+        ("batch_02", "karte_000.jpg", "Mus 12", "Händel", "Largo", "b"),
+        ("batch_02", "karte_001.jpg", "Mus. 13", "Mozart", "Ave", "c"),
+        ("batch_02", "karte_001.jpg", "Mus. 13", "Mozart", "Ave", "c"),
+        ("batch_03", "karte_000.jpg", "Mus. 14", "Brahms", "Lied", "d"),
+    ]))
+    assert report.groups == 2
+    # Gleicher Dateiname in verschiedenen Batches ist kein Duplikat
+    assert report.others_of("batch_03", "karte_000.jpg").empty
+    assert report.others_of("batch_01", "karte_000.jpg")[["Batch", "Gründe"]].values.tolist() == [
+        ["batch_02", "Signatur"]
+    ]
+    assert set(report.group_of("batch_02", "karte_001.jpg")["Gründe"].str.split(", ").iloc[0]) == {
+        "Datei mehrfach", "Signatur", "Komponist + Titel + Textanfang"
+    }
+    assert report.mask(pd.DataFrame({"Datei": ["karte_000.jpg", "karte_001.jpg"]}), "batch_02").tolist() == [True, True]
+
+
+def test_image_hashes_find_rescans(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    pattern = rng.integers(0, 256, (64, 64), dtype=np.uint8).repeat(4, axis=0).repeat(4, axis=1)
+    Image.fromarray(pattern).save(tmp_path / "a.png")
+    # Neuscan: etwas heller, andere Größe
+    Image.fromarray(np.clip(pattern.astype(int) + 10, 0, 255).astype(np.uint8)).resize((200, 200)).save(tmp_path / "b.png")
+    Image.fromarray(255 - pattern).save(tmp_path / "c.png")
+
+    # Mehrere Prozesse (spawn) auch für wenige Dateien
+    monkeypatch.setattr(duplicates, "PARALLEL_MIN_FILES", 1)
+    hashes = ImageHashes(tmp_path, tmp_path / "hashes.pkl", workers=2)
+    assert hashes.refresh(["a.png", "b.png", "c.png"]) == 3
+    assert hashes.refresh(["a.png", "b.png", "c.png"]) == 0
+
+    report = find_duplicates(
+        cards([("b1", f"{n}.png", f"S{n}", n, n, n) for n in "abc"]), ["a.png", "b.png", "c.png"], hashes
+    )
+    assert report.cards[["Datei", "Gründe"]].values.tolist() == [["a.png", "Bild fast gleich"], ["b.png", "Bild fast gleich"]]
@@ -0,0 +1,52 @@
+import gzip
+
+import pandas as pd
+import pytest
+
+from qc_core.export import ExportCache, write_export
+
+
+def frames():
+    return [
+        pd.DataFrame({"Datei": ["a.jpg", "b.jpg"], "Titel": ["A", None]}),
+        pd.DataFrame({"Datei": ["c.jpg"], "Signatur": [12]}),
+    ]
+
+
+def test_write_export_unions_columns(tmp_path):
+    path = tmp_path / "out.csv.gz"
+    assert write_export(frames(), path, "csv.gz") == 3
+    with gzip.open(path, "rt", encoding="utf-8-sig") as f:
+        df = pd.read_csv(f)
+    assert list(df.columns) == ["Datei", "Titel", "Signatur"]
+    assert df["Datei"].tolist() == ["a.jpg", "b.jpg", "c.jpg"]
+    with pytest.raises(ValueError):
+        write_export(frames(), tmp_path / "out.txt", "txt")
+
+
+def test_write_export_parquet_as_text(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "out.parquet"
+    write_export(iter(frames()), path, "parquet", columns=["Datei", "Signatur"])
+    signatures = pd.read_parquet(path)["Signatur"]
+    assert signatures.isna().tolist() == [True, True, False] and signatures.iloc[2] == "12"
+
+
+def test_export_cache_by_version(tmp_path):
+    cache = ExportCache(tmp_path)
+    calls = []
+
+    def frames_func():
+        calls.append(1)
+        return frames()
+
+    first = cache.get("complete", ("v1",), "csv", frames_func)
+    assert cache.get("complete", ("v1",), "csv", frames_func) == first and len(calls) == 1
+    # Neuer Datenstand: neue Datei, die alte wird entfernt
+    second = cache.get("complete", ("v2",), "csv", frames_func)
+    assert second != first and len(calls) == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == [second.name]
+    # Fehler beim Schreiben hinterlässt keine Datei
+    with pytest.raises(RuntimeError):
+        cache.get("complete", ("v3",), "csv", lambda: (_ for _ in ()).throw(RuntimeError("kaputt")))
+    assert sorted(p.name for p in tmp_path.iterdir()) == [second.name]
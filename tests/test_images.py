@@ -0,0 +1,88 @@
+import os
+import threading
+
+from qc_core.image_index import ImageIndex
+from qc_core.prefetch import ImagePrefetcher
+from qc_core.service import QCService, Settings
+
+
+def write_image(path, data=b"jpeg"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def test_index_resolves_and_refreshes(tmp_path):
+    root = tmp_path / "bilder"
+    write_image(root / "batch_01" / "karte_000.jpg")
+    write_image(root / "karte_001.jpg")
+    write_image(root / "batch_02" / "notiz.txt")
+    index = ImageIndex(root, tmp_path / "index.json")
+    assert index.refresh() == 3 and len(index) == 2
+
+    assert index.resolve("batch_01", "karte_000.jpg") == root / "batch_01" / "karte_000.jpg"
+    assert index.resolve("batch_09", "karte_001.jpg") == root / "karte_001.jpg"
+    path, mtime_ns, size = index.lookup("batch_01", "karte_000.jpg")
+    assert (mtime_ns, size) == (os.stat(path).st_mtime_ns, 4)
+
+    # Unveränderte Verzeichnisse werden nicht neu gelesen; gespeicherter Index wird geladen
+    assert index.refresh() == 0
+    write_image(root / "batch_02" / "karte_002.jpg")
+    assert index.refresh() == 1
+    assert ImageIndex(root, tmp_path / "index.json").lookup("batch_02", "karte_002.jpg") is not None
+
+
+def test_prefetch_cache_bounded_by_bytes():
+    images = {"a": b"x" * 40, "b": b"x" * 40, "c": b"x" * 40, "fehlt": None}
+    prefetcher = ImagePrefetcher(images.get, max_bytes=100)
+    for key in images:
+        prefetcher.get(key)
+    stats = prefetcher.stats()
+    assert (stats.cached, stats.cached_bytes) == (2, 80)
+    # Fehlende Bilder werden nicht gemerkt
+    images["fehlt"] = b"neu"
+    assert prefetcher.get("fehlt") == b"neu"
+
+
+def test_image_key_without_stat_per_card(tmp_path, monkeypatch):
+    root = tmp_path / "bilder"
+    write_image(root / "batch_01" / "karte_000.jpg")
+    outside = write_image(tmp_path / "batch_01" / "karte_009.jpg")
+    service = QCService(Settings(csv_dir=str(tmp_path), image_base_dir=str(root)))
+    assert service.image_index.lookup("batch_01", "karte_000.jpg") is not None
+
+    stats = []
+    real_stat = type(root).stat
+    monkeypatch.setattr(type(root), "stat", lambda self, **kw: stats.append(self) or real_stat(self, **kw))
+    key = service.image_key("batch_01", "karte_000.jpg", 800)
+    assert key[:2] == (str(root / "batch_01" / "karte_000.jpg"), 800) and stats == []
+
+    # Nicht indiziert: Ausweichpfade einmal je Stand des Index
+    assert service.image_key("batch_01", "karte_009.jpg", 800)[0] == str(outside)
+    assert service.image_key("batch_01", "fehlt.jpg", 800) is None
+    n_stats = len(stats)
+    service.image_key("batch_01", "karte_009.jpg", 800)
+    service.image_key("batch_01", "fehlt.jpg", 800)
+    assert len(stats) == n_stats
+
+
+def test_prefetch_drops_stale_requests():
+    started, release = threading.Event(), threading.Event()
+    loaded = []
+
+    def loader(key):
+        started.set()
+        release.wait(5)
+        loaded.append(key)
+        return b"x"
+
+    prefetcher = ImagePrefetcher(loader, workers=1, max_pending=4)
+    prefetcher.prefetch(["a", "b", "c"], owner="s1")
+    assert started.wait(5)
+    # Weitergeblättert: b und c warten noch und werden verworfen, a läuft bereits
+    prefetcher.prefetch(["d", "e", "f", "g", "h"], owner="s1")
+    assert set(prefetcher._pending) == {"a", "d", "e", "f"}
+    release.set()
+    assert prefetcher.get("b") == b"x"
+    assert prefetcher.get("f") == b"x"
+    assert "c" not in loaded and "g" not in loaded
@@ -0,0 +1,117 @@
+import multiprocessing
+import threading
+
+from conftest import FIELDS
+
+from qc_core import journal
+from qc_core.service import QCService, Settings
+
+# spawn statt fork: Kindprozesse teilen keine Locks mit dem Testprozess
+_context = multiprocessing.get_context("spawn")
+
+
+def _datei(row):
+    return f"karte_{row:03d}.jpg"
+
+
+def _append_many(csv_path, writer, n_edits):
+    for i in range(n_edits):
+        journal.append_edits(csv_path, [(i % 20, _datei(i % 20), {"Bemerkungen": f"{writer}:{i}"})])
+
+
+def _append_and_compact(csv_path, n_edits, every):
+    for i in range(n_edits):
+        journal.append_edits(csv_path, [(i % 20, _datei(i % 20), {"Titel": f"Titel {i}"})])
+        if i % every == every - 1:
+            journal.compact(csv_path)
+
+
+def _written(entries):
+    return sorted(entry["changes"]["Bemerkungen"] for entry in entries)
+
+
+def test_concurrent_appends_from_threads(batch_csv):
+    threads = [threading.Thread(target=_append_many, args=(batch_csv, f"t{n}", 50)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Keine verlorenen oder zerrissenen Zeilen (die würden beim Lesen übersprungen)
+    assert _written(journal.read_journal(batch_csv)) == sorted(f"t{n}:{i}" for n in range(8) for i in range(50))
+
+
+def test_concurrent_appends_from_processes(batch_csv):
+    processes = [
+        _context.Process(target=_append_many, args=(str(batch_csv), f"p{n}", 100)) for n in range(4)
+    ]
+    for process in processes:
+        process.start()
+    _append_many(batch_csv, "main", 100)
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    writers = [f"p{n}" for n in range(4)] + ["main"]
+    assert _written(journal.read_journal(batch_csv)) == sorted(f"{w}:{i}" for w in writers for i in range(100))
+
+
+def test_concurrent_saves_of_different_fields(batch_csv):
+    service = QCService(Settings(csv_dir=str(batch_csv.parent)))
+    view = service.load_batch(str(batch_csv))
+
+    def save(name):
+        service.save_corrections(view, str(batch_csv), 7, {name: f"{name} neu"}, expected={name: view.df.at[7, name]})
+
+    threads = [threading.Thread(target=save, args=(name,)) for name in FIELDS]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    df = journal.load_with_journal(batch_csv)
+    assert [df.at[7, name] for name in FIELDS] == [f"{name} neu" for name in FIELDS]
+    assert service.load_batch(str(batch_csv)).df.loc[7, FIELDS].tolist() == df.loc[7, FIELDS].tolist()
+
+
+def test_compaction_while_tailing(batch_csv):
+    """Ein Prozess schreibt und kompaktiert, der Testprozess liest währenddessen nach."""
+    service = QCService(Settings(csv_dir=str(batch_csv.parent)))
+    # Endet mit einer Übernahme: die letzten Werte stehen dann nur noch in der CSV
+    n_edits = 180
+    writer = _context.Process(target=_append_and_compact, args=(str(batch_csv), n_edits, 15))
+    writer.start()
+
+    # Jede Zeile darf nur neuere Werte zeigen - nie einen älteren Stand
+    latest = {row: row for row in range(20)}
+    while True:
+        done = not writer.is_alive()
+        df = service.load_batch(str(batch_csv)).df
+        for row in range(20):
+            value = int(df.at[row, "Titel"].split()[-1])
+            assert value >= latest[row]
+            latest[row] = value
+        if done:
+            break
+    writer.join()
+    assert writer.exitcode == 0
+
+    assert journal.read_journal(batch_csv) == []
+    expected = [f"Titel {n_edits - 20 + row}" for row in range(20)]
+    assert service.load_batch(str(batch_csv)).df["Titel"].tolist() == expected
+    assert journal.load_with_journal(batch_csv)["Titel"].tolist() == expected
+
+
+def test_compaction_between_reads(batch_csv):
+    """Übernahme, während der Leser noch eine Position im alten Journal hält."""
+    service = QCService(Settings(csv_dir=str(batch_csv.parent)))
+    journal.append_edits(batch_csv, [(0, _datei(0), {"Titel": "vorher"})])
+    assert service.load_batch(str(batch_csv)).df.at[0, "Titel"] == "vorher"
+
+    writer = _context.Process(target=_append_and_compact, args=(str(batch_csv), 40, 40))
+    writer.start()
+    writer.join(timeout=60)
+    assert writer.exitcode == 0
+    assert journal.read_journal(batch_csv) == []
+
+    assert service.load_batch(str(batch_csv)).df["Titel"].tolist() == [f"Titel {20 + row}" for row in range(20)]
@@ -0,0 +1,102 @@
+import time
+
+import pandas as pd
+from conftest import FIELDS, make_batch
+
+from qc_core.live_index import LiveIndex
+from qc_core.master import MasterView
+from qc_core.search import SearchIndex
+from qc_core.service import QCService, Settings
+
+
+def test_take_matches_concatenated_frame(tmp_path):
+    for name, n_cards in (("batch_01", 7), ("batch_02", 0), ("batch_03", 12)):
+        make_batch(tmp_path, name, n_cards)
+    master = MasterView(tmp_path, FIELDS)
+    full = master.frame()
+    positions = [18, 0, 6, 7, 3]
+
+    taken = master.take(positions)
+    assert taken.index.tolist() == positions
+    # Das leere Batch macht die Spalten im zusammengesetzten Frame zu object
+    pd.testing.assert_frame_equal(taken[full.columns], full.iloc[positions], check_dtype=False)
+    assert master.take([]).empty
+
+
+def test_search_results_come_from_batches(tmp_path):
+    make_batch(tmp_path, "batch_01", 5)
+    make_batch(tmp_path, "batch_02", 5)
+    service = QCService(Settings(csv_dir=str(tmp_path)))
+
+    result = service.search("Titel 3")
+    assert result.results[["Batch", "Datei"]].values.tolist() == [
+        ["batch_01", "karte_003.jpg"], ["batch_02", "karte_003.jpg"]
+    ]
+    similar = service.search("Titel 3", fuzzy=True, max_distance=1).similar
+    assert {"Feld": "Titel", "Wert": "Titel 3", "Distanz": 0, "Karten": 2} in similar
+
+
+def test_take_keeps_index_layout(tmp_path):
+    make_batch(tmp_path, "batch_01", 5)
+    make_batch(tmp_path, "batch_03", 5)
+    master = MasterView(tmp_path, FIELDS)
+    _, layout = master.snapshot(["Titel"])
+
+    # Ein neuer Batch vor batch_03 verschiebt die Positionen des Index nicht
+    make_batch(tmp_path, "batch_02", 3)
+    taken = master.take([7, 2], layout)
+    assert taken[["Batch", "Datei"]].values.tolist() == [["batch_03", "karte_002.jpg"], ["batch_01", "karte_002.jpg"]]
+
+    # Fehlt ein Batch, entfallen nur seine Treffer
+    (tmp_path / "batch_01.csv").unlink()
+    assert master.take([7, 2], layout).index.tolist() == [7]
+
+
+def test_search_after_save_uses_overlay(tmp_path):
+    make_batch(tmp_path, "batch_01", 5)
+    path = make_batch(tmp_path, "batch_02", 5)
+    service = QCService(Settings(csv_dir=str(tmp_path)))
+    assert service.search("Titel 3").n_hits == 2
+
+    view = service.load_batch(str(path))
+    service.save_bulk_corrections(view, str(path), {3: {"Titel": "Sonate"}})
+    make_batch(tmp_path, "batch_00", 2)
+
+    result = service.search("Sonate")
+    assert result.results[["Batch", "Datei"]].values.tolist() == [["batch_02", "karte_003.jpg"]]
+    assert service.search("Titel 3").results["Batch"].tolist() == ["batch_01"]
+    assert service.search("Titel 1").results["Batch"].tolist() == ["batch_01", "batch_02", "batch_00"]
+    similar = service.search("Sonate", fuzzy=True, max_distance=1).similar
+    assert {"Feld": "Titel", "Wert": "Sonate", "Distanz": 0, "Karten": 1} in similar
+    # Gespeichert, neu angelegter Batch: nur Nachträge, kein Neuaufbau
+    assert service.timings.counters()["SearchIndex: neu gebaut"] == 1
+    assert service.timings.counters()["SearchIndex: Batch nachgetragen"] == 2
+
+
+def test_live_index_rebuilds_after_many_changes(tmp_path):
+    for name in ("batch_01", "batch_02"):
+        make_batch(tmp_path, name, 4)
+    master = MasterView(tmp_path, FIELDS)
+
+    def build():
+        frame, layout = master.snapshot(["Titel"])
+        return SearchIndex.build(frame, ["Titel"]), layout
+
+    def build_batch(name):
+        df = pd.read_csv(tmp_path / f"{name}.csv", encoding="utf-8-sig")
+        return SearchIndex.build(df, ["Titel"]), len(df)
+
+    live = LiveIndex(build, build_batch, max_overlays=1)
+    assert live.state(master.signatures()).overlays == ()
+    make_batch(tmp_path, "batch_03", 4)
+    make_batch(tmp_path, "batch_04", 4)
+    # Zwei neue Batches: Suche über Nachträge, Basis wird im Hintergrund neu gebaut
+    state = live.state(master.signatures())
+    assert len(state.overlays) == 2
+    assert len(state.search(lambda index: index.search("Titel 2", with_scores=True))[0]) == 4
+    for _ in range(100):
+        state = live.state(master.signatures())
+        if not state.overlays:
+            break
+        time.sleep(0.02)
+    assert state.overlays == () and state.layout.names == ("batch_01", "batch_02", "batch_03", "batch_04")
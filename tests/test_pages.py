@@ -0,0 +1,53 @@
+import pandas as pd
+
+from qc_core import pages
+from qc_core.batch_stats import BatchStats
+
+
+def make_stats(name, total, komponist):
+    # 10 Felder; `total - 1` vollständige Karten und eine spärliche
+    histogram = [0] * 11
+    histogram[1], histogram[8] = 1, total - 1
+    return BatchStats(batch=name, total=total, field_counts={"Komponist": komponist}, histogram=histogram)
+
+
+def test_overview_tables():
+    stats = [make_stats("batch_01", 4, 2), make_stats("batch_02", 6, 6)]
+    totals = BatchStats(batch="")
+    for s in stats:
+        totals.merge(s)
+
+    table, formats = pages.batch_comparison(stats, ["Komponist", "Signatur"])
+    assert table.loc["batch_01", ["Mit Komponist", "% Komponist", "Mit Signatur"]].tolist() == [2, 50.0, 0]
+    assert formats["% Signatur"] == "{:.1f}%"
+    assert pages.batch_comparison([], ["Komponist"])[0].empty
+
+    fields = pages.field_completeness(totals, ["Signatur", "Komponist"])
+    assert fields.values.tolist() == [["Komponist", 8, 80.0], ["Signatur", 0, 0.0]]
+    assert [(count, pct) for _, count, pct in pages.completeness_levels(totals)] == [(8, 80.0), (0, 0), (2, 20.0)]
+    assert "Spärlich (33.3%)" in pages.batch_boxes(make_stats("batch_03", 3, 0), ["Komponist"])[-1]
+
+
+def test_card_texts():
+    assert pages.field_label("Titel", " ") == "⚠️ Titel"
+    assert pages.cell_text(pd.Series({"Titel": None}), "Titel") == ""
+    assert pages.cell_text(pd.Series({"Titel": 12}), "Fehlt") == ""
+
+    row = {"Fehler": None, "Konfidenz": 0.5, "Mittel": 0.8, "Unsichere Felder": 2, "Schwächstes Feld": "Titel"}
+    assert pages.confidence_text(pd.Series(row)).endswith("2 unsichere Felder · schwächstes Feld: Titel)")
+    assert pages.confidence_text(pd.Series({**row, "Konfidenz": float("nan")})) is None
+
+    class Report:
+        def others_of(self, batch, filename):
+            return pd.DataFrame({"Batch": ["b"] * 7, "Datei": [f"{i}.jpg" for i in range(7)], "Gründe": "Signatur"})
+
+    assert pages.duplicates_text(None, "a", "x.jpg") is None
+    assert pages.duplicates_text(Report(), "a", "x.jpg").endswith("`b/4.jpg` und 2 weitere")
+
+
+def test_groups_and_clusters():
+    clusters = pd.DataFrame({"Cluster": [3, 3, 1], "Wert": ["Bach, J.S.", "J.S. Bach", "Händel"]})
+    assert pages.group_ids(clusters, "Cluster") == [3, 1]
+    members = pages.group(clusters, "Cluster", 3)
+    assert pages.canonical_choices(members) == ["Bach, J.S.", "J.S. Bach", pages.OWN_SPELLING]
+    assert pages.cluster_key("Komponist", "initials", members) != pages.cluster_key("Komponist", "initials", members.head(1))
@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+
+from qc_core import journal, storage
+
+pytest.importorskip("pyarrow")
+
+
+def test_read_table_projects_columns(batch_csv):
+    storage.import_csv(batch_csv)
+    df = storage.read_table(batch_csv, ["Datei", "Titel", "Fehlt"], backend="parquet")
+    assert list(df.columns) == ["Datei", "Titel"]
+    chunks = list(storage.iter_table(batch_csv, ["Titel"], chunksize=7, backend="parquet"))
+    assert [chunk.index[0] for chunk in chunks] == [0, 7, 14]
+    assert pd.concat(chunks)["Titel"].tolist() == df["Titel"].tolist()
+
+
+def test_compact_text_edit_in_numeric_column(batch_csv):
+    df = pd.read_csv(batch_csv, encoding="utf-8-sig")
+    df["Signatur"] = range(12, 12 + len(df))
+    df.to_csv(batch_csv, index=False, encoding="utf-8-sig")
+    storage.import_csv(batch_csv)
+
+    journal.append_edits(batch_csv, [(0, "karte_000.jpg", {"Signatur": "Mus. 12"})])
+    assert journal.compact(batch_csv, "parquet") == 1
+    assert not journal.pending_path(batch_csv).exists()
+
+    # Spiegel ist aktuell und enthält die Korrektur als Text
+    signatures = storage.read_table(batch_csv, ["Signatur"], backend="parquet")["Signatur"]
+    assert signatures.tolist()[:2] == ["Mus. 12", "13"]
+    assert pd.read_csv(batch_csv, encoding="utf-8-sig")["Signatur"].tolist()[:2] == ["Mus. 12", "13"]
@@ -0,0 +1,26 @@
+from conftest import FIELDS, N_CARDS
+
+from qc_core import journal, streaming
+from qc_core.batch_stats import BatchStats
+from qc_core.card_index import BatchView
+
+
+def test_chunked_stats_and_problem_cards(batch_csv):
+    journal.append_edits(batch_csv, [(9, "karte_009.jpg", {field: "" for field in FIELDS[1:]})])
+
+    # Blockweise berechnet wie aus dem geladenen Batch, inkl. Journal
+    chunked = streaming.batch_stats(batch_csv, FIELDS, chunksize=7)
+    view = BatchView.from_frame(journal.load_with_journal(batch_csv), FIELDS)
+    assert chunked == BatchStats.from_completeness("batch_01", view.completeness)
+    assert chunked.total == N_CARDS and chunked.sparse == 1
+
+    problems = list(streaming.problem_cards([batch_csv], FIELDS, ["Datei", "Batch"], chunksize=7))
+    assert [len(chunk) for chunk in problems] == [0, 1, 0]
+    assert problems[1].values.tolist() == [["karte_009.jpg", "batch_01"]]
+
+
+def test_chunked_search_keeps_best_hits(batch_csv):
+    results, n_hits = streaming.search([batch_csv], "Titel 1", ["Titel"], limit=3, chunksize=4)
+    # "Titel 1" exakt vor den Präfixtreffern "Titel 10" ...
+    assert n_hits == 11
+    assert results["Datei"].tolist() == ["karte_001.jpg", "karte_010.jpg", "karte_011.jpg"]
@@ -0,0 +1,49 @@
+import pandas as pd
+
+from qc_core import views
+from qc_core.service import QCService, Settings
+
+
+def test_sync_field_keeps_own_input():
+    # Neu geöffnet: aktueller Wert
+    assert views.sync_field(None, None, "A") == ("A", "A")
+    # Unverändert: übernimmt, was ein anderer Prüfer gespeichert hat
+    assert views.sync_field("A", "A", "B") == ("B", "B")
+    # Eigene Eingabe bleibt, gesehen bleibt der alte Wert (für die Konfliktprüfung)
+    assert views.sync_field("eigen", "A", "B") == ("eigen", "A")
+    # Eingabe entspricht schon dem aktuellen Wert
+    assert views.sync_field("B", "A", "B") == ("B", "B")
+
+
+def test_form_changes_and_conflicts():
+    changes, expected = views.form_changes({"Titel": "neu", "Verlag": "V"}, {"Titel": "alt", "Verlag": "V"})
+    assert changes == {"Titel": "neu"} and expected == {"Titel": "alt"}
+
+    df = pd.DataFrame({"Titel": ["aktuell"]})
+    seen = {"Titel": "alt", "Verlag": "V"}
+    views.accept_conflicts(seen, df, 0, pd.DataFrame({"Feld": ["Titel"]}))
+    assert seen == {"Titel": "aktuell", "Verlag": "V"}
+
+
+def test_paging():
+    assert views.page_count(0, 10) == 1
+    assert views.page_count(10, 10) == 1
+    assert views.page_count(11, 10) == 2
+    assert views.page_bounds(2, 10, 15) == (10, 15)
+    assert views.position_of([5, 3, 9], [9, 3]) == 1
+    assert views.position_of([5, 3, 9], [7]) is None
+
+
+def test_batch_order_with_filters(batch_csv):
+    df = pd.read_csv(batch_csv, encoding="utf-8-sig")
+    df.loc[[4, 11], "Komponist"] = None
+    df.to_csv(batch_csv, index=False, encoding="utf-8-sig")
+    service = QCService(Settings(csv_dir=str(batch_csv.parent)))
+    view = service.load_batch(str(batch_csv))
+
+    filters = {"Alle": None, "Ohne Komponist": views.missing("Komponist"), "Duplikate": views.duplicates}
+    sorts = {"Datei": "Datei", "Konfidenz": views.confidence}
+    assert list(views.batch_order(service, view, "batch_01", "Ohne Komponist", "Datei", filters, sorts)) == [4, 11]
+    assert len(views.batch_order(service, view, "batch_01", "Alle", "Konfidenz", filters, sorts)) == 20
+    # Ohne Duplikatprüfung: keine Karte
+    assert len(views.batch_order(service, view, "batch_01", "Duplikate", "Datei", filters, sorts)) == 0